@@ -260,8 +260,8 @@ class TC_packet:
         can be also fixed areas. Hence first, before the dictionary is created, a check is run for this.
 
         Unusual case here is the range check ``"CPC_PRFREF"``. Normal here would be to directly associate it to some externally defined
-        calibration, but since that would be quite convoluted and ineffective for such simple task, it was decided to generate a random
-        placeholder name (rather than predefined one) to be put into the ``"CPC_PRFREF"`` entry and then generate the range check tables
+        calibration, but since that would be quite convoluted and ineffective for such simple task, it was decided to generate a pseudo-random
+        placeholder name (rather than predefined one, see :obj:`mib_generator.construction.TM_packet_methods.stable_name`) to be put into the ``"CPC_PRFREF"`` entry and then generate the range check tables
         as an attribute of this command class :attr:`prf` and :attr:`prv` (rather then as an external object as is the case with all
         other calibrations).
 
@@ -344,8 +344,10 @@ class TC_packet:
                     self.entries[i].comment
                     and {"min", "max"} & self.entries[i].comment[-1].entries.keys()
                 ):
-                    # generate pseudo-random name for the range check
-                    diction["CPC_PRFREF"] = "RAN" + str(hash(diction["CPC_PNAME"]))[-7:]
+                    # generate stable pseudo-random name for the range check
+                    diction["CPC_PRFREF"] = pm.stable_name(
+                        "RAN", diction["CPC_PNAME"], 7
+                    )
                 else:
                     diction["CPC_PRFREF"] = ""
                 # diction["CPC_CCAREF"] = ""
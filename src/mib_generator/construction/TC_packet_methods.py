@@ -3,17 +3,21 @@
 This module holds methods that help with formatting of parsed data into TC packet and commands characteristics. They are usually
 concerned with value evaluation, bite counting, type identification etc. I.e. mostly kind of housekeeping jobs.
 """
-from copy import copy
-
 import mib_generator.data.warn as warn
 import mib_generator.parsing.load as load
+import mib_generator.parsing.symbols as symbols
 from mib_generator.construction.TM_packet_methods import (
     categfromptc,
     count_size,
     evalu,
     getptcpcf,
+    stable_name,
 )
 
+# memoised expansions of structures (see :obj:`h_analysis`) and the enumerations they were made with
+expanded = {}
+expanded_with = None
+
 
 def find_header(files):
     """Find structure in the passed files which describes a TC header.
@@ -27,9 +31,9 @@ def find_header(files):
     Returns:
         parsing.par_cfile.struct: The structure identifies as the header.
     """
-    for i in [a for file in files for a in file.structures]:
-        if "name" in i.__dir__() and i.name == "TcHead":
-            return i
+    header = symbols.of(files).first("TcHead")
+    if header is not None:
+        return header
     warn.raises("WCT1")
 
 
@@ -51,28 +55,26 @@ def packet_search(files):
         [:obj:`mib_generator.parsing.par_methods.comment`, :obj:`mib_generator.parsing.par_header.struct`].
     """
     packets = []
-    for i in [a for file in files for a in file.comments]:
-        if {"packet", "text_id"} < i.entries.keys():
-            packets.append([i])
-            if "use_structure" in i.entries.keys():
-                for l in [a for file in files for a in file.structures]:
-                    if i.entries["use_structure"] == l.name:
-                        packets[-1].append(l)
-                if len(packets[-1]) == 1:
-                    warn.raises(
-                        "WCT3", i.entries["use_structure"], i.entries["text_id"]
-                    )
-                    packets.pop(-1)
-                elif len(packets[-1]) > 2:
-                    warn.raises(
-                        "WCT4", i.entries["use_structure"], i.entries["text_id"]
-                    )
-                    packets[-1] = packets[-1][:2]
-            elif i.structure.type == "struct":
-                packets[-1].append(i.structure)
-            else:
-                warn.raises("WCT5", i.entries["text_id"])
+    index = symbols.of(files)
+    for i in index.commands:
+        packets.append([i])
+        if "use_structure" in i.entries.keys():
+            packets[-1] += index.named(i.entries["use_structure"])
+            if len(packets[-1]) == 1:
+                warn.raises(
+                    "WCT3", i.entries["use_structure"], i.entries["text_id"]
+                )
                 packets.pop(-1)
+            elif len(packets[-1]) > 2:
+                warn.raises(
+                    "WCT4", i.entries["use_structure"], i.entries["text_id"]
+                )
+                packets[-1] = packets[-1][:2]
+        elif i.structure.type == "struct":
+            packets[-1].append(i.structure)
+        else:
+            warn.raises("WCT5", i.entries["text_id"])
+            packets.pop(-1)
 
     return packets
 
@@ -87,6 +89,11 @@ def h_analysis(h_struct):
     Furthermore here, two output lists are created, one including all parameters from the TC-packet header and the other one
     including all parameters relating to the actual command.
 
+    Since the entries are not modified during the construction of the TC-commands, the expansion of each structure is memoised
+    in :attr:`expanded` and the same entries are shared by all commands which include it (only the returned lists are new). The
+    memoised expansions are forgotten when :obj:`mib_generator.parsing.load.enumerations` change (i.e. when the files are parsed
+    again).
+
     Args:
         h_struct (parsing.par_header.struct): The packet structure from which the parameters are to be expanded.
 
@@ -98,6 +105,12 @@ def h_analysis(h_struct):
             * *list* - List of parameters found inside the structure relating to the command content. Each is of type
               :obj:`mib_generator.parsing.par_header.misc_r`.
     """
+    if expanded_with is not load.enumerations:
+        expanded.clear()
+        globals()["expanded_with"] = load.enumerations
+    if id(h_struct) in expanded.keys():
+        entries_head, entries = expanded[id(h_struct)][1]
+        return list(entries_head), list(entries)
     entries_head = []
     entries = []
     if not (type(h_struct) is int or type(h_struct) is None):
@@ -105,25 +118,18 @@ def h_analysis(h_struct):
             if i.type not in {"enum", "struct"}:
                 entries.append(i)
             elif i.type == "struct":
-                occurences = 1
                 from_struct = []
-                if evalu(i.array) > 0:
-                    occurences = evalu(i.array)
-                for k in range(occurences):
-                    if type(i.form) is str:
-                        name = i.form
-                        tchs = [a for file in load.TcH for a in file.structures]
-                        tctmhs = [a for file in load.TcTmH for a in file.structures]
-                        for l in tchs + tctmhs:
-                            if l.name == name:
-                                from_struct = [copy(x) for x in h_analysis(l)[1]]
-                    else:
-                        from_struct = [copy(x) for x in h_analysis(i.form)[1]]
+                if type(i.form) is str:
+                    for l in symbols.named(i.form, load.TcH, load.TcTmH)[-1:]:
+                        from_struct = h_analysis(l)[1]
+                else:
+                    from_struct = h_analysis(i.form)[1]
                 if i.name not in {"spwHead", "tcHead"}:
                     entries = entries + from_struct
                 else:
                     entries_head = entries_head + from_struct
-    return entries_head, entries
+    expanded[id(h_struct)] = [h_struct, (entries_head, entries)]
+    return list(entries_head), list(entries)
 
 
 def get_gr_sizes(entries):
@@ -8,6 +8,7 @@ correspond to it.
 import mib_generator.construction.TM_packet_methods as pm
 import mib_generator.data.warn as warn
 import mib_generator.parsing.load as load
+import mib_generator.parsing.symbols as symbols
 
 
 class TM_header:
@@ -47,10 +48,9 @@ class TM_header:
         Returns:
             :obj:`mib_generator.parsing.par_header.struct`: The structure identified as the header.
         """
-        for i in [a for file in files for a in file.structures]:
-            methods = i.__dir__()
-            if "name" in methods and i.name == "TmHead":
-                return i
+        header = symbols.of(files).first("TmHead")
+        if header is not None:
+            return header
         warn.raises("WCT2")
 
 
@@ -399,9 +399,8 @@ class TM_packet:
                 diction["VPD_DISDESC"] = self.pcf[i[0]]["PCF_DESCR"]
             else:
                 diction["VPD_FIXREP"] = pm.evalu(self.entries[-i[0]].array)
-                name = (
-                    self.pcf[-i[0]]["PCF_NAME"][:3]
-                    + str(hash(self.pcf[-i[0]]["PCF_NAME"]))[-5:]
+                name = pm.stable_name(
+                    self.pcf[-i[0]]["PCF_NAME"][:3], self.pcf[-i[0]]["PCF_NAME"], 5
                 )
                 diction["VPD_NAME"] = name
                 diction["VPD_DISDESC"] = "fixed count"
@@ -3,6 +3,7 @@
 This module holds methods that help with formatting of parsed data into monitoring packet characteristics. They are usually
 concerned with value evaluation, bite counting, type identification etc. I.e. mostly kind of housekeeping jobs.
 """
+import hashlib
 import os
 from copy import copy
 
@@ -11,7 +12,29 @@ import json5
 import mib_generator.data.longdata as longdata
 import mib_generator.data.warn as warn
 import mib_generator.parsing.load as load
-
+import mib_generator.parsing.macros as macros
+import mib_generator.parsing.symbols as symbols
+
+# memoised expansions of structures (see :obj:`expand`) and the enumerations they were made with
+expanded = {}
+expanded_with = None
+# memoised values of expressions (see :obj:`evalu`), the enumerations they were made with and parsed expressions
+evaluated = {}
+evaluated_with = None
+parsed = {}
+
+# names given by :obj:`resolve_names` in the current run with the keys they were given for as values
+generated_names = {}
+# character marking the names requested by :obj:`stable_name` until they are given by :obj:`resolve_names`
+name_mark = "\0"
+# columns of the MIB tables which can hold the requested names
+name_columns = {
+    "pcf": ["PCF_NAME"],
+    "vpd": ["VPD_NAME"],
+    "cpc": ["CPC_PRFREF"],
+    "prf": ["PRF_NUMBR"],
+    "prv": ["PRV_NUMBR"],
+}
 
 def apidnum(name):
     """Find the value of apid from evaluation of references, etc.
@@ -28,8 +51,7 @@ def apidnum(name):
         int: Value of the apid reference.
     """
     num = load.enumerations[name]
-    tmcs = [a for file in load.TmC for a in file.structures]
-    lis = next((x for x in tmcs if x.name == "apidNum"), None)
+    lis = symbols.of(load.TmC).first("apidNum")
     link = {}
     for i in lis.elements:
         link[str(load.enumerations[i.position[1:-1]])] = int(i.value)
@@ -41,8 +63,12 @@ def evalu(string):
 
     This methods tries to evaluate the passed expression using various methods. First it tries a simple integer conversion,
     then it tries to evaluate it using the dictionary :obj:`mib_generator.parsing.load.enumerations` which stores all the possible substitutions
-    found across the code. Then even if this doesn't work (e.g. the string contains algebraic expressions), tries to use Python's
-    ``eval()`` function. If even this fails, it evaluates the expression as ``-1``.
+    found across the code. Then even if this doesn't work (e.g. the string contains algebraic expressions), it evaluates it
+    as a C constant expression (see :obj:`mib_generator.parsing.macros.evaluate`) with the names looked up in the
+    enumerations (see :obj:`enumerated`). If even this fails, it evaluates the expression as ``-1``.
+
+    The values of the expressions are memoised (and the failures are hence reported only once) until the
+    :obj:`mib_generator.parsing.load.enumerations` change.
 
     Args:
         string (str): A string which is to be evaluated.
@@ -51,19 +77,131 @@ def evalu(string):
         int: The evaluated value or ``-1`` if the evaluation failed.
     """
     try:
-        x = int(string)
+        return int(string)
     except:
-        if string in load.enumerations.keys():
-            x = load.enumerations[string]
-        else:
+        pass
+    if evaluated_with is not load.enumerations:
+        evaluated.clear()
+        globals()["evaluated_with"] = load.enumerations
+    if string in evaluated.keys():
+        return evaluated[string]
+    if string in load.enumerations.keys():
+        x = load.enumerations[string]
+    else:
+        if string not in parsed.keys():
             try:
-                x = eval(string, load.enumerations)
+                parsed[string] = macros.expression(string).tree
             except:
-                x = -1
-                warn.raises("WCM1", string)
+                parsed[string] = None
+        try:
+            x = macros.calculate(parsed[string], enumerated(), frozenset())
+        except:
+            x = -1
+            warn.raises("WCM1", string)
+    evaluated[string] = x
     return x
 
 
+class enumerated:
+    """Class representing the names of the constant expressions evaluated by :obj:`evalu`.
+
+    It takes the place of :obj:`mib_generator.parsing.macros.scope` there, looking the names up in
+    :obj:`mib_generator.parsing.load.enumerations` instead of the pre-processor symbols.
+    """
+
+    def lookup(self, name):
+        """Give the value of the given name.
+
+        Args:
+            name (str): The name.
+
+        Returns:
+            str: Value of the name.
+
+        Raises:
+            KeyError: If the name isn't in the enumerations.
+        """
+        return str(load.enumerations[name])
+
+
+def stable_name(prefix, key, width):
+    """Request a name for an object that doesn't have one (e.g. a range check) generated from the name of its source.
+
+    Whether the name collides with another generated name is known only after all the packets/commands are constructed,
+    so only a placeholder holding the request is returned here and the name itself is given to it by
+    :obj:`resolve_names` afterwards.
+
+    Args:
+        prefix (str): The start of the name.
+        key (str): The key (e.g. name of the parameter) the name is generated for.
+        width (int): Number of digits in the name after the prefix.
+
+    Returns:
+        str: The placeholder for the generated name.
+    """
+    return name_mark.join(["", prefix, str(width), key])
+
+
+def resolve_names(packets):
+    """Give the generated names to the placeholders made by :obj:`stable_name` in the rows of the given packets/commands.
+
+    The name consists of the prefix and ``width`` digits of the SHA-256 digest of the key, so the same key always yields
+    the same name (unlike with Python's ``hash()``, which is randomised in each run). The keys are processed in sorted
+    order, so if names of more keys collide, the same one keeps it regardless of the order in which the packets/commands
+    were constructed. The names already in the same columns of the tables (e.g. declared parameter names) are taken as
+    used too. The keys whose name is used are warned about and get the digest computed anew with a counter appended to
+    the key until an unused name is found (if none is found in a limited number of attempts, the first name is used
+    anyway and a warning is raised). The given names are kept in :attr:`generated_names`, which is made anew in each call. The
+    placeholders are also in the rows of the packets/commands reused from the previous run (see
+    :obj:`mib_generator.generation.manifest.packet`), so their names are resolved together with the others the same way
+    as in a full run.
+
+    Args:
+        packets (list): List of the TM-packets and TC-commands (or their stand-ins, see
+            :obj:`mib_generator.generation.manifest.cached`) whose rows are to be updated.
+    """
+    generated_names.clear()
+    requests = {}
+    existing = set()
+    for pack in packets:
+        for table, columns in name_columns.items():
+            for row in getattr(pack, table, []):
+                for col in columns:
+                    value = row.get(col)
+                    if isinstance(value, str) and value.startswith(name_mark):
+                        _, prefix, width, key = value.split(name_mark, 3)
+                        requests[value] = (key, prefix, int(width))
+                    elif value:
+                        existing.add(value)
+    names = {}
+    for value, (key, prefix, width) in sorted(requests.items(), key=lambda i: i[1]):
+        for salt in range(min(10**width, 1000)):
+            text = key if not salt else key + "#" + str(salt)
+            digest = int(hashlib.sha256(text.encode()).hexdigest(), 16)
+            name = prefix + str(digest % 10**width).zfill(width)
+            if not salt:
+                first = name
+            if name not in existing and generated_names.setdefault(name, key) == key:
+                if salt:
+                    warn.raises("WCM6", key, name)
+                break
+        else:
+            warn.raises("WCM7", key, first)
+            name = first
+        names[value] = name
+    # the rows are replaced rather than changed, since the manifest keeps those with the placeholders (so that the names
+    # of the packets/commands reused in the next run are requested again)
+    for pack in packets:
+        for table, columns in name_columns.items():
+            if not hasattr(pack, table):
+                continue
+            rows = []
+            for row in getattr(pack, table):
+                given = {i: names[row[i]] for i in columns if row.get(i) in names}
+                rows.append(dict(row, **given) if given else row)
+            setattr(pack, table, rows)
+
+
 def getptcpcf(entry, size):
     """Get ptc and pfc values from the size and nature of the given entry.
 
@@ -145,28 +283,22 @@ def header_search(typ, files):
         list: A list of pairs of [comments, structures] which are packet descriptions for the given packet "type".
     """
     comments = []
-    for i in [a for file in files for a in file.comments]:
-        if (
-            i.entries
-            and "pack_type" in i.entries.keys()
-            and i.entries["pack_type"] == typ
-        ):
-            comments.append([i])
-            if "use_structure" in i.entries.keys():
-                for l in [a for file in files for a in file.structures]:
-                    if l.type == "struct" and l.name == i.entries["use_structure"]:
-                        comments[-1].append(l)
-                if len(comments[-1]) == 1:
-                    warn.raises("WCM3", i.entries["use_structure"], typ)
-                    comments.pop(-1)
-                elif len(comments[-1]) > 2:
-                    warn.raises("WCM4", i.entries["use_structure"], typ)
-                    comments[-1] = comments[-1][:2]
-            elif i.structure.type == "struct":
-                comments[-1].append(i.structure)
-            else:
-                warn.raises("WCM5", typ)
+    index = symbols.of(files)
+    for i in index.pack_types.get(typ, []):
+        comments.append([i])
+        if "use_structure" in i.entries.keys():
+            comments[-1] += index.named(i.entries["use_structure"], "struct")
+            if len(comments[-1]) == 1:
+                warn.raises("WCM3", i.entries["use_structure"], typ)
                 comments.pop(-1)
+            elif len(comments[-1]) > 2:
+                warn.raises("WCM4", i.entries["use_structure"], typ)
+                comments[-1] = comments[-1][:2]
+        elif i.structure.type == "struct":
+            comments[-1].append(i.structure)
+        else:
+            warn.raises("WCM5", typ)
+            comments.pop(-1)
 
     if not comments:
         warn.raises("WCM2", typ)
@@ -176,9 +308,9 @@ def header_search(typ, files):
 def h_analysis(h_struct):
     """Make a list of all individual (all structs unpacked) entries in the packet.
 
-    This method goes iteratively through all entries/packet parameters inside the given structure. If it finds a normal entry,
-    it adds it to the list, if it finds a ``struct`` or reference to one, it expands it by recursively calling itself and adds
-    all elements in the expansion to the list.
+    The entries are obtained from the (memoised) expansion of the structure by :obj:`expand` and each of them is copied,
+    so that it can be assigned attributes specific to this packet without affecting other packets which include the same
+    structure.
 
     This method is also a precursor to the construction of the vpd tables, since it add to every entry it encounters an attribute
     :attr:`is_vpd`, which identifies whether the given parameter/set of parameters is subject to variable packet definition or
@@ -191,39 +323,55 @@ def h_analysis(h_struct):
         list: List of parameters found inside the structure. Each is of type :obj:`mib_generator.parsing.par_header.misc_r`.
     """
     entries = []
+    for i, vpd in expand(h_struct):
+        entry = copy(i)
+        entry.is_vpd = set(vpd)
+        entries.append(entry)
+    return entries
+
+
+def expand(h_struct):
+    """Expand the structure into a list of all its individual (all structs unpacked) entries.
+
+    This method goes iteratively through all entries/packet parameters inside the given structure. If it finds a normal entry,
+    it adds it to the list, if it finds a ``struct`` or reference to one, it expands it by recursively calling itself and adds
+    all elements in the expansion to the list. Together with each entry, the vpd markings (``"vpd"`` entries in comments)
+    of the entry itself and of all the structures it is nested in are kept.
+
+    The expansion of each structure is memoised in :attr:`expanded`, since the same (sub-)structures are often shared by many
+    packets. The memoised expansions are forgotten when :obj:`mib_generator.parsing.load.enumerations` change (i.e. when the
+    files are parsed again).
+
+    Args:
+        h_struct (parsing.par_header.struct): The structure to be expanded.
+
+    Returns:
+        list: List of pairs of entries found inside the structure (each of type :obj:`mib_generator.parsing.par_header.misc_r`)
+        and frozensets of their vpd markings. This list is shared and should not be modified.
+    """
+    if expanded_with is not load.enumerations:
+        expanded.clear()
+        globals()["expanded_with"] = load.enumerations
+    if id(h_struct) in expanded.keys():
+        return expanded[id(h_struct)][1]
+    entries = []
     if not (type(h_struct) is int or type(h_struct) is None):
         for i in h_struct.elements:
-            i.is_vpd = set()
+            if i.comment and "vpd" in i.comment[-1].entries.keys():
+                vpd = frozenset([i.comment[-1].entries["vpd"]])
+            else:
+                vpd = frozenset()
             if i.type not in {"enum", "struct"}:
-                # this is insanely ugly, but at least it shouldn't create any confusion
-                if i.comment and "vpd" in i.comment[-1].entries.keys():
-                    i.is_vpd.add(i.comment[-1].entries["vpd"])
-                entries.append(i)
+                entries.append((i, vpd))
             elif i.type == "struct":
-                occurences = 1
                 from_struct = []
-                if evalu(i.array) > 0:
-                    occurences = evalu(i.array)
-                if i.comment and "vpd" in i.comment[-1].entries.keys():
-                    occurences = 1
-                    vpd = True
+                if type(i.form) is str:
+                    for l in symbols.named(i.form, load.TmH, load.TcTmH)[-1:]:
+                        from_struct = expand(l)
                 else:
-                    vpd = False
-                for k in range(occurences):
-                    if type(i.form) is str:
-                        name = i.form
-                        tmhs = [a for file in load.TmH for a in file.structures]
-                        tctmhs = [a for file in load.TcTmH for a in file.structures]
-                        for l in tmhs + tctmhs:
-                            if l.name == name:
-                                from_struct = [copy(x) for x in h_analysis(l)]
-                    else:
-                        from_struct = [copy(x) for x in h_analysis(i.form)]
-                if vpd:
-                    for k in from_struct:
-                        k.is_vpd.add(i.comment[-1].entries["vpd"])
-                entries = entries + from_struct
-
+                    from_struct = expand(i.form)
+                entries += [(k, l | vpd) for k, l in from_struct]
+    expanded[id(h_struct)] = [h_struct, entries]
     return entries
 
 
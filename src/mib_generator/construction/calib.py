@@ -20,31 +20,23 @@ def cur_update(packet, cal):
 
     Args:
         packet (TM_packet.TM_packet): Packet, who's entries' calibrations are to be checked and updated.
-        cal (dict): A dictionary holding lists of various types of calibration. Each is a child-class of :obj:`calib`.
+        cal (dict): A dictionary of all available calibrations indexed by their names as created by :obj:`calib_index`.
     """
-    calibs = []
-    for i in cal:
-        for l in cal[i]:
-            calibs.append(l)
     for i in packet.cur:
-        match_count = 0
-        for l in calibs:
-            if i["CUR_SELECT"] == l.name:
-                i["CUR_SELECT"] = l.comment.entries["cal_ident"]
-                match_count += 1
-        if match_count == 0:
+        match = lookup(cal, i["CUR_SELECT"])
+        if match is not None:
+            i["CUR_SELECT"] = match.comment.entries["cal_ident"]
+        else:
             warn.raises("WCC1", i["CUR_PNAME"], str(packet.pid["PID_SPID"]))
             packet.cur.remove(i)
     for i in packet.pcf:
         if "PCF_CURTX" in i.keys() and i["PCF_CURTX"]:
-            match_count = 0
-            for l in calibs:
-                if i["PCF_CURTX"] == l.name:
-                    i["PCF_CURTX"] = l.comment.entries["cal_ident"]
-                    match_count += 1
-                    if "txf" in l.__dir__():
-                        i["PCF_CATEG"] = "S"
-            if match_count == 0:
+            match = lookup(cal, i["PCF_CURTX"])
+            if match is not None:
+                i["PCF_CURTX"] = match.comment.entries["cal_ident"]
+                if "txf" in match.__dir__():
+                    i["PCF_CATEG"] = "S"
+            else:
                 warn.raises("WCC1", i["PCF_CURTX"], str(packet.pid["PID_SPID"]))
                 i["PCF_CURTX"] = ""
 
@@ -58,20 +50,83 @@ def cpc_update(command, dec):
 
     Args:
         command (TC_packet.TC_packet): Command, who's parameters' decalibrations are to be checked and updated.
-        dec (list): List of all available decalibrations. Each of type :obj:`decalib`.
+        dec (dict): A dictionary of all available decalibrations indexed by their names as created by :obj:`decal_index`.
     """
     for i in command.cpc:
         if "CPC_PAFREF" in i.keys() and i["CPC_PAFREF"]:
-            match_count = 0
-            for l in dec:
-                if i["CPC_PAFREF"] == l.name:
-                    i["CPC_PAFREF"] = l.comment.entries["dec_ident"]
-                    match_count += 1
-            if match_count == 0:
+            match = lookup(dec, i["CPC_PAFREF"])
+            if match is not None:
+                i["CPC_PAFREF"] = match.comment.entries["dec_ident"]
+            else:
                 warn.raises("WCC2", i["CPC_PAFREF"], str(command.ccf["CCF_CNAME"]))
                 i["CPC_PAFREF"] = ""
 
 
+def calib_index(cal):
+    """Index the calibrations by their names.
+
+    Args:
+        cal (dict): A dictionary holding lists of various types of calibration (as created by :obj:`calib_extract`). Each
+            is a child-class of :obj:`calib`.
+
+    Returns:
+        dict: A dictionary with names of the calibrations as keys and the calibrations as values. If more calibrations
+        share the same name, only the first one is used (and a warning is raised).
+    """
+    return name_index([l for i in cal for l in cal[i]], "Calibration")
+
+
+def decal_index(dec):
+    """Index the decalibrations by their names.
+
+    Args:
+        dec (list): List of decalibrations (as created by :obj:`decal_extract`). Each of type :obj:`decalib`.
+
+    Returns:
+        dict: A dictionary with names of the decalibrations as keys and the decalibrations as values. If more
+        decalibrations share the same name, only the first one is used (and a warning is raised).
+    """
+    return name_index(dec, "Decalibration")
+
+
+def name_index(calibs, desc):
+    """Index the given calibrations/decalibrations by their names.
+
+    Args:
+        calibs (list): List of calibrations/decalibrations. Each of some child-class of :obj:`calib`.
+        desc (str): Description of the indexed objects used in the warnings.
+
+    Returns:
+        dict: A dictionary with names as keys and the first calibration/decalibration with such name as values.
+    """
+    index = {}
+    for i in calibs:
+        try:
+            if i.name not in index.keys():
+                index[i.name] = i
+            else:
+                warn.raises("WCC4", desc, str(i.name))
+        except TypeError:
+            pass
+    return index
+
+
+def lookup(index, name):
+    """Find the calibration/decalibration/verification with the given name in an index.
+
+    Args:
+        index (dict): The index as created by :obj:`calib_index`, :obj:`decal_index` or :obj:`verif_index`.
+        name (str): The name to be looked up.
+
+    Returns:
+        object or None: The found object or ``None`` if there is no object with such name.
+    """
+    try:
+        return index.get(name)
+    except TypeError:
+        return None
+
+
 def calib_extract(comments):
     """Extract declaration of various calibrations if they occur in the comments.
 
@@ -574,6 +629,28 @@ def verif_extract(comments):
     return verif
 
 
+def verif_index(verifs):
+    """Index the verifications by their identifiers.
+
+    Args:
+        verifs (list): List of verifications (as created by :obj:`verif_extract`). Each of type :obj:`verification`.
+
+    Returns:
+        dict: A dictionary with the ``"CVS_ID"`` identifiers of the verifications as keys and the verifications as values.
+        If more verifications share the same identifier, only the first one is used (and a warning is raised).
+    """
+    index = {}
+    for i in verifs:
+        try:
+            if i.cvs["CVS_ID"] not in index.keys():
+                index[i.cvs["CVS_ID"]] = i
+            else:
+                warn.raises("WCC4", "Verification", str(i.cvs["CVS_ID"]))
+        except TypeError:
+            pass
+    return index
+
+
 def cvs_update(command, verifs):
     """Check whether verification exists for a given command and if yes, change cvs entry correspondingly.
 
@@ -585,11 +662,12 @@ def cvs_update(command, verifs):
 
     Args:
         command (TC_packet.TC_packet): Command, who's verification entries are to be checked and updated.
-        verifs (list): List of all available verifications. Each of type :obj:`verification`.
+        verifs (dict): A dictionary of all available verifications indexed by their identifiers as created by
+            :obj:`verif_index`.
     """
     if command.cvp is None:
         entrydict = []
-        for i in verifs:
+        for i in verifs.values():
             if i.default:
                 diction = {}
                 diction["CVP_TASK"] = command.ccf["CCF_CNAME"]
@@ -598,12 +676,9 @@ def cvs_update(command, verifs):
                 entrydict.append(diction)
         command.cvp = entrydict
     else:
-        lis = []
-        for i in verifs:
-            lis.append(i.cvs["CVS_ID"])
         maxi = len(command.cvp)
         for i in range(maxi):
-            if command.cvp[maxi - 1 - i]["CVP_CVSID"] not in lis:
+            if lookup(verifs, command.cvp[maxi - 1 - i]["CVP_CVSID"]) is None:
                 warn.raises(
                     "WCC3",
                     str(command.cvp[maxi - 1 - i]["CVP_CVSID"]),
@@ -8,12 +8,33 @@ Attributes:
     errors (dict): A dictionary containing the text definitions of all the possible errors.
     complete (dict): A dictionary containing the text definitions of all the possible completion messages.
     display (None or some object): Defines (or holds the object) where the warnings should be raise.
+    local (threading.local): Thread-local storage holding a list of collected messages (see :obj:`collect`).
+    batching (bool): Whether the messages are buffered (see :obj:`batch`) instead of being displayed right away.
+    limit (int or None): Maximal number of distinct buffered messages with the same ID, the further ones are only
+        counted (``None`` for no limit).
+    buffer (dict): The buffered messages, with tuples (ID, message) as keys and lists [message, ID, arguments, location,
+        count] as values, in the order in which they were first raised.
+    suppressed (dict): Numbers of the messages left out of :attr:`buffer` because of :attr:`limit`, with their IDs as keys.
+    distinct (dict): Numbers of the distinct messages in :attr:`buffer`, with their IDs as keys.
+    lock (threading.Lock): Lock guarding the buffer.
+    fields (dict): Names of the parameters of the messages, with their IDs as keys. The parameters named as one of the
+        :attr:`columns` are stored under these columns in the structured records (see :obj:`structure`).
+    columns (list): Names of the columns of the structured records of the messages.
+    recording (bool): Whether the structured records of the messages are kept in :attr:`diagnostics` (see
+        :obj:`record`).
+    diagnostics (list): The structured records of the messages raised while recording.
 """
+import json
+import os
+import sqlite3
+import sys
+import threading
 
 warnings = {
     "WCC1": "Wasn't able to find matching calibration for {} in packet {}.",
     "WCC2": "Wasn't able to find matching decalibration for {} in command {}.",
     "WCC3": "Wasn't able to find the required verification {} for command {}.",
+    "WCC4": "{} {} is declared more than once, only its first declaration is used.",
     "WCT1": "Wasn't able to find the common Tc header.",
     "WCT2": "Wasn't able to find the common Tm header.",
     "WCT3": "Wasn't able to find any C-structure {} to characterise the command {} as referred to in its comment declaration.",
@@ -25,6 +46,8 @@ warnings = {
     "WCM3": "Wasn't able to find any C-structure {} to characterise the packet {} as referred to in its comment declaration.",
     "WCM4": "C-structure {} to characterise the packet {} as referred to in its comment declaration is not uniquely determined.",
     "WCM5": "The declaration of packet {} found in a comment does not have any C-structure associated to it.",
+    "WCM6": "The name generated for {} collides with another name in the MIB tables, name {} is used instead.",
+    "WCM7": "Wasn't able to generate a unique name for {}, name {} is used although it isn't unique.",
     "WCMA": "The base_par_index for TM packet {} is longed than the expected length from configuration. It will be truncated.",
     "WGM1": "Found repedition in table {}. Deleting rows: {}{}",
     "WGM2": "Tm-packets {} and {} share packet type, subtype and apid, but differ in specification of additional identification field.",
@@ -32,20 +55,36 @@ warnings = {
     "WGM4": "The value in table {}, column {}, row {} doesn't have the required type.{}",
     "WGM5": "Missing a mandatory entry in table {}, column {}, row {}.",
     "WGM6": "There are either missing or repeating mnemonics for table {}.{}",
+    "WGN1": "Failed to load the manifest {} of the previous run, everything is generated anew.",
+    "WGN2": "Failed to save the manifest {}.",
     "WGG1": "Didn't get an input object on basis of which the table {} could be constructed.",
     "WGG2": "The construction of the table {} isn't yet implemented. And hence it wasn't generated.",
     "WMM1": "PySide6 not found. Please install it in order to show the parsed files",
+    "WMM2": "Watching the input files is not supported when generating more configurations, the outputs are generated only once.",
     "WPL1": "Failed to construct the list of available enumerations.",
     "WPM1": "Invalid logic encountered when parsing preprocessor directives.",
+    "WPM2": "Pre-processor condition {} is not specified in the config file, it is taken as not holding.",
+    "WPM3": "Failed to evaluate the pre-processor condition {}, it is taken as not holding.",
+    "WPC1": "Failed to save the parsed representation of {} to the parse cache.",
+    "WPP1": "Failed to read the file {}, it is taken as empty.",
+    "WPP2": "The file {} is not valid UTF-8, the undecodable bytes were replaced.",
     "WTT1": "The path {} for file {} does not exist, consider using previous value {}.",
     "WTT2": "The path {} for file {} does not exist (and there is no valid previous value to use in its place).",
     "WGU1": "The directory {} to which the config files are to be saved doesn't exist.",
+    "WUP1": "Failed to save the profile statistics to {}.",
+    "WUP2": "Failed to save the profiling report to {}.",
+    "WDW1": "Further {} messages {} were left out.",
+    "WDW2": "Failed to save the messages to {}.",
+    "WDW3": "Failed to export the diagnostics to {}.",
 }
 
 errors = {
     "EPL1": "Failed to load (some of) the input/output paths.",
     "EPL2": "Failed to load the {} C file.",
     "EPM1": "Failed loading json5 comment: {}",
+    "EPM2": "Pre-processor condition {} is specified neither in the config file nor on the command line.",
+    "EMM1": "Failed regenerating the outputs after change of {}.",
+    "EMM2": "Failed loading the configurations from {}.",
     "EGU1": "Failed filling in the default config directory path.",
     "EGU2": "Failed saving the specified paths to runtime config file.",
     "EGU3": "Failed saving the configuration parameters above to runtime config file.",
@@ -74,9 +113,88 @@ complete = {
     "CGUA": "Finished constructing the .docx file.",
     "CGUB": "Saved the constructed MIB tables.",
     "CGUC": "Saved the constructed .docx file.",
+    "CGN1": "Reused {} of {} packets/commands from the previous run, {} of {} tables didn't change.",
+    "CMM1": "Watching {} input files for changes, press Ctrl+C to stop.",
+    "CMM2": "Regenerated the outputs after change of {} in {} s.",
+    "CMM3": "Generated the outputs of configuration {} into {} ({} of the input files had to be parsed again).",
+    "CPC1": "Cleared the parse cache at {}.",
+    "CUP1": "Phase {} took {} s (CPU {} s), peak RSS {} MiB, {} objects alive{}.",
 }
 
 display = None
+local = threading.local()
+batching = False
+limit = None
+buffer = {}
+suppressed = {}
+distinct = {}
+lock = threading.Lock()
+
+fields = {
+    "WCC1": ["name", "spid"],
+    "WCC2": ["name", "packet"],
+    "WCC3": ["name", "packet"],
+    "WCC4": ["kind", "name"],
+    "WCT3": ["structure", "packet"],
+    "WCT4": ["structure", "packet"],
+    "WCT5": ["packet"],
+    "WCTA": ["packet"],
+    "WCM1": ["name"],
+    "WCM2": ["packet"],
+    "WCM3": ["structure", "packet"],
+    "WCM4": ["structure", "packet"],
+    "WCM5": ["packet"],
+    "WCM6": ["name", "generated"],
+    "WCM7": ["name", "generated"],
+    "WCMA": ["packet"],
+    "WGM1": ["table", "rows", "detail"],
+    "WGM2": ["spid", "other_spid"],
+    "WGM3": ["spid", "other_spid"],
+    "WGM4": ["table", "column", "row", "detail"],
+    "WGM5": ["table", "column", "row"],
+    "WGM6": ["table", "detail"],
+    "WGN1": ["path"],
+    "WGN2": ["path"],
+    "WGG1": ["table"],
+    "WGG2": ["table"],
+    "WPM2": ["condition"],
+    "WPM3": ["condition"],
+    "WPC1": ["file"],
+    "WPP1": ["file"],
+    "WPP2": ["file"],
+    "WTT1": ["path", "kind", "previous"],
+    "WTT2": ["path", "kind"],
+    "WGU1": ["path"],
+    "WUP1": ["path"],
+    "WUP2": ["path"],
+    "WDW1": ["count", "id"],
+    "WDW2": ["path"],
+    "WDW3": ["path"],
+    "EPL2": ["kind"],
+    "EPM1": ["detail"],
+    "EPM2": ["condition"],
+    "EMM1": ["files"],
+    "EMM2": ["path"],
+    "CMM3": ["name", "path", "files"],
+    "EGUD": ["kind"],
+}
+columns = [
+    "id",
+    "level",
+    "message",
+    "table",
+    "column",
+    "row",
+    "packet",
+    "spid",
+    "file",
+    "line",
+    "offset",
+    "location",
+    "args",
+]
+recording = False
+diagnostics = []
 
 
 def disp_update(var):
@@ -91,11 +209,30 @@ def disp_update(var):
     globals()["display"] = var
 
 
+def collect(messages):
+    """Collect the messages raised in the current thread into the given list instead of displaying them.
+
+    This is used when some work is done concurrently in more threads (or processes), so that the messages raised in them
+    can be later displayed in a deterministic order. Each message is collected as a tuple (message, ID, arguments,
+    location, context), so that it can be relayed by ``show(*message)``.
+
+    Args:
+        messages (list or None): The list the messages are to be appended to or ``None`` to stop collecting them.
+
+    Returns:
+        list or None: The list the messages were collected into until now (so that it can be restored afterwards).
+    """
+    outer = getattr(local, "messages", None)
+    local.messages = messages
+    return outer
+
+
 def raises(ID, *data):
     """Raise warning/error with the given ID.
 
     This method looks up a warning/error text for a given passed ID, formats it with other passed parameters and
     then displays it - either to terminal if the global attribute :attr:`display` is ``None`` or to the object that this attribute holds..
+    The place in the code from which the message is raised is passed along with it (see :obj:`show`).
 
     Args:
         ID (str): The ID identifying the warning/error of format 3 capital letters + one-digit number.
@@ -122,7 +259,229 @@ def raises(ID, *data):
         stri = "Warn.:\tWarning/Error/Completion message with unknown ID {} encountered.".format(
             ID
         )
-    if not display:
+    frame = sys._getframe(1)
+    location = "{}:{}".format(frame.f_code.co_filename, frame.f_lineno)
+    extra = getattr(local, "context", None)
+    show(stri, ID, [str(i) for i in data], location, extra)
+
+
+def show(stri, ID=None, args=None, location=None, extra=None):
+    """Display an already formatted warning/error/completion message.
+
+    The message is either printed to terminal if the global attribute :attr:`display` is ``None`` or passed to the
+    object that this attribute holds. This is used by :obj:`raises` but also to relay messages collected elsewhere
+    (e.g. in other processes).
+
+    If the messages are being collected in the current thread (see :obj:`collect`), the message is only appended to the
+    list of collected messages. If they are being buffered (see :obj:`batch`), it is only added to the buffer. If the
+    messages are being recorded (see :obj:`record`), its structured record is also kept.
+
+    Args:
+        stri (str): The formatted message.
+        ID (str): The ID of the message (if known).
+        args (list): The parameters formatted into the message (as strings).
+        location (str): The place in the code (as ``file:line``) from which the message was raised.
+        extra (dict): Further entries of the structured record of the message (from the :obj:`context` in which it was
+            raised).
+    """
+    messages = getattr(local, "messages", None)
+    if messages is not None:
+        messages.append((stri, ID, args, location, extra))
+        return
+    if recording and ID is not None:
+        diagnostics.append(structure(stri, ID, args, location, extra))
+    if batching:
+        store(stri, ID, args, location)
+    elif display is None:
         print(stri)
     else:
         display.append(stri)
+
+
+def batch(enabled=True, cap=None):
+    """Start or stop buffering of the messages.
+
+    While buffering, the messages are not displayed as they are raised, but kept in :attr:`buffer` until
+    :obj:`flush` is called. Repeated messages are kept only once and counted, and if a cap is given, only that many
+    distinct messages with the same ID are kept (the rest is only counted). This keeps the output short and the GUI
+    responsive even when some messages are raised thousands of times.
+
+    Args:
+        enabled (bool): ``True`` (by default) if the messages should be buffered, ``False`` if they should be displayed
+            right away again (the already buffered messages are not flushed).
+        cap (int): Maximal number of distinct messages with the same ID to be kept, ``None`` (by default) for no limit.
+    """
+    globals()["batching"] = enabled
+    globals()["limit"] = cap
+
+
+def store(stri, ID, args, location):
+    """Add a message to the buffer (or count it, if it's already there or its ID is over the limit).
+
+    Args:
+        stri (str): The formatted message.
+        ID (str): The ID of the message (if known).
+        args (list): The parameters formatted into the message.
+        location (str): The place in the code from which the message was raised.
+    """
+    key = (ID, stri)
+    with lock:
+        if key in buffer.keys():
+            buffer[key][4] += 1
+        elif limit is not None and distinct.get(ID, 0) >= limit:
+            suppressed[ID] = suppressed.get(ID, 0) + 1
+        else:
+            buffer[key] = [stri, ID, args, location, 1]
+            distinct[ID] = distinct.get(ID, 0) + 1
+
+
+def flush(path=None):
+    """Display the buffered messages at once and empty the buffer.
+
+    Each buffered message is displayed once (with the number of its repetitions), followed by the counts of the messages
+    left out because of the limit. All of these are passed to the terminal/:attr:`display` in one piece. The messages can
+    be also saved as JSON (an object holding under ``"messages"`` a list of objects with the ID, arguments, location,
+    message and count of each message and under ``"suppressed"`` the numbers of the left out messages by ID).
+
+    Args:
+        path (str): Path to a file the messages should be saved into as JSON, ``None`` (by default) if they should only be
+            displayed.
+    """
+    with lock:
+        records = list(buffer.values())
+        left = dict(suppressed)
+        buffer.clear()
+        suppressed.clear()
+        distinct.clear()
+    lines = []
+    for i in records:
+        lines.append(i[0] if i[4] == 1 else "{} ({}x)".format(i[0], i[4]))
+    for i in left:
+        lines.append("Warn.:\t" + warnings["WDW1"].format(left[i], i))
+    if lines:
+        if display is None:
+            print("\n".join(lines))
+        else:
+            display.append("\n".join(lines))
+    if path is None:
+        return
+    keys = ["message", "id", "args", "location", "count"]
+    try:
+        with open(path, "w") as fil:
+            out = {
+                "messages": [dict(zip(keys, i)) for i in records],
+                "suppressed": left,
+            }
+            json.dump(out, fil, indent=4)
+    except:
+        show("Warn.:\t" + warnings["WDW2"].format(path), "WDW2", [path])
+
+
+class context:
+    """Context manager adding the given entries to the structured records of the messages raised within it.
+
+    This is used to attach to the messages what is being processed when they are raised, e.g. the MIB table being
+    generated or the packet being constructed (together with the place in the input files where it is declared). The
+    contexts can be nested (the inner entries take precedence) and are kept separately for each thread.
+
+    Args:
+        \*\*entries (\*\*kwargs): The entries (e.g. ``table``, ``packet``, ``spid``, ``file``, ``line``, ``offset``).
+
+    Attributes:
+        entries (dict): The entries.
+        outer (dict or None): The entries of the enclosing context.
+    """
+
+    def __init__(self, **entries):
+        self.entries = entries
+        self.outer = None
+
+    def __enter__(self):
+        self.outer = getattr(local, "context", None)
+        local.context = dict(self.outer or {}) | self.entries
+        return self
+
+    def __exit__(self, typ, value, traceback):
+        local.context = self.outer
+
+
+def structure(stri, ID, args, location, extra=None):
+    """Create the structured record of a message.
+
+    The parameters of the message are named according to :attr:`fields`, those named as one of the :attr:`columns` are
+    stored under it and all of them under ``args``.
+
+    Args:
+        stri (str): The formatted message.
+        ID (str): The ID of the message.
+        args (list): The parameters formatted into the message.
+        location (str): The place in the code from which the message was raised.
+        extra (dict): Further entries of the record (e.g. from the :obj:`context`).
+
+    Returns:
+        dict: The record with :attr:`columns` as keys.
+    """
+    names = fields.get(ID, [])
+    args = args or []
+    named = dict(zip(names, args)) if len(names) == len(args) else {"args": args}
+    entry = dict.fromkeys(columns)
+    entry.update({i: l for i, l in (extra or {}).items() if i in entry.keys()})
+    entry.update({i: l for i, l in named.items() if i in entry.keys()})
+    levels = {"W": "warning", "E": "error", "C": "completion"}
+    entry["id"] = ID
+    entry["level"] = levels.get(ID[:1].upper(), "warning")
+    entry["message"] = stri.split("\t", 1)[-1]
+    entry["location"] = location
+    entry["args"] = named
+    for i in ["row", "spid"]:
+        if str(entry[i]).isdigit():
+            entry[i] = int(entry[i])
+    return entry
+
+
+def record(enabled=True):
+    """Start or stop recording of the structured records of the messages (and forget the previous ones).
+
+    Args:
+        enabled (bool): ``True`` (by default) if the records should be kept in :attr:`diagnostics`, ``False``
+            otherwise.
+    """
+    globals()["recording"] = enabled
+    diagnostics.clear()
+
+
+def export(path):
+    """Save the recorded structured records of the messages and forget them.
+
+    The records are saved either into an SQLite database (if the path ends with ``.db``, ``.sqlite`` or ``.sqlite3``) as
+    a table ``diagnostics`` with :attr:`columns` as its columns (replacing the table if it already exists), or as JSON
+    lines (one JSON object per message).
+
+    Args:
+        path (str): Path to the file the records are to be saved into.
+    """
+    records = list(diagnostics)
+    diagnostics.clear()
+    try:
+        if os.path.splitext(path)[1] in {".db", ".sqlite", ".sqlite3"}:
+            rows = [
+                [i[l] for l in columns[:-1]] + [json.dumps(i["args"])] for i in records
+            ]
+            names = ", ".join('"' + i + '"' for i in columns)
+            conn = sqlite3.connect(path)
+            try:
+                with conn:
+                    conn.execute("DROP TABLE IF EXISTS diagnostics")
+                    conn.execute("CREATE TABLE diagnostics (" + names + ")")
+                    marks = ", ".join("?" for i in columns)
+                    conn.executemany(
+                        "INSERT INTO diagnostics VALUES (" + marks + ")", rows
+                    )
+            finally:
+                conn.close()
+        else:
+            with open(path, "w") as fil:
+                for i in records:
+                    fil.write(json.dumps(i) + "\n")
+    except:
+        raises("WDW3", path)
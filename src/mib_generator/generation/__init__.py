@@ -8,6 +8,8 @@ The submodules here are:
       purpose and executes the generation.
     * :obj:`gener_methods` - Module holding methods used by the main generation module. These methods do all from checking
       and converting MIB tables to saving them in the correct location.
+    * :obj:`manifest` - Module recording the inputs from which the packets/commands and MIB tables were constructed, so
+      that only those whose inputs changed have to be constructed and saved again in the next run.
     * :obj:`gener_doc` - Module with methods that create a docx file with the list of entries in Tm and Tc packets from
       which the MIB tables were generated.
 """
@@ -3,11 +3,31 @@
 Methods in this module generate MIB databases from their representations previously generated by the
 :obj:`mib_generator.construction` package/modules and run finals checks on the results to ensure that the outputted tables/MIB files 
 adhere to the requirements on the type, length, uniqueness and "mandatoriness".
+
+Attributes:
+    workers (int): Number of threads used for generation of the tables. ``0`` (or ``None``) for one thread per CPU core,
+        ``1`` (default) for generating the tables sequentially.
+    prerequisites (dict): Steps which have to be done before generation of some tables (e.g. filtering of the packets for
+        the pic table), with names of the tables as keys.
 """
+import os
+from concurrent.futures import ThreadPoolExecutor
 
 import mib_generator.data.warn as warn
 import mib_generator.generation.gener_methods as gm
 import mib_generator.parsing.load as load
+import mib_generator.utilities.profiling as profiling
+
+workers = 1
+
+# steps which have to be done before generation of some tables, as pairs of their names and functions which are passed the
+# objects the table is generated from and return the objects to be actually used
+prerequisites = {
+    "pic": ["pic_filter", gm.pic_filter],
+    "pcf": ["mnemon_check pcf", lambda packets: mnemon_step("pcf", packets)],
+    "ccf": ["mnemon_check ccf", lambda packets: mnemon_step("ccf", packets)],
+    "cpc": ["mnemon_check cpc", lambda packets: mnemon_step("cpc", packets)],
+}
 
 
 def generation_hub(
@@ -18,6 +38,7 @@ def generation_hub(
     verifications=None,
     Tc_head=None,
     cfg=None,
+    stream=False,
 ):
     """Take all constructed packets/calibrations/commands and call generation scripts for each table.
 
@@ -31,6 +52,9 @@ def generation_hub(
     are not needed for generation of some tables, which is what this method could be asked to do. However they have to be present
     if a table which is based on them is to be generated.
 
+    The generation of each table (and of the steps it requires beforehand, see :attr:`prerequisites`) is a step of the
+    process, and these steps are run by :obj:`run_steps`, possibly concurrently (see :attr:`workers`).
+
     Args:
         Tm_packets (list): List of TM-packets (their Python representations), each represented by an object of type
             :obj:`mib_generator.construction.TM_packet.TM_packet`.
@@ -44,68 +68,160 @@ def generation_hub(
             type :obj:`mib_generator.construction.calib.verification`.
         Tc_head (construction.TC_packet.TC_header): A header included in all TC-commands.
         cfg (list): List of names of the MIB tables to be generated. Otherwise a default list stated in the config file is used.
+        stream (bool): If ``True``, each table is written row by row directly into its ``.dat`` file as it is generated (see
+            :obj:`mib_generator.generation.gener_methods.mib_writer`), so that the whole tables never have to be held in
+            memory. ``False`` by default.
 
     Returns:
-        dict: A dictionary holding all the generated mib tables (in form of Python 2D lists) with their names as keys.
+        dict: A dictionary holding all the generated mib tables (in form of Python 2D lists) with their names as keys. If
+        ``stream`` is ``True``, the values are paths to the saved files instead.
     """
     if cfg is None:
         to_be = load.conf["mib"]
     else:
         to_be = cfg
-
-    tables = {}
+    sources = [
+        [{"mcf", "lgf", "txf", "txp", "caf", "cap"}, cal_gen, calibrations],
+        [{"pid", "pic", "tpcf", "pcf", "plf", "cur", "vpd"}, Tmp_gen, Tm_packets],
+        [{"ccf", "cpc", "cdf", "prf", "prv", "cvp"}, Tcp_gen, Tc_packets],
+        [{"tcp", "pcpc", "pcdf"}, Tch_gen, None if Tc_head is None else [Tc_head]],
+        [{"paf", "pas"}, dec_gen, decalibrations],
+        [{"cvs"}, ver_gen, verifications],
+    ]
+    steps = {}
+    tables = []
     for i in to_be:
-        if i in {"mcf", "lgf", "txf", "txp", "caf", "cap"}:
-            if calibrations is not None:
-                tables[i] = cal_gen(i, calibrations)
-            else:
-                warn.raises("WGG1", i)
-        elif i in {"pid", "pic", "tpcf", "pcf", "plf", "cur", "vpd"}:
-            if Tm_packets is not None:
-                tables[i] = Tmp_gen(i, Tm_packets)
-            else:
-                warn.raises("WGG1", i)
-        elif i in {"ccf", "cpc", "cdf", "prf", "prv", "cvp"}:
-            if Tc_packets is not None:
-                tables[i] = Tcp_gen(i, Tc_packets)
-            else:
-                warn.raises("WGG1", i)
-        elif i in {"tcp", "pcpc", "pcdf"}:
-            if Tc_head is not None:
-                tables[i] = Tch_gen(i, [Tc_head])
-            else:
-                warn.raises("WGG1", i)
-        elif i in {"paf", "pas"}:
-            if decalibrations is not None:
-                tables[i] = dec_gen(i, decalibrations)
-            else:
-                warn.raises("WGG1", i)
-        elif i in {"cvs"}:
-            if verifications is not None:
-                tables[i] = ver_gen(i, verifications)
-            else:
-                warn.raises("WGG1", i)
+        if i in tables:
+            continue
+        matched = [l for l in sources if i in l[0]]
+        if not matched:
+            steps["WGG2 " + i] = [warn.raises, ["WGG2", i], []]
+        elif matched[0][2] is None:
+            steps["WGG1 " + i] = [warn.raises, ["WGG1", i], []]
+        elif i in prerequisites.keys():
+            name, function = prerequisites[i]
+            steps[name] = [function, [matched[0][2]], []]
+            steps[i] = [run_gen, [i, matched[0][1], stream], [name]]
+            tables.append(i)
         else:
-            warn.raises("WGG2", i)
+            steps[i] = [run_gen, [i, matched[0][1], stream, matched[0][2]], []]
+            tables.append(i)
+    results = run_steps(steps)
+    return {i: results[i] for i in tables}
+
+
+def run_steps(steps):
+    """Run the steps of the generation process while respecting the dependencies between them.
+
+    If :attr:`workers` allows for more than one thread, the steps are run concurrently in a pool of threads (each step starting
+    once the steps it depends on are finished). The messages raised in each step are collected (see
+    :obj:`mib_generator.data.warn.collect`) and displayed in the order of the steps, each step's ones only after the step is
+    finished (even if it failed), so the output is the same as if the steps were run sequentially.
+
+    Args:
+        steps (dict): Dictionary with names of the steps as keys and lists [function, arguments, dependencies] as values,
+            where dependencies are names of steps whose results are passed to the function as additional arguments. Each
+            step has to be preceded by the steps it depends on.
+
+    Returns:
+        dict: Dictionary with names of the steps as keys and their results as values.
+    """
+    results = {}
+    count = workers if workers else os.cpu_count()
+    if (count or 1) <= 1 or len(steps) <= 1:
+        for i in steps:
+            depend = [results[l] for l in steps[i][2]]
+            results[i] = steps[i][0](*steps[i][1], *depend)
+        return results
+    messages = {i: [] for i in steps}
+    with ThreadPoolExecutor(min(count, len(steps))) as pool:
+        futures = {}
+        for i in steps:
+            # steps are queued in order, so the steps a step waits for have always already started
+            depend = [futures[l] for l in steps[i][2]]
+            futures[i] = pool.submit(run_step, steps[i], depend, messages[i])
+        for i in steps:
+            try:
+                results[i] = futures[i].result()
+            finally:
+                for l in messages[i]:
+                    warn.show(*l)
+    return results
+
+
+def run_step(step, depend, messages):
+    """Run one step of the generation process in a worker thread.
+
+    Args:
+        step (list): The step as a list [function, arguments, dependencies] (see :obj:`run_steps`).
+        depend (list): Futures of the steps this step depends on.
+        messages (list): List into which the messages raised during this step are collected.
+
+    Returns:
+        object: The result of the step.
+    """
+    warn.collect(messages)
+    try:
+        return step[0](*step[1], *[i.result() for i in depend])
+    finally:
+        warn.collect(None)
+
+
+def mnemon_step(typ, packets):
+    """Check the mnemonics of the packets/commands for the given table and pass them on for its generation.
+
+    Args:
+        typ (str): Name of the MIB table for which the mnemonics are checked.
+        packets (list): List of packets/commands from which the table is to be constructed.
+
+    Returns:
+        list: The passed packets/commands.
+    """
+    gm.mnemon_check(packets, typ)
+    return packets
+
+
+def run_gen(typ, function, stream, source):
+    """Generate the given MIB table either in memory or directly into its file.
+
+    Args:
+        typ (str): Name of the MIB table to be generated.
+        function (function): One of the generation functions in this module (e.g. :obj:`cal_gen`) which is used to
+            generate the table.
+        stream (bool): ``True`` if the rows of the table should be written directly into its ``.dat`` file as they are
+            generated, ``False`` if the table should be returned.
+        source (list): List of objects from which the table is to be constructed.
 
-    return tables
+    Returns:
+        list or str: A 2D list (list of lists) representing the outputted MIB table or the path to the saved file.
+    """
+    with profiling.phase("table " + typ) as record, warn.context(table=typ):
+        if not stream:
+            table = function(typ, source)
+            record["rows"] = len(table)
+            return table
+        with gm.mib_writer(typ) as out:
+            function(typ, source, out)
+        record["rows"] = out.rows
+    return out.path
 
 
 def save_tables(tables):
     """Reformat and save mib tables in the passed dictionary.
 
-    Goes through the passed dictionary holding mib tables and for each first reformats it into an appropriate ASCII string and then
-    saves it to the specified folder with all mib tables.
+    Goes through the passed dictionary holding mib tables and for each writes its rows (reformatted into the ASCII format) to
+    a file in the specified folder with all mib tables.
 
     Args:
         tables (dict): A dictionary containing mib tables in the form of 2D Python lists as values with their names as keys.
     """
     for i in tables:
-        mib = gm.list_to_mib(tables[i])
-        gm.save_mib(mib, i)
+        with gm.mib_writer(i) as out:
+            for l in tables[i]:
+                out.write(l)
 
 
-def cal_gen(typ, calibrations):
+def cal_gen(typ, calibrations, out=None):
     """Choose how the given calibration MIB table should be constructed and construct it.
 
     Based on its name, this function chooses what method to call in order to generate and check the given table. It then
@@ -115,26 +231,28 @@ def cal_gen(typ, calibrations):
         typ (str): Name of the MIB table to be generated.
         calibrations (list): List of dictionaries of calibrations from which the table is to be constructed. Each calibration
             is of some type which is a child-class of :obj:`mib_generator.construction.calib.calib`.
+        out (gener_methods.mib_writer): If given, the writer into which the rows of the table are written.
 
     Returns:
-        list: A 2D list (list of lists) representing the outputted MIB table (still in Python format).
+        list or None: A 2D list (list of lists) representing the outputted MIB table (still in Python format) or ``None``
+        if the table was written into ``out``.
     """
     match typ:
         case "mcf":
-            return gm.one_generate(calibrations["mcfs"], "mcf")
+            return gm.one_generate(calibrations["mcfs"], "mcf", out)
         case "lgf":
-            return gm.one_generate(calibrations["lgfs"], "lgf")
+            return gm.one_generate(calibrations["lgfs"], "lgf", out)
         case "txf":
-            return gm.one_generate(calibrations["txfs"], "txf")
+            return gm.one_generate(calibrations["txfs"], "txf", out)
         case "txp":
-            return gm.two_generate(calibrations["txfs"], "txp")
+            return gm.two_generate(calibrations["txfs"], "txp", out)
         case "caf":
-            return gm.one_generate(calibrations["cafs"], "caf")
+            return gm.one_generate(calibrations["cafs"], "caf", out)
         case "cap":
-            return gm.two_generate(calibrations["cafs"], "cap")
+            return gm.two_generate(calibrations["cafs"], "cap", out)
 
 
-def Tmp_gen(typ, Tm_packets):
+def Tmp_gen(typ, Tm_packets, out=None):
     """Choose how the given Tm-packet MIB table should be constructed and construct it.
 
     Based on its name, this function chooses what method to call in order to generate and check the given table. It then
@@ -142,37 +260,38 @@ def Tmp_gen(typ, Tm_packets):
 
     The special case here is with respect to the pic table in case of which, first a filter on the packet list have to be run
     since the entries in the pic table are a subset of those in pid/list of packages and hence otherwise false warning would
-    be raised later (due to lack of uniqueness).
+    be raised later (due to lack of uniqueness). This filter is run beforehand by :obj:`generation_hub` (see
+    :attr:`prerequisites`), so the passed packets are expected to be already filtered for this table.
 
     Args:
         typ (str): Name of the MIB table to be generated.
         Tm_packets (list): List of Tm-packets from which the table is to be constructed. Each of type
             :obj:`mib_generator.construction.TM_packet.TM_packet`.
+        out (gener_methods.mib_writer): If given, the writer into which the rows of the table are written.
 
     Returns:
-        list: A 2D list (list of lists) representing the outputted MIB table (still in Python format).
+        list or None: A 2D list (list of lists) representing the outputted MIB table (still in Python format) or ``None``
+        if the table was written into ``out``.
     """
     match typ:
         case "pid":
-            return gm.one_generate(Tm_packets, "pid")
+            return gm.one_generate(Tm_packets, "pid", out)
         case "pic":
-            # the infamous pic filter
-            pic_packets = gm.pic_filter(Tm_packets)
-            return gm.one_generate(pic_packets, "pic")
+            # the packets are expected to have already passed the infamous pic filter
+            return gm.one_generate(Tm_packets, "pic", out)
         case "tpcf":
-            return gm.one_generate(Tm_packets, "tpcf")
+            return gm.one_generate(Tm_packets, "tpcf", out)
         case "pcf":
-            gm.mnemon_check(Tm_packets, "pcf")
-            return gm.two_generate(Tm_packets, "pcf")
+            return gm.two_generate(Tm_packets, "pcf", out)
         case "plf":
-            return gm.two_generate(Tm_packets, "plf")
+            return gm.two_generate(Tm_packets, "plf", out)
         case "cur":
-            return gm.two_generate(Tm_packets, "cur")
+            return gm.two_generate(Tm_packets, "cur", out)
         case "vpd":
-            return gm.two_generate(Tm_packets, "vpd")
+            return gm.two_generate(Tm_packets, "vpd", out)
 
 
-def Tcp_gen(typ, Tc_packets):
+def Tcp_gen(typ, Tc_packets, out=None):
     """Choose how the given Tc-packet MIB table should be constructed and construct it.
 
     Based on its name, this function chooses what method to call in order to generate and check the given table. It then
@@ -182,28 +301,28 @@ def Tcp_gen(typ, Tc_packets):
         typ (str): Name of the MIB table to be generated.
         Tc_packets (list): List of Tc-packets from which the table is to be constructed. Each of type
             :obj:`mib_generator.construction.TC_packet.TC_packet`.
+        out (gener_methods.mib_writer): If given, the writer into which the rows of the table are written.
 
     Returns:
-        list: A 2D list (list of lists) representing the outputted MIB table (still in Python format).
+        list or None: A 2D list (list of lists) representing the outputted MIB table (still in Python format) or ``None``
+        if the table was written into ``out``.
     """
     match typ:
         case "ccf":
-            gm.mnemon_check(Tc_packets, "ccf")
-            return gm.one_generate(Tc_packets, "ccf")
+            return gm.one_generate(Tc_packets, "ccf", out)
         case "cpc":
-            gm.mnemon_check(Tc_packets, "cpc")
-            return gm.two_generate(Tc_packets, "cpc")
+            return gm.two_generate(Tc_packets, "cpc", out)
         case "cdf":
-            return gm.two_generate(Tc_packets, "cdf")
+            return gm.two_generate(Tc_packets, "cdf", out)
         case "prf":
-            return gm.two_generate(Tc_packets, "prf")
+            return gm.two_generate(Tc_packets, "prf", out)
         case "prv":
-            return gm.two_generate(Tc_packets, "prv")
+            return gm.two_generate(Tc_packets, "prv", out)
         case "cvp":
-            return gm.two_generate(Tc_packets, "cvp")
+            return gm.two_generate(Tc_packets, "cvp", out)
 
 
-def Tch_gen(typ, Tc_head):
+def Tch_gen(typ, Tc_head, out=None):
     """Choose how the given Tc-header MIB table should be constructed and construct it.
 
     Based on its name, this function chooses what method to call in order to generate and check the given table. It then
@@ -213,20 +332,22 @@ def Tch_gen(typ, Tc_head):
         typ (str): Name of the MIB table to be generated.
         Tc_head (list): List of Tc-headers from which the table is to be constructed. Each of type
             :obj:`mib_generator.construction.TC_packet.TC_header`.
+        out (gener_methods.mib_writer): If given, the writer into which the rows of the table are written.
 
     Returns:
-        list: A 2D list (list of lists) representing the outputted MIB table (still in Python format).
+        list or None: A 2D list (list of lists) representing the outputted MIB table (still in Python format) or ``None``
+        if the table was written into ``out``.
     """
     match typ:
         case "tcp":
-            return gm.one_generate(Tc_head, "tcp")
+            return gm.one_generate(Tc_head, "tcp", out)
         case "pcpc":
-            return gm.two_generate(Tc_head, "pcpc")
+            return gm.two_generate(Tc_head, "pcpc", out)
         case "pcdf":
-            return gm.two_generate(Tc_head, "pcdf")
+            return gm.two_generate(Tc_head, "pcdf", out)
 
 
-def dec_gen(typ, decalibrations):
+def dec_gen(typ, decalibrations, out=None):
     """Choose how the given decalibration MIB table should be constructed and construct it.
 
     Based on its name, this function chooses what method to call in order to generate and check the given table. It then
@@ -236,18 +357,20 @@ def dec_gen(typ, decalibrations):
         typ (str): Name of the MIB table to be generated.
         decalibrations (list): List of decalibrations from which the table is to be constructed. Each of type
             :obj:`mib_generator.construction.calib.decalib`.
+        out (gener_methods.mib_writer): If given, the writer into which the rows of the table are written.
 
     Returns:
-        list: A 2D list (list of lists) representing the outputted MIB table (still in Python format).
+        list or None: A 2D list (list of lists) representing the outputted MIB table (still in Python format) or ``None``
+        if the table was written into ``out``.
     """
     match typ:
         case "paf":
-            return gm.one_generate(decalibrations, "paf")
+            return gm.one_generate(decalibrations, "paf", out)
         case "pas":
-            return gm.two_generate(decalibrations, "pas")
+            return gm.two_generate(decalibrations, "pas", out)
 
 
-def ver_gen(typ, verifications):
+def ver_gen(typ, verifications, out=None):
     """Choose how the given verification MIB table should be constructed and construct it.
 
     Based on its name, this function chooses what method to call in order to generate and check the given table. It then
@@ -257,10 +380,12 @@ def ver_gen(typ, verifications):
         typ (str): Name of the MIB table to be generated.
         verifications (list): List of verifications from which the table is to be constructed. Each of type
             :obj:`mib_generator.construction.calib.verification`.
+        out (gener_methods.mib_writer): If given, the writer into which the rows of the table are written.
 
     Returns:
-        list: A 2D list (list of lists) representing the outputted MIB table (still in Python format).
+        list or None: A 2D list (list of lists) representing the outputted MIB table (still in Python format) or ``None``
+        if the table was written into ``out``.
     """
     match typ:
         case "cvs":
-            return gm.one_generate(verifications, "cvs")
+            return gm.one_generate(verifications, "cvs", out)
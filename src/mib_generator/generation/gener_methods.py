@@ -4,8 +4,11 @@ This module holds methods that help with generation, checking and saving of MIB
 representations of Tm/Tc packets, calibrations, etc..
 """
 
+import os
+
 import mib_generator.data.longdata as longdata
 import mib_generator.data.warn as warn
+import mib_generator.generation.manifest as manifest
 import mib_generator.parsing.load as load
 
 
@@ -32,16 +35,81 @@ def save_mib(mib, name):
     """Save the string-MIB database into the specified folder.
 
     This function saves the passed string into a file named with the passed name (+.dat ending) at the location specified in
-    :obj:`mib_generator.parsing.load.out_dir`.
+    :obj:`mib_generator.parsing.load.out_dir`. The file is written using :obj:`mib_writer`, so it is replaced atomically.
 
     Args:
         mib (str): The string to be saved into a file
         name (str): Name of the file (+.dat) the string will be saved into.
     """
-    path = load.out_dir + "/" + name + ".dat"
-    fil = open(path, "w")
-    fil.write(mib)
-    fil.close()
+    with mib_writer(name) as out:
+        out.file.write(mib)
+
+
+class mib_writer:
+    """Class representing an MIB ``.dat`` file which is being written row by row.
+
+    The rows are written through a buffered file into a temporary file next to the target one, which is then renamed to the
+    target name when the writer is closed. Hence an interrupted generation never leaves a half-written table behind (the
+    previous version of the file is kept instead). This class is meant to be used as a context manager, which discards the
+    temporary file if an exception occurs.
+
+    Args:
+        name (str): Name of the MIB table, i.e. of the file (+.dat) in :obj:`mib_generator.parsing.load.out_dir`.
+
+    Attributes:
+        path (str): Path to the target file.
+        temp (str): Path to the temporary file being written.
+        file (io.TextIOWrapper): The opened temporary file.
+        rows (int): Number of rows written so far.
+        kept (bool): ``True`` if the previously saved file is to be kept instead of the written one (see :obj:`keep`).
+    """
+
+    def __init__(self, name):
+        self.path = load.out_dir + "/" + name + ".dat"
+        self.temp = self.path + "." + str(os.getpid()) + ".tmp"
+        self.file = open(self.temp, "w", buffering=1 << 16)
+        self.rows = 0
+        self.kept = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, typ, value, traceback):
+        if typ is None:
+            self.close()
+        else:
+            self.discard()
+
+    def write(self, row):
+        """Write one row of the MIB table into the file.
+
+        The entries in the row are joined with \\\ t and the rows are separated by \\\ n (same as in :obj:`list_to_mib`).
+
+        Args:
+            row (list): List of (string) entries in the row.
+        """
+        if self.rows:
+            self.file.write("\n")
+        self.file.write("\t".join(row))
+        self.rows += 1
+
+    def close(self):
+        """Finish the writing and move the written file to its target path."""
+        if self.kept:
+            return
+        self.file.close()
+        os.replace(self.temp, self.path)
+
+    def keep(self):
+        """Abandon the writing and keep the previously saved file (e.g. because the table didn't change)."""
+        self.discard()
+        self.kept = True
+
+    def discard(self):
+        """Abandon the writing and delete the temporary file (leaving the target file untouched)."""
+        self.file.close()
+        if os.path.isfile(self.temp):
+            os.remove(self.temp)
 
 
 def check(value, typ):
@@ -70,60 +138,6 @@ def check(value, typ):
     return True
 
 
-def delete_empty(table):
-    """Delete empty entries in arrays.
-
-    This function goes through list of dictionaries to be made into MIB tables, and removes every empty (equal to ``""``) entry
-    it finds. This is done so that the later tests trigger appropriate warnings.
-
-    Args:
-        table (list): List of dictionaries, each one representing a row of an MIB table, which is to be cleaned from empty
-            entries.
-    """
-    for i in range(len(table)):
-        dic = {}
-        for l in table[i]:
-            if table[i][l] not in {"", None}:
-                dic[l] = table[i][l]
-        table[i] = dic
-
-
-def exclude_repetition(table, typ):
-    """Exclude repetition in columns where there should be unique entries.
-
-    This function checks whether there is any repetition in columns where entries should be unique in the passed MIB table
-    and if so, deletes the additional rows and raises a warning. (the required uniqueness of entries for a given MIB table
-    is defined in :obj:`mib_generator.data.longdata.unique_entries`)
-
-    Args:
-        table (list): List of dictionaries which represents the MIB database to be checked for repetition.
-        typ (str): The name of the MIB database the passed table adheres to.
-    """
-    constraints = longdata.unique_entries[typ]
-    redundance = set()
-    for i in constraints:
-        bare_table = []
-        for l in table:
-            bare_table.append([l[x - 1] for x in i])
-        for x in range(len(bare_table)):
-            for y in range(len(bare_table)):
-                if (
-                    bare_table[x] == bare_table[y]
-                    and y > x
-                    and "".join(bare_table[x]) != ""
-                ):
-                    redundance.add(y)
-    redundance = sorted(redundance)
-    if redundance:
-        stradd = "\n\tThe content of these rows is:"
-        for i in redundance:
-            stradd = stradd + "\n\t" + str(table[i])
-        warn.raises("WGM1", typ, str(redundance)[1:-1], stradd)
-    indexes = sorted(list(redundance), reverse=True)
-    for i in indexes:
-        table.pop(i)
-
-
 def pic_filter(packets):
     """Check whether the information saved in the list of Tm-packet is self-consistent and prune it for generation of pic.
 
@@ -135,6 +149,10 @@ def pic_filter(packets):
     suspicious. Finally it deletes all (valid) repetition in types/subtypes it finds, so that pic table can be directly
     generated from the output list of packets without raising further exceptions.
 
+    The packets are first grouped by their type, subtype and apid, so that each packet is compared only with the packets
+    which share these with it (and if all packets in a group agree on the additional identification field, all but the
+    first one are directly marked as repeated).
+
     Args:
         packets (list):
             List of representations of Tm-packets, each of type :obj:`mib_generator.construction.TM_packet.TM_packet`.
@@ -146,32 +164,43 @@ def pic_filter(packets):
             This list corresponds to the pic table.
 
     """
+    keys = []
+    positions = []
+    groups = {}
+    for i in range(len(packets)):
+        pic = packets[i].pic
+        keys.append((pic["PIC_TYPE"], pic["PIC_STYPE"], pic["PIC_APID"]))
+        positions.append(len(groups.setdefault(keys[-1], [])))
+        groups[keys[-1]].append(i)
+    # groups in which all packets have the same valid position of the additional identification field
+    uniform = {}
+    for i in groups.keys():
+        offsets = {packets[l].pic["PIC_PI1_OFF"] for l in groups[i]}
+        uniform[i] = len(offsets) == 1 and not {-1, "-1"} & offsets
     repete = set()
     for x in range(len(packets)):
-        for y in range(x + 1, len(packets)):
-            x1 = packets[x].pic["PIC_TYPE"]
-            x2 = packets[x].pic["PIC_STYPE"]
-            x3 = packets[x].pic["PIC_PI1_OFF"]
-            x7 = packets[x].pic["PIC_APID"]
-            y1 = packets[y].pic["PIC_TYPE"]
-            y2 = packets[y].pic["PIC_STYPE"]
+        group = groups[keys[x]]
+        if uniform[keys[x]]:
+            if positions[x] > 0:
+                repete.add(x)
+            continue
+        x3 = packets[x].pic["PIC_PI1_OFF"]
+        for y in group[positions[x] + 1 :]:
             y3 = packets[y].pic["PIC_PI1_OFF"]
-            y7 = packets[y].pic["PIC_APID"]
-            if (x1, x2, x7) == (y1, y2, y7):
-                if x3 != y3:
-                    warn.raises(
-                        "WGM2",
-                        str(packets[x].pid["PID_SPID"]),
-                        str(packets[y].pid["PID_SPID"]),
-                    )
-                elif {-1, "-1"} & {x3, y3}:
-                    warn.raises(
-                        "WGM3",
-                        str(packets[x].pid["PID_SPID"]),
-                        str(packets[y].pid["PID_SPID"]),
-                    )
-                else:
-                    repete.add(y)
+            if x3 != y3:
+                warn.raises(
+                    "WGM2",
+                    str(packets[x].pid["PID_SPID"]),
+                    str(packets[y].pid["PID_SPID"]),
+                )
+            elif {-1, "-1"} & {x3, y3}:
+                warn.raises(
+                    "WGM3",
+                    str(packets[x].pid["PID_SPID"]),
+                    str(packets[y].pid["PID_SPID"]),
+                )
+            else:
+                repete.add(y)
     filtered_packets = []
     for i in range(len(packets)):
         if i not in repete:
@@ -218,32 +247,63 @@ def mnemon_check(packets, typ):
                     lis.add(mnem)
 
     if repeat:
-        stradd = "\n\tThe repeating mnemonics are:\n\t" + str(repeat)
+        # sorted, so that the message doesn't depend on the hash seed
+        listed = "{" + ", ".join(sorted(repr(i) for i in repeat)) + "}"
+        stradd = "\n\tThe repeating mnemonics are:\n\t" + listed
         warn.raises("WGM6", typ, stradd)
 
 
-def generate(table_type, source):
-    """From a list of dictionaries (per rows) generate a MIB table of a given type.
+def clean_row(row):
+    """Delete empty entries in a row.
+
+    This function removes every empty (equal to ``""``) entry from a dictionary to be made into a row of an MIB table. This is
+    done so that the later tests trigger appropriate warnings.
+
+    Args:
+        row (dict): Dictionary representing a row of an MIB table, which is to be cleaned from empty entries.
+
+    Returns:
+        dict: The cleaned dictionary.
+    """
+    dic = {}
+    for l in row:
+        if row[l] not in {"", None}:
+            dic[l] = row[l]
+    return dic
+
+
+def generate_rows(table_type, source):
+    """From dictionaries (per rows) generate rows of a MIB table of a given type one by one.
 
-    This function generates and saves the MIB database in the following steps:
+    This function generates the rows of the MIB database in the following steps:
 
         1. Based on the passed MIB table name, looks up what entries/columns the generated table should have
            (it takes this information from :obj:`mib_generator.data.longdata.tables_format`).
-        2. From the passed list of dictionaries it creates a 2D list (list of lists) mirroring the structure of the MIB table.
-        3. While doing that it runs some checks of type and uniqueness of the entries.
+        2. For each passed dictionary (with empty entries removed by :obj:`clean_row`) it creates a list of entries mirroring
+           the structure of the MIB table, while running some checks of type of the entries.
+        3. It checks whether there is any repetition in columns where entries should be unique (as defined in
+           :obj:`mib_generator.data.longdata.unique_entries`) and if so, leaves out the additional rows. For each of the
+           uniqueness constraints, the values in the constrained columns of the already generated rows are kept in a set, so
+           that each row can be checked for repetition in a constant time. After all rows are generated, a warning listing
+           all the left out rows is raised.
 
+    Since the rows are generated lazily, only one of them has to be held in memory at a time (e.g. when they are directly
+    written into a file by :obj:`mib_writer`).
 
     Args:
         table_type (str): The name of the MIB database the passed table adheres to.
-        table (list): List of dictionaries which correspond to the rows of the MIB table with the appropriate entries.
+        source (iterable): Dictionaries which correspond to the rows of the MIB table with the appropriate entries.
 
-    Returns:
-        list: A 2D list (list of lists) representing the generated MIB table
+    Yields:
+        list: List of the entries of a row of the generated MIB table.
     """
     columns = longdata.tables_format[table_type]
-    table = []
+    constraints = longdata.unique_entries[table_type]
+    seen = [set() for i in constraints]
+    redundance = []
     row_ind = 1
     for i in source:
+        i = clean_row(i)
         row = []
         for l in columns:
             if l["name"] in i.keys():
@@ -258,57 +318,88 @@ def generate(table_type, source):
                 if l["mandatory"]:
                     warn.raises("WGM5", table_type, l["name"], str(row_ind))
 
-        table.append(row)
+        repeated = False
+        for l in range(len(constraints)):
+            bare_row = tuple(row[x - 1] for x in constraints[l])
+            if bare_row in seen[l]:
+                repeated = True
+            elif "".join(bare_row) != "":
+                seen[l].add(bare_row)
+        if repeated:
+            redundance.append([row_ind - 1, row])
+        else:
+            yield row
         row_ind += 1
-    exclude_repetition(table, table_type)
-    return table
+    if redundance:
+        stradd = "\n\tThe content of these rows is:"
+        for i in redundance:
+            stradd = stradd + "\n\t" + str(i[1])
+        indexes = str([i[0] for i in redundance])[1:-1]
+        warn.raises("WGM1", table_type, indexes, stradd)
+
+
+def generate(table_type, source, out=None):
+    """From a list of dictionaries (per rows) generate a MIB table of a given type.
+
+    The rows are generated by :obj:`generate_rows` and either collected into a 2D list or (if a writer is passed) written
+    directly into the file. In the latter case, if the incremental regeneration is enabled and the rows are the same as in
+    the previous run (see :obj:`mib_generator.generation.manifest.unchanged`), the previously saved file is kept instead.
 
+    Args:
+        table_type (str): The name of the MIB database the passed table adheres to.
+        source (iterable): Dictionaries which correspond to the rows of the MIB table with the appropriate entries.
+        out (mib_writer): If given, the writer into which the rows are written.
 
-def one_generate(lists, name):
+    Returns:
+        list or None: A 2D list (list of lists) representing the generated MIB table or ``None`` if the rows were written
+        into ``out``.
+    """
+    if out is None:
+        return list(generate_rows(table_type, source))
+    if manifest.enabled:
+        source = list(source)
+        if manifest.unchanged(table_type, source):
+            out.keep()
+            return
+    for i in generate_rows(table_type, source):
+        out.write(i)
+
+
+def one_generate(lists, name, out=None):
     """Generate MIB database of the given name from the passed list of objects.
 
-    This method does a few precursor steps to the generation process. For each of the objects in the passed list, it
-    extracts the appropriate dictionary corresponding to the row in the MIB table associated to the object and appends this
-    dictionary (alias row) to a list of all rows for this table. It then passes the resulting list through a "filter" which
-    erases all entries left empty (method :obj:`delete_empty`) and calls the main generation method :obj:`generate` with
-    this list.
+    This method does a precursor step to the generation process. For each of the objects in the passed list, it
+    extracts the appropriate dictionary corresponding to the row in the MIB table associated to the object and passes these
+    dictionaries (alias rows) to the main generation method :obj:`generate`.
 
     Args:
         lists (list): List of the objects (these can be of many types) the rows of the MIB tables (as dictionaries) are
             associated to.
         name (str): Name of the MIB table that is to be generated from these objects.
+        out (mib_writer): If given, the writer into which the rows are written.
 
     Returns:
-        list: A 2D list (list of lists) representing the generated MIB table
+        list or None: A 2D list (list of lists) representing the generated MIB table or ``None`` if it was written into
+        ``out``.
     """
-    rows = []
-    for i in lists:
-        rows.append(vars(i)[name])
-    delete_empty(rows)
-    return generate(name, rows)
+    return generate(name, (vars(i)[name] for i in lists), out)
 
 
-def two_generate(lists, name):
+def two_generate(lists, name, out=None):
     """Generate MIB database of the given name from the passed list of objects.
 
-    This method does a few precursor steps to the generation process. For each of the objects in the passed list, it
+    This method does a precursor step to the generation process. For each of the objects in the passed list, it
     extracts the appropriate dictionaries (in a list) corresponding to the rows in the MIB table associated to the object
-    and appends these dictionaries (alias rows) to a list of all rows for this table. It then passes the resulting list
-    through a "filter" which erases all entries left empty (method :obj:`delete_empty`) and calls the main generation
-    method :obj:`generate` with this list.
+    and passes these dictionaries (alias rows) to the main generation method :obj:`generate`.
 
     Args:
         lists (list): List of the objects (these can be of many types) the rows of the MIB tables (as dictionaries) are
             associated to.
         name (str): Name of the MIB table that is to be generated from these objects.
+        out (mib_writer): If given, the writer into which the rows are written.
 
     Returns:
-        list: A 2D list (list of lists) representing the generated MIB table
+        list or None: A 2D list (list of lists) representing the generated MIB table or ``None`` if it was written into
+        ``out``.
     """
-    rows = []
-    rows = []
-    for i in lists:
-        for l in vars(i)[name]:
-            rows.append(l)
-    delete_empty(rows)
-    return generate(name, rows)
+    return generate(name, (l for i in lists for l in vars(i)[name]), out)
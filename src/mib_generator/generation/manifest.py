@@ -0,0 +1,350 @@
+"""Manifest of the inputs from which the MIB tables were generated, allowing for incremental regeneration.
+
+When the incremental regeneration is enabled, a manifest is saved next to the generated MIB tables (into
+:obj:`mib_generator.parsing.load.out_dir`). For each TM-packet and TC-command it records the parsed C-objects and
+comments which fed its construction (see :obj:`packet`) together with a digest of their contents and the rows of the MIB
+tables constructed from it. For each MIB table it records a digest of the rows the table was generated from.
+
+On the next run, the packets/commands whose inputs didn't change are not constructed again, instead their rows are
+taken from the manifest (see :obj:`cached`), and the MIB tables whose rows didn't change are not generated and written
+again (see :obj:`unchanged`). The warnings raised during the construction/generation of these are hence not repeated.
+
+The inputs of a packet/command are its description in the ``.c`` file (TM only), its comment and structure, all the
+structures the structure refers to (recursively) and the header common to all packets/commands. Further, all the names
+found in these (C identifiers and json5 strings) are looked up in :obj:`mib_generator.parsing.load.enumerations` and in the
+indexes of calibrations/decalibrations, so that a change of e.g. a macro or a calibration the packet uses is recognised
+too. The manifest of the previous run is used only if it was made by the same version of the program with the same
+configuration (see :obj:`fingerprint`).
+
+Attributes:
+    enabled (bool): Whether the incremental regeneration is used at all (set by :obj:`start`).
+    reuse (bool): Whether the packets/commands can be taken from the previous run (this is not possible e.g. when the
+        ``.docx`` document, which needs the whole packets, is generated).
+    previous (dict): The manifest saved by the previous run (empty if there is none or if it can't be used).
+    current (dict): The manifest recorded during this run.
+    origins (dict): Dictionary with ids of the parsed C-objects and comments as keys and pairs [path, file] of the files
+        they were found in as values (recorded even without the incremental regeneration, see :obj:`source`).
+    walked (dict): Memoised lists of C-objects and comments on which the structures depend (see :obj:`walk`) with
+        ids of the structures as keys.
+    name_pattern (re.Pattern): Pattern matching the names (C identifiers and json5 strings) in the texts of the inputs.
+"""
+import bisect
+import hashlib
+import json
+import os
+import re
+
+import mib_generator.data.warn as warn
+import mib_generator.parsing.cache as cache
+import mib_generator.parsing.load as load
+import mib_generator.parsing.macros as macros
+import mib_generator.parsing.symbols as symbols
+
+enabled = False
+reuse = True
+previous = {}
+current = {}
+origins = {}
+walked = {}
+
+name_pattern = re.compile(r"\"([^\"]*)\"|'([^']*)'|(\w+)")
+
+
+class cached:
+    """Stand-in for a TM-packet/TC-command whose inputs didn't change since the previous run.
+
+    It holds only the rows of the MIB tables constructed from the packet/command in the previous run, as attributes named
+    by the tables (the same way as :obj:`mib_generator.construction.TM_packet.TM_packet` and
+    :obj:`mib_generator.construction.TC_packet.TC_packet` do), which is all the generation needs.
+
+    Args:
+        rows (dict): Dictionary with names of the MIB tables as keys and the rows (as dictionaries or lists of them) as
+            values.
+    """
+
+    def __init__(self, rows):
+        for i in rows:
+            setattr(self, i, rows[i])
+
+
+def path():
+    """Give path to the manifest file.
+
+    Returns:
+        str: Path to the manifest file.
+    """
+    return load.out_dir + "/mib_manifest.json"
+
+
+def fingerprint():
+    """Create a string identifying the version of the program and the configuration the manifest was made with.
+
+    Apart from the :obj:`mib_generator.parsing.cache.fingerprint` of the parser, the contents of the construction and
+    generation modules, the loaded configuration and the pre-processor symbols given on the command line are hashed,
+    since any change to these can change the generated tables.
+
+    Returns:
+        str: The identifying string.
+    """
+    digest = hashlib.sha256(cache.fingerprint().encode())
+    base = os.path.dirname(os.path.dirname(__file__))
+    for l in ["construction", "generation", "data"]:
+        for i in sorted(os.listdir(os.path.join(base, l))):
+            if i.endswith(".py"):
+                with open(os.path.join(base, l, i), "rb") as fil:
+                    digest.update(fil.read())
+    digest.update(json.dumps(load.conf, sort_keys=True, default=str).encode())
+    command = (sorted(macros.defined.items()), sorted(macros.undefined), macros.policy)
+    digest.update(repr(command).encode())
+    return digest.hexdigest()
+
+
+def start(incremental, reusable=True):
+    """Start recording a new manifest and load the one saved by the previous run.
+
+    If the previous run happened in this same process (e.g. in the watch mode), its manifest is taken directly from
+    :attr:`current` instead of being loaded from the file. Has to be called after the files are parsed by :obj:`mib_generator.parsing.load.load_all`.
+
+    Args:
+        incremental (bool): ``True`` if the incremental regeneration should be used, ``False`` otherwise.
+        reusable (bool): ``True`` (by default) if the packets/commands can be taken from the previous run.
+    """
+    recorded = current if enabled else {}
+    globals()["enabled"] = incremental
+    globals()["reuse"] = reusable
+    globals()["previous"] = {}
+    globals()["current"] = {}
+    origins.clear()
+    walked.clear()
+    groups = [
+        [load.TmH, load.TmH_path],
+        [load.TcH, load.TcH_path],
+        [load.TcTmH, load.TcTmH_path],
+        [load.TmC, load.TmC_path],
+    ]
+    for files, paths in groups:
+        for file, name in zip(files or [], paths or []):
+            for i in file.structures + file.comments:
+                origins[id(i)] = [name, file]
+                # elements of the top-level objects (e.g. the packets in the array in the ``.c`` file) can be inputs too
+                for l in getattr(i, "elements", []):
+                    origins[id(l)] = [name, file]
+    if not incremental:
+        return
+    version = fingerprint()
+    globals()["current"] = {"version": version, "packets": {}, "tables": {}}
+    if recorded.get("version") == version:
+        # the manifest recorded (and saved) in the previous run in this same process
+        globals()["previous"] = recorded
+    elif os.path.isfile(path()):
+        try:
+            with open(path(), "r") as fil:
+                loaded = json.load(fil)
+            if loaded["version"] == version:
+                globals()["previous"] = loaded
+        except:
+            warn.raises("WGN1", path())
+
+
+def walk(struct):
+    """Find all the C-objects and comments on which the given structure depends.
+
+    These are the structure itself, the comments attached to it and its elements and (recursively) all the structures its
+    elements refer to by name (all C-objects with such name in the header files, so that e.g. a newly added structure of
+    the same name is also recognised).
+
+    Args:
+        struct (object): The C-object (of some child-class of :obj:`mib_generator.parsing.par_header.structure` or
+            :obj:`mib_generator.parsing.par_cfile.instance_og`) or ``None``.
+
+    Returns:
+        list: List of the C-objects and comments.
+    """
+    if struct is None or type(struct) is int:
+        return []
+    if id(struct) in walked.keys():
+        return walked[id(struct)][1]
+    found = [struct]
+    # registered before the elements are walked through, so that circular references end here
+    walked[id(struct)] = [struct, found]
+    seen = {id(struct)}
+    stack = [struct]
+    while stack:
+        i = stack.pop()
+        referred = list(i.comment)
+        for l in getattr(i, "elements", []):
+            form = getattr(l, "form", None)
+            if type(form) is str:
+                for x in symbols.named(form, load.TmH, load.TcH, load.TcTmH):
+                    referred += walk(x)
+            elif form is not None:
+                stack.append(form)
+            stack.append(l)
+        for l in referred:
+            if id(l) not in seen:
+                seen.add(id(l))
+                found.append(l)
+    return found
+
+
+def source(obj):
+    """Describe where the given C-object or comment was found.
+
+    Args:
+        obj (object): The C-object or comment.
+
+    Returns:
+        dict: Dictionary with the path of the file, the line, the offset (in characters from the start of the file) and
+        the kind (and name) of the object.
+    """
+    desc = {"file": None, "line": None, "offset": None, "object": "comment"}
+    if hasattr(obj, "type"):
+        desc["object"] = str(obj.type) + " " + str(getattr(obj, "name", "")).strip()
+    if id(obj) in origins.keys():
+        name, file = origins[id(obj)]
+        desc["file"] = name
+        desc["line"] = bisect.bisect_right(file.lines, obj.start) + 1
+        desc["offset"] = obj.start
+    return desc
+
+
+def digest(objects, indexes):
+    """Create a digest of the contents of the given inputs.
+
+    Apart from the texts of the C-objects and comments, the values of all the names found in them are included, i.e.
+    their values in :obj:`mib_generator.parsing.load.enumerations` and the texts of the calibrations/decalibrations with
+    such names in the passed indexes.
+
+    Args:
+        objects (list): List of the C-objects and comments.
+        indexes (list): List of the indexes (dictionaries with names as keys) of calibrations/decalibrations (as created
+            e.g. by :obj:`mib_generator.construction.calib.calib_index`).
+
+    Returns:
+        str: The digest.
+    """
+    hashed = hashlib.sha256()
+    names = set()
+    for i in objects:
+        hashed.update(repr((type(i).__name__, i.text)).encode())
+        for l in name_pattern.findall(i.text):
+            names.add("".join(l))
+    for i in sorted(names):
+        if i in load.enumerations.keys():
+            hashed.update(repr((i, load.enumerations[i])).encode())
+        for l in indexes:
+            match = l.get(i)
+            if match is not None:
+                hashed.update(repr((i, match.comment.text)).encode())
+    return hashed.hexdigest()
+
+
+def packet(key, objects, indexes, tables, build):
+    """Give the TM-packet/TC-command with the given key, either reused from the previous run or constructed anew.
+
+    If the incremental regeneration is enabled, the inputs of the packet/command and the rows of the MIB tables constructed
+    from it are recorded in the manifest. If the inputs are the same as in the previous run, the packet/command is not
+    constructed and a :obj:`cached` stand-in with the previous rows is returned. The rows are recorded before the generated
+    names are given (see :obj:`mib_generator.construction.TM_packet_methods.resolve_names`), so these are resolved for the
+    reused packets/commands together with the new ones.
+
+    Args:
+        key (str): Key identifying the packet/command (if more of them share it, they are distinguished by their order).
+        objects (list): List of the C-objects and comments from which the packet/command is constructed (duplicates are
+            left out).
+        indexes (list): Indexes of calibrations/decalibrations which might be used by the packet/command (see :obj:`digest`).
+        tables (list): Names of the MIB tables constructed from the packet/command.
+        build (function): Function without arguments which constructs the packet/command.
+
+    Returns:
+        object: The packet/command or its :obj:`cached` stand-in.
+    """
+    if not enabled:
+        return build()
+    count = 1
+    while key + "#" + str(count) in current["packets"].keys():
+        count += 1
+    key = key + "#" + str(count)
+    objects = list({id(i): i for i in objects}.values())
+    inputs = digest(objects, indexes)
+    entry = previous.get("packets", {}).get(key)
+    if reuse and entry is not None and entry["inputs"] == inputs:
+        current["packets"][key] = entry
+        return cached(entry["rows"])
+    made = build()
+    current["packets"][key] = {
+        "inputs": inputs,
+        "sources": [source(i) for i in objects],
+        "rows": {i: vars(made)[i] for i in tables},
+    }
+    return made
+
+
+def unchanged(name, rows):
+    """Check whether the given MIB table would be the same as the one generated by the previous run.
+
+    The digest of the rows the table is generated from is recorded in the manifest and compared to the one recorded in the
+    previous run. The table is unchanged if these are the same and the saved file wasn't changed since (its size and time of
+    modification are the same as recorded).
+
+    Args:
+        name (str): Name of the MIB table.
+        rows (list): Dictionaries which correspond to the rows of the MIB table (before being checked and generated).
+
+    Returns:
+        bool: ``True`` if the table doesn't have to be generated and saved again, ``False`` otherwise.
+    """
+    if not enabled:
+        return False
+    hashed = hashlib.sha256(json.dumps(rows, sort_keys=True).encode()).hexdigest()
+    current["tables"][name] = {"rows": hashed}
+    entry = previous.get("tables", {}).get(name)
+    try:
+        stat = os.stat(load.out_dir + "/" + name + ".dat")
+    except OSError:
+        return False
+    return entry == {"rows": hashed, "size": stat.st_size, "mtime": stat.st_mtime_ns}
+
+
+def save():
+    """Save the recorded manifest next to the generated MIB tables (if the incremental regeneration is enabled).
+
+    The size and time of modification of each of the saved tables is recorded as well, so that a table changed by
+    something else than this program is recognised in the next run. The file is written under a temporary name first and
+    then renamed, so that an interrupted run can't leave a corrupted manifest.
+    """
+    if not enabled:
+        return
+    for i in current["tables"]:
+        try:
+            stat = os.stat(load.out_dir + "/" + i + ".dat")
+        except OSError:
+            continue
+        current["tables"][i]["size"] = stat.st_size
+        current["tables"][i]["mtime"] = stat.st_mtime_ns
+    temp = path() + "." + str(os.getpid()) + ".tmp"
+    try:
+        with open(temp, "w") as fil:
+            json.dump(current, fil)
+        os.replace(temp, path())
+    except:
+        warn.raises("WGN2", path())
+        if os.path.isfile(temp):
+            os.remove(temp)
+    reused = [
+        i
+        for i in current["packets"]
+        if previous.get("packets", {}).get(i) is current["packets"][i]
+    ]
+    kept = [
+        i
+        for i in current["tables"]
+        if previous.get("tables", {}).get(i) == current["tables"][i]
+    ]
+    warn.raises(
+        "CGN1",
+        str(len(reused)),
+        str(len(current["packets"])),
+        str(len(kept)),
+        str(len(current["tables"])),
+    )
@@ -9,7 +9,7 @@ import os
 import sys
 
 import json5
-from PySide6.QtCore import Slot
+from PySide6.QtCore import QTimer, Slot
 from PySide6.QtWidgets import QApplication, QFileDialog, QMainWindow
 
 # Adds the mib-generator package to path so that it can be accessed even if not installed through pip
@@ -49,6 +49,8 @@ class MainWindow(QMainWindow):
     Attributes:
         ui (object): A class imported from :obj:`mib_generator.gui.ui_form` which holds layout and representations
             of all elements of the GUI.
+        flusher (PySide6.QtCore.QTimer): Timer periodically displaying the buffered warnings/errors in the console (see
+            :obj:`mib_generator.data.warn.batch`), so that a flood of them doesn't stall the GUI.
         tms (list): List of TM packet representations created/used by the program. Each of type
             :obj:`mib_generator.construction.TM_packet.TM_packet`.
         TmHead (construction.TM_packet.TM_header): TM header representation created/used by the program.
@@ -73,6 +75,10 @@ class MainWindow(QMainWindow):
         self.setWindowTitle("MIB Generator")
 
         warn.disp_update(self.ui.console)
+        warn.batch(True)
+        self.flusher = QTimer(self)
+        self.flusher.timeout.connect(warn.flush)
+        self.flusher.start(200)
         self.tms = None
         self.TmHead = None
         self.tcs = None
@@ -246,13 +252,14 @@ class MainWindow(QMainWindow):
                 [a for file in load.TcTmH for a in file.comments]
             )
             self.cal = {i: cal1[i] + cal2[i] for i in cal1}
+            cal_index = calib.calib_index(self.cal)
             self.TmHead = tm_packet.TM_header(load.TmH)
             self.tms = []
             for i in load.TmC[0].structures[1].elements:
                 matched = tm_packet_methods.header_search(i.entries[".type"], load.TmH)
                 for k in matched:
                     pack = tm_packet.TM_packet(i, k[1], self.TmHead, k[0])
-                    calib.cur_update(pack, self.cal)
+                    calib.cur_update(pack, cal_index)
                     self.tms.append(pack)
             self.ui.mibgen.setEnabled(True)
             self.ui.docgen.setEnabled(True)
@@ -281,13 +288,15 @@ class MainWindow(QMainWindow):
                 [a for file in load.TcTmH for a in file.comments]
             )
             self.ver = ver1 + ver2
+            dec_index = calib.decal_index(self.dec)
+            ver_index = calib.verif_index(self.ver)
             self.TcHead = tc_packet.TC_header(tc_packet_methods.find_header(load.TcH))
             packets = tc_packet_methods.packet_search(load.TcH)
             self.tcs = []
             for i in packets:
                 comm = tc_packet.TC_packet(i[1], self.TcHead, i[0])
-                calib.cpc_update(comm, self.dec)
-                calib.cvs_update(comm, self.ver)
+                calib.cpc_update(comm, dec_index)
+                calib.cvs_update(comm, ver_index)
                 self.tcs.append(comm)
             self.ui.mibgen.setEnabled(True)
             self.ui.docgen.setEnabled(True)
@@ -301,9 +310,12 @@ class MainWindow(QMainWindow):
 
         With all so far constructed representations (Tm packets, Tc commands, calibrations, etc...) taken into
         account as well as used config settings, generates the corresponding MIB tables. Also adjusts the GUI
-        appropriately based on the result and saves the generation output to the :attr:`tables` attribute.
+        appropriately based on the result and saves the generation output to the :attr:`tables` attribute. The generated
+        names are given to the TM and TC packets together beforehand (see
+        :obj:`mib_generator.construction.TM_packet_methods.resolve_names`), the same way as from the command line.
         """
         try:
+            tm_packet_methods.resolve_names((self.tms or []) + (self.tcs or []))
             self.tables = gener.generation_hub(
                 self.tms, self.tcs, self.cal, self.dec, self.ver, self.TcHead
             )
@@ -322,6 +334,7 @@ class MainWindow(QMainWindow):
         based on each of them. It then assigns this value to the :attr:`docum` attribute.
         """
         try:
+            tm_packet_methods.resolve_names((self.tms or []) + (self.tcs or []))
             self.docum = generd.gen_doc(self.tms, self.tcs)
             self.ui.docsave.setEnabled(True)
             warn.raises("CGUA")
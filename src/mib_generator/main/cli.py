@@ -73,6 +73,96 @@ def cli_run():
         required=False,
         type=directory,
     )
+    parser.add_argument(
+        "-n",
+        "--no_cache",
+        help="parse all C-files anew instead of loading unchanged ones from the parse cache",
+        action="store_true",
+    )
+    parser.add_argument(
+        "-r",
+        "--clear_cache",
+        help="delete all previously cached parsed files before running",
+        action="store_true",
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        help="number of processes/threads used for parsing the C-files and generating the MIB tables (0 for one per CPU core)",
+        default=1,
+        type=int,
+    )
+    parser.add_argument(
+        "-i",
+        "--incremental",
+        help="only construct and save again the packets/commands and MIB tables whose inputs changed since the previous run",
+        action="store_true",
+    )
+    parser.add_argument(
+        "-w",
+        "--watch",
+        help="keep running and regenerate the outputs whenever the input C-files change (implies --incremental)",
+        action="store_true",
+    )
+    parser.add_argument(
+        "--profile",
+        help="report the wall-clock time, CPU time, peak memory and object count of each phase (and save the report as JSON to the given file)",
+        nargs="?",
+        const=True,
+        default=False,
+        metavar="FILE",
+    )
+    parser.add_argument(
+        "--profile_dump",
+        help="save cProfile statistics of each phase into the specified directory",
+        required=False,
+        metavar="DIR",
+    )
+    parser.add_argument(
+        "-m",
+        "--max_messages",
+        help="show repeated messages only once and at most this many distinct messages with the same ID (0 for no limit)",
+        required=False,
+        type=int,
+    )
+    parser.add_argument(
+        "--messages",
+        help="show repeated messages only once and save all the messages as JSON to the specified file",
+        required=False,
+        metavar="FILE",
+    )
+    parser.add_argument(
+        "--diagnostics",
+        help="export structured records of all the messages to the specified file (SQLite for .db/.sqlite, JSON lines otherwise)",
+        required=False,
+        metavar="FILE",
+    )
+    parser.add_argument(
+        "-D",
+        "--define",
+        help="define the pre-processor symbol (as 1 or as the given value), overriding the config file",
+        action="append",
+        metavar="NAME[=VALUE]",
+    )
+    parser.add_argument(
+        "-U",
+        "--undefine",
+        help="undefine the pre-processor symbol, overriding the config file",
+        action="append",
+        metavar="NAME",
+    )
+    parser.add_argument(
+        "--unknown_symbols",
+        help="what to do with pre-processor symbols given neither in the config file nor on the command line: ask for their value (prompt, default), take them as not defined (false) or fail parsing of the file (error)",
+        choices=["prompt", "false", "error"],
+        required=False,
+    )
+    parser.add_argument(
+        "--variants",
+        help="generate the outputs for each of the configurations listed in the specified json5 file (parsing the C-files only once)",
+        required=False,
+        metavar="FILE",
+    )
     arguments = parser.parse_args()
     main.main(
         arguments.visualise,
@@ -82,6 +172,20 @@ def cli_run():
         arguments.update_config,
         arguments.docgenerate,
         arguments.custom_dir,
+        not arguments.no_cache,
+        arguments.clear_cache,
+        arguments.jobs,
+        arguments.incremental,
+        arguments.watch,
+        arguments.profile,
+        arguments.profile_dump,
+        arguments.max_messages,
+        arguments.messages,
+        arguments.diagnostics,
+        arguments.define,
+        arguments.undefine,
+        arguments.unknown_symbols,
+        arguments.variants,
     )
 
 
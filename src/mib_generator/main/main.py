@@ -4,6 +4,11 @@ This module through its :obj:`main` method serves the role of a logical centre o
 appropriate files between sub-packages, calls appropriate methods for each task, etc. See :obj:`main` for more info.
 """
 
+import os
+import time
+
+import json5
+
 import mib_generator.construction.calib as calib
 import mib_generator.construction.TC_packet as tc_packet
 import mib_generator.construction.TC_packet_methods as tc_packet_methods
@@ -12,8 +17,13 @@ import mib_generator.construction.TM_packet_methods as tm_packet_methods
 import mib_generator.data.warn as warn
 import mib_generator.generation.gener as gener
 import mib_generator.generation.gener_doc as generd
+import mib_generator.generation.manifest as manifest
+import mib_generator.parsing.cache as cache
 import mib_generator.parsing.load as load
+import mib_generator.parsing.macros as macros
+import mib_generator.parsing.symbols as symbols
 import mib_generator.temp.temp as temp
+import mib_generator.utilities.profiling as profiling
 import mib_generator.utilities.update as update
 import mib_generator.utilities.visualiser as visualiser
 
@@ -26,6 +36,20 @@ def main(
     config=False,
     generate_t=False,
     custom_dir=None,
+    use_cache=True,
+    clear_cache=False,
+    jobs=1,
+    incremental=False,
+    watching=False,
+    profile=False,
+    profile_dump=None,
+    max_messages=None,
+    messages_json=None,
+    diagnostics=None,
+    defines=None,
+    undefines=None,
+    unknown_symbols=None,
+    variants=None,
 ):
     """Run this whole hellish thing.
 
@@ -35,17 +59,29 @@ def main(
         2. If the appropriate option is raised, run script to update the config file in default/specified directory.
         3. Load the configuration file into the runtime directory (:obj:`mib_generator.temp`).
         4. Initialise the :obj:`mib_generator.parsing.load` module which automatically parses the files at
-           the specified paths.
+           the specified paths (or loads them from the :obj:`mib_generator.parsing.cache` if they haven't changed).
         5. Unless construction is disabled, call appropriate construction scripts and receive
            Python representation of all the calibrations, TM-packets, TC-commands, etc. that
-           occur in the parsed files.
+           occur in the parsed files. (With incremental regeneration, the TM-packets and TC-commands whose inputs
+           didn't change since the previous run are taken from its :obj:`mib_generator.generation.manifest`.)
         6. Perform some checks that these objects (mainly TM-packets and calibrations) are linked
            in a correct way.
         7. Unless generation is disabled, call the generation script which turns all previously
            constructed objects into MIB tables and saves them.
         8. If the appropriate option is raised, generate a document summing up the interpreted TM/TC packages.
+           (Steps 5. to 8. are done by :obj:`run`.) If the appropriate option is raised, watch the input files and
+           repeat these steps (after parsing the changed files again) whenever they change. If more configurations
+           are given, repeat these steps for each of them instead (see :obj:`run_variants`).
         9. If the appropriate option is raised, show the parsed files' contents in a GUI visualisation.
 
+    If profiling is asked for, each of these phases (and generation of each MIB table) is timed by
+    :obj:`mib_generator.utilities.profiling` and the report is displayed before the visualisation.
+
+    If a cap on the messages or a file for them is given, the warnings/errors raised from step 3. on are buffered (see
+    :obj:`mib_generator.data.warn.batch`), so that the repeated ones are displayed only once, and flushed after the
+    outputs are generated (and after each regeneration when watching). Similarly, if a file for the diagnostics is given,
+    structured records of all the messages are exported to it (see :obj:`mib_generator.data.warn.export`).
+
     Args:
         visual (bool): ``True`` if the GUI visualisation of the parsed files should be shown, ``False`` otherwise (and by
             default).
@@ -60,61 +96,376 @@ def main(
             ``False`` otherwise.
         custom_dir (str): A string specifying the path to a directory where the configuration files on basis of which this
             program runs, are located.
+        use_cache (bool): ``True`` (by default) if the parsed files should be loaded from/saved to the parse cache,
+            ``False`` if all files should be parsed anew.
+        clear_cache (bool): ``True`` if the parse cache should be cleared before parsing, ``False`` otherwise (and by
+            default).
+        jobs (int): Number of processes used for parsing the C-files (and of threads used for generating the MIB tables),
+            ``1`` (by default) for doing it sequentially, ``0`` for one process/thread per CPU core.
+        incremental (bool): ``True`` if only the packets/commands and MIB tables whose inputs changed since the previous
+            run should be constructed and saved again (see :obj:`mib_generator.generation.manifest`), ``False`` otherwise
+            (and by default).
+        watching (bool): ``True`` if after generating the outputs, the input files should be watched for changes and the
+            outputs generated again after each change (see :obj:`watch`), ``False`` otherwise (and by default).
+        profile (bool or str): ``True`` if the wall-clock time, CPU time, peak memory and object count of each phase
+            should be recorded and displayed, a path to a file if the report should also be saved there as JSON, ``False``
+            (by default) otherwise.
+        profile_dump (str): Path to a directory where ``cProfile`` statistics of each phase are to be saved, ``None`` (by
+            default) if the phases shouldn't be profiled.
+        max_messages (int): Maximal number of distinct messages with the same ID to be displayed (``0`` for no limit), or
+            ``None`` (by default) if the messages shouldn't be buffered unless ``messages_json`` is given.
+        messages_json (str): Path to a file the buffered messages are to be saved into as JSON, ``None`` (by default)
+            otherwise.
+        diagnostics (str): Path to a file (JSON lines or SQLite database, based on its extension) the structured records
+            of the messages are to be exported to, ``None`` (by default) otherwise.
+        defines (list): Pre-processor symbols to be defined (overriding the config file), each as ``NAME`` or
+            ``NAME=VALUE``, ``None`` (by default) for none.
+        undefines (list): Names of the pre-processor symbols to be undefined (overriding the config file), ``None`` (by
+            default) for none.
+        unknown_symbols (str): Policy for the pre-processor symbols given neither in the config file nor by the above
+            (see :attr:`mib_generator.parsing.macros.policy`), ``None`` (by default) to keep the current one.
+        variants (list or str): List of configurations (or path to a json5 file with such list) for each of which the
+            outputs are to be generated (see :obj:`run_variants`), ``None`` (by default) to generate the outputs only
+            once for the loaded configuration.
 
     Returns:
         bool: ``True`` if the script finished successfully, ``None`` otherwise.
     """
-    if paths:
-        update.update_path(custom_dir)
-    if config:
-        update.update_config_d(custom_dir)
-        update.update_config_m(custom_dir)
-        update.update_config_n(custom_dir)
-
-    temp.move_conf(custom_dir)
+    profiling.start(profile, profile_dump)
+    with profiling.phase("update"):
+        if paths:
+            update.update_path(custom_dir)
+        if config:
+            update.update_config_d(custom_dir)
+            update.update_config_m(custom_dir)
+            update.update_config_n(custom_dir)
 
-    tm_lis = []
-    tc_lis = []
-    load.load_all()
-    if not parseonly:
-        # creating TM-packets
-
-        cal1 = calib.calib_extract([a for file in load.TmH for a in file.comments])
-        cal2 = calib.calib_extract([a for file in load.TcTmH for a in file.comments])
-        cal = {i: cal1[i] + cal2[i] for i in cal1}
-        TmHead = tm_packet.TM_header(load.TmH)
-        for i in load.TmC[0].structures[1].elements:
-            matched = tm_packet_methods.header_search(i.entries[".type"], load.TmH)
-            for k in matched:
-                pack = tm_packet.TM_packet(i, k[1], TmHead, k[0])
-                calib.cur_update(pack, cal)
-                tm_lis.append(pack)
-
-        # creating TC-packets
-        dec1 = calib.decal_extract([a for file in load.TcH for a in file.comments])
-        dec2 = calib.decal_extract([a for file in load.TcTmH for a in file.comments])
-        dec = dec1 + dec2
-        ver1 = calib.verif_extract([a for file in load.TcH for a in file.comments])
-        ver2 = calib.verif_extract([a for file in load.TcTmH for a in file.comments])
-        ver = ver1 + ver2
-        TcHead = tc_packet.TC_header(tc_packet_methods.find_header(load.TcH))
-        packets = tc_packet_methods.packet_search(load.TcH)
-        for i in packets:
-            comm = tc_packet.TC_packet(i[1], TcHead, i[0])
-            calib.cpc_update(comm, dec)
-            calib.cvs_update(comm, ver)
-            tc_lis.append(comm)
-
-        if generate:
-            tables = gener.generation_hub(tm_lis, tc_lis, cal, dec, ver, TcHead)
-            gener.save_tables(tables)
+    if max_messages is not None or messages_json is not None:
+        warn.batch(True, max_messages or None)
+    if diagnostics is not None:
+        warn.record(True)
+    try:
+        with profiling.phase("move_conf"):
+            temp.move_conf(custom_dir)
+        if clear_cache:
+            cache.clear()
+        cache.enabled = use_cache
+        load.workers = jobs
+        gener.workers = jobs
+        macros.command_line(defines, undefines, unknown_symbols)
 
-        if generate_t:
-            docum = generd.gen_doc(tm_lis, tc_lis)
-            docum.save(load.out_doc)
+        if variants is not None:
+            variants = load_variants(variants)
+        # with more configurations, the files are parsed with the first one (so that it needs no parsing again)
+        first = variants[0].get("def") if variants else None
+        with profiling.phase("load_all"):
+            load.load_all(first)
+        if variants is not None:
+            run_variants(variants, generate, parseonly, generate_t, incremental)
+        else:
+            run(generate, parseonly, generate_t, incremental or watching)
+        if watching and variants is not None:
+            warn.raises("WMM2")
+        elif watching:
+            flush(messages_json, diagnostics)
+            watch(generate, parseonly, generate_t, 0.5, messages_json, diagnostics)
+        profiling.report(profile if isinstance(profile, str) else None)
+    finally:
+        flush(messages_json, diagnostics)
+        warn.batch(False)
+        warn.record(False)
     if visual:
         try:
             visualiser.main(load.TmH + load.TcTmH + load.TmC + load.TcH)
         except ModuleNotFoundError:
             warn.raises("WMM1")
     return True
+
+
+def run(generate=True, parseonly=False, generate_t=False, incremental=False):
+    """Construct the packets/commands from the already parsed files and generate the outputs from them.
+
+    This does the steps 5. to 8. of :obj:`main` (the files have to be already parsed by
+    :obj:`mib_generator.parsing.load.load_all`), the construction itself being done by :obj:`construct_tm` and
+    :obj:`construct_tc`. The generated names are given to all the constructed packets/commands together afterwards (see
+    :obj:`mib_generator.construction.TM_packet_methods.resolve_names`).
+
+    Args:
+        generate (bool): ``True`` (by default) if the MIB tables should be generated and saved, ``False`` otherwise.
+        parseonly (bool): ``True`` if nothing should be done (since only parsing was asked for), ``False`` otherwise and
+            by default.
+        generate_t (bool): ``True`` if the ``.docx`` document summing up the processed TM and TC packets is to be
+            generated, ``False`` otherwise (and by default).
+        incremental (bool): ``True`` if only the packets/commands and MIB tables whose inputs changed since the previous
+            run should be constructed and saved again, ``False`` otherwise (and by default).
+    """
+    manifest.start(incremental and generate, not generate_t)
+    if not parseonly:
+        with profiling.phase("construct_tm") as record:
+            tm_lis, cal = construct_tm()
+            record["packets"] = len(tm_lis)
+        with profiling.phase("construct_tc") as record:
+            tc_lis, dec, ver, TcHead = construct_tc()
+            record["packets"] = len(tc_lis)
+        tm_packet_methods.resolve_names(tm_lis + tc_lis)
+
+        if generate:
+            with profiling.phase("generation"):
+                gener.generation_hub(tm_lis, tc_lis, cal, dec, ver, TcHead, stream=True)
+                manifest.save()
+
+        if generate_t:
+            with profiling.phase("gen_doc"):
+                docum = generd.gen_doc(tm_lis, tc_lis)
+                docum.save(load.out_doc)
+
+
+def load_variants(variants):
+    """Load the configurations for :obj:`run_variants` if they are given by a path to a json5 file.
+
+    Args:
+        variants (list or str): List of the configurations, or path to a json5 file with such list.
+
+    Returns:
+        list: List of the configurations (empty if they couldn't be loaded).
+    """
+    if not isinstance(variants, str):
+        return variants
+    try:
+        with open(variants, "r") as fil:
+            return json5.load(fil)
+    except:
+        warn.raises("EMM2", variants)
+        return []
+
+
+def run_variants(
+    variants, generate=True, parseonly=False, generate_t=False, incremental=False
+):
+    """Generate the outputs for each of the given configurations from one parse of the input files.
+
+    The configurations usually differ only in the values of the pre-processor symbols, so for each of them, the symbols
+    are updated and only the files whose conditional directives resolve differently are parsed again (see
+    :obj:`mib_generator.parsing.load.revise`), the rest of the parsed files is shared. The outputs are then generated by
+    :obj:`run` into the output directory of the configuration. After all configurations are done, the loaded
+    configuration is restored. The files should be parsed with the symbols of the first configuration already (see
+    :obj:`mib_generator.parsing.load.load_all`), as :obj:`main` does, so that the first one is really the one parse.
+
+    Each configuration is a dictionary with the (all optional) entries:
+
+        * ``"name"`` - Name of the configuration used in the messages (its output directory by default).
+        * ``"def"`` - Values of the pre-processor symbols replacing those in the ``"def"`` entry of the config file.
+        * ``"out_dir"`` - Directory the MIB tables are saved into (created if it doesn't exist).
+        * ``"out_doc"`` - Path the ``.docx`` document is saved to (a file with the configured name in the output
+          directory by default).
+
+    Args:
+        variants (list or str): List of the configurations, or path to a json5 file with such list.
+        generate (bool): ``True`` (by default) if the MIB tables should be generated and saved, ``False`` otherwise.
+        parseonly (bool): ``True`` if only the parsing should be done, ``False`` otherwise and by default.
+        generate_t (bool): ``True`` if the ``.docx`` document summing up the processed TM and TC packets is to be
+            generated, ``False`` otherwise (and by default).
+        incremental (bool): ``True`` if only the packets/commands and MIB tables whose inputs changed since the previous
+            run (in the same output directory) should be constructed and saved again, ``False`` otherwise (and by
+            default).
+    """
+    variants = load_variants(variants)
+    base = load.conf if isinstance(load.conf, dict) else {}
+    out_dir, out_doc = load.out_dir, load.out_doc
+    try:
+        for i in variants:
+            defines = dict(base.get("def", {}))
+            defines.update(i.get("def", {}))
+            load.conf = dict(base, **{"def": defines})
+            macros.build(defines)
+            load.out_dir = i.get("out_dir", out_dir)
+            name = os.path.join(load.out_dir, os.path.basename(out_doc))
+            load.out_doc = i.get("out_doc", name)
+            os.makedirs(load.out_dir, exist_ok=True)
+            with profiling.phase("revise"):
+                changed = load.revise()
+            run(generate, parseonly, generate_t, incremental)
+            name = i.get("name", load.out_dir)
+            warn.raises("CMM3", name, load.out_dir, str(len(changed)))
+    finally:
+        load.conf = base
+        macros.build(base.get("def"))
+        load.out_dir, load.out_doc = out_dir, out_doc
+
+
+def construct_tm():
+    """Construct the calibrations and TM-packets from the parsed files.
+
+    The TM-packets whose inputs didn't change since the previous run may be taken from its manifest instead (see
+    :obj:`mib_generator.generation.manifest.packet`).
+
+    Returns:
+        tuple: A tuple consisting of:
+
+            * *list* - List of the TM-packets, each of type :obj:`mib_generator.construction.TM_packet.TM_packet`.
+            * *dict* - Dictionary holding lists of the calibrations of each type.
+    """
+    tm_lis = []
+    cal1 = calib.calib_extract([a for file in load.TmH for a in file.comments])
+    cal2 = calib.calib_extract([a for file in load.TcTmH for a in file.comments])
+    cal = {i: cal1[i] + cal2[i] for i in cal1}
+    cal_index = calib.calib_index(cal)
+    TmHead = tm_packet.TM_header(load.TmH)
+    tm_common = manifest.walk(TmHead.structure) + manifest.walk(
+        symbols.of(load.TmC).first("apidNum")
+    )
+    for i in load.TmC[0].structures[1].elements:
+        matched = tm_packet_methods.header_search(i.entries[".type"], load.TmH)
+        for k in matched:
+
+            def build():
+                name = str(k[0].entries.get("text_id", k[1].name))
+                with located(k[0], name, k[0].entries.get("spid")):
+                    pack = tm_packet.TM_packet(i, k[1], TmHead, k[0])
+                    calib.cur_update(pack, cal_index)
+                return pack
+
+            pack = manifest.packet(
+                "TM " + str(i.entries[".type"]) + " " + str(k[1].name),
+                [i, k[0]] + manifest.walk(k[1]) + tm_common,
+                [cal_index],
+                ["pid", "pic", "tpcf", "pcf", "plf", "cur", "vpd"],
+                build,
+            )
+            tm_lis.append(pack)
+    return tm_lis, cal
+
+
+def construct_tc():
+    """Construct the decalibrations, verifications, TC header and TC-commands from the parsed files.
+
+    The TC-commands whose inputs didn't change since the previous run may be taken from its manifest instead (see
+    :obj:`mib_generator.generation.manifest.packet`).
+
+    Returns:
+        tuple: A tuple consisting of:
+
+            * *list* - List of the TC-commands, each of type :obj:`mib_generator.construction.TC_packet.TC_packet`.
+            * *list* - List of the decalibrations, each of type :obj:`mib_generator.construction.calib.decalib`.
+            * *list* - List of the verifications, each of type :obj:`mib_generator.construction.calib.verification`.
+            * :obj:`mib_generator.construction.TC_packet.TC_header` - The TC header.
+    """
+    tc_lis = []
+    dec1 = calib.decal_extract([a for file in load.TcH for a in file.comments])
+    dec2 = calib.decal_extract([a for file in load.TcTmH for a in file.comments])
+    dec = dec1 + dec2
+    ver1 = calib.verif_extract([a for file in load.TcH for a in file.comments])
+    ver2 = calib.verif_extract([a for file in load.TcTmH for a in file.comments])
+    ver = ver1 + ver2
+    dec_index = calib.decal_index(dec)
+    ver_index = calib.verif_index(ver)
+    TcHead = tc_packet.TC_header(tc_packet_methods.find_header(load.TcH))
+    packets = tc_packet_methods.packet_search(load.TcH)
+    tc_common = manifest.walk(TcHead.structure) + [i.comment for i in ver]
+    for i in packets:
+
+        def build():
+            with located(i[0], str(i[0].entries.get("text_id"))):
+                comm = tc_packet.TC_packet(i[1], TcHead, i[0])
+                calib.cpc_update(comm, dec_index)
+                calib.cvs_update(comm, ver_index)
+            return comm
+
+        comm = manifest.packet(
+            "TC " + str(i[0].entries["text_id"]),
+            [i[0]] + manifest.walk(i[1]) + tc_common,
+            [dec_index],
+            ["ccf", "cpc", "cdf", "prf", "prv", "cvp"],
+            build,
+        )
+        tc_lis.append(comm)
+    return tc_lis, dec, ver, TcHead
+
+
+def located(comment, packet, spid=None):
+    """Give the context for the messages raised during construction of a packet/command.
+
+    Args:
+        comment (object): The comment declaring the packet/command.
+        packet (str): Name of the packet/command.
+        spid (int): The SPID of the packet (if it's a TM-packet).
+
+    Returns:
+        :obj:`mib_generator.data.warn.context`: The context holding the name, SPID and place of declaration (see
+        :obj:`mib_generator.generation.manifest.source`) of the packet/command.
+    """
+    src = manifest.source(comment)
+    return warn.context(
+        packet=packet,
+        spid=spid,
+        file=src["file"],
+        line=src["line"],
+        offset=src["offset"],
+    )
+
+
+def watch(
+    generate=True,
+    parseonly=False,
+    generate_t=False,
+    interval=0.5,
+    messages_json=None,
+    diagnostics=None,
+):
+    """Watch the input files for changes and regenerate the outputs after each change.
+
+    The parsed files are kept in memory and the input files are polled every ``interval`` seconds. When some of them
+    change, only these are parsed again (see :obj:`mib_generator.parsing.load.reparse`) and the outputs are generated
+    again by :obj:`run` with incremental regeneration, so only the packets/commands and MIB tables affected by the change
+    are constructed and saved again. Runs until interrupted (e.g. with Ctrl+C).
+
+    Args:
+        generate (bool): ``True`` (by default) if the MIB tables should be generated and saved, ``False`` otherwise.
+        parseonly (bool): ``True`` if only the parsing should be done, ``False`` otherwise and by default.
+        generate_t (bool): ``True`` if the ``.docx`` document summing up the processed TM and TC packets is to be
+            generated, ``False`` otherwise (and by default).
+        interval (float): Number of seconds between checks of the input files.
+        messages_json (str): Path to a file the buffered messages are to be saved into as JSON after each regeneration
+            (see :obj:`flush`).
+        diagnostics (str): Path to a file the structured records of the messages are to be exported to after each
+            regeneration (see :obj:`flush`).
+    """
+    stamps = load.stamps()
+    warn.raises("CMM1", str(len(stamps)))
+    try:
+        while True:
+            time.sleep(interval)
+            current = load.stamps()
+            changed = [i for i in current if current[i] != stamps.get(i)]
+            if not changed:
+                continue
+            stamps = current
+            began = time.perf_counter()
+            try:
+                with profiling.phase("reparse"):
+                    load.reparse(changed)
+                run(generate, parseonly, generate_t, True)
+            except Exception:
+                warn.raises("EMM1", ", ".join(changed))
+                flush(messages_json, diagnostics)
+                continue
+            took = "{:.2f}".format(time.perf_counter() - began)
+            warn.raises("CMM2", ", ".join(changed), took)
+            flush(messages_json, diagnostics)
+    except KeyboardInterrupt:
+        pass
+
+
+def flush(path=None, diagnostics=None):
+    """Display the buffered messages and export their structured records (if they are being buffered/recorded at all).
+
+    Args:
+        path (str): Path to a file the messages are to be saved into as JSON (see
+            :obj:`mib_generator.data.warn.flush`), ``None`` (by default) otherwise.
+        diagnostics (str): Path to a file the structured records are to be exported to (see
+            :obj:`mib_generator.data.warn.export`), ``None`` (by default) otherwise.
+    """
+    if warn.batching:
+        warn.flush(path)
+    if warn.recording and diagnostics is not None:
+        warn.export(diagnostics)
@@ -6,6 +6,12 @@ representation to be a bit convoluted from place to place, but still understanda
 The submodules here are:
 
     * :obj:`load` - Module that allows for interaction between the parser and rest of the code.
+    * :obj:`cache` - Module that stores the parsed representations of files on disk so that unchanged files
+      don't have to be parsed again in the next run.
+    * :obj:`macros` - Module that resolves the values of the pre-processor symbols used in the conditional
+      directives of the files.
+    * :obj:`symbols` - Module that indexes the names of C-objects and comments in the parsed files, so that
+      they can be quickly looked up during construction.
     * :obj:`parser_main` - Module that initialises the parsing process for a given file and holds class
       that represents the result.
     * :obj:`par_cfile` - Module that holds the methods and classes for parsing ``.c`` files.
@@ -0,0 +1,173 @@
+"""On-disk cache of the parsed Python representations of C-files.
+
+Parsing of large C-files is the most time-consuming part of the whole program, while in between two runs the inputted
+files usually do not change at all. Because of this, the outputs of :obj:`mib_generator.parsing.parser_main.main`
+(objects of the class :obj:`mib_generator.parsing.parser_main.file`) are saved into a user cache directory and loaded
+from there on the next run if nothing relevant changed.
+
+Each cached file is identified by a key which is a SHA-256 digest of the text of the file, of the values of the
+pre-processor macros (from the table of :obj:`mib_generator.parsing.macros`) which are used in the file's conditional
+directives and of the version of the package and its parsing sources. Hence any change to either of these automatically leads to the file
+being parsed anew.
+
+Attributes:
+    enabled (bool): Whether the cache should be used at all (set to ``False`` e.g. with the ``--no_cache`` flag).
+    package_print (str): The :obj:`fingerprint` of the package once it is computed.
+"""
+import hashlib
+import importlib.metadata
+import os
+import pickle
+import re
+
+import mib_generator.data.warn as warn
+import mib_generator.parsing.macros as macros
+
+enabled = True
+package_print = None
+
+# conditional directives (including the lines joined to them by a backslash), whose symbols decide their outcome
+condition_pattern = re.compile(
+    r"^[ \t]*#[ \t]*(?:ifn?def|if|elif)\b(.*(?:\\\n.*)*)", re.MULTILINE
+)
+
+
+def directory():
+    """Give path to the directory where the cached files are stored.
+
+    Follows the usual platform conventions, i.e. the ``XDG_CACHE_HOME`` (or ``~/.cache``) directory on Unix-like systems
+    and ``LOCALAPPDATA`` on Windows.
+
+    Returns:
+        str: Path to the cache directory.
+    """
+    if os.name == "nt" and "LOCALAPPDATA" in os.environ:
+        base = os.environ["LOCALAPPDATA"]
+    else:
+        base = os.environ.get("XDG_CACHE_HOME") or os.path.join(
+            os.path.expanduser("~"), ".cache"
+        )
+    return os.path.join(base, "mib-generator", "parsed")
+
+
+def fingerprint():
+    """Create a string identifying the version of the package and its parser.
+
+    Apart from the package version, the contents of the parsing modules are also hashed, so that the cache gets
+    invalidated by changes to the parser even if the version is not changed (e.g. when running from source).
+
+    Returns:
+        str: The identifying string.
+    """
+    if package_print is not None:
+        return package_print
+    try:
+        version = importlib.metadata.version("mib-generator")
+    except importlib.metadata.PackageNotFoundError:
+        version = ""
+    digest = hashlib.sha256(version.encode())
+    here = os.path.dirname(__file__)
+    for i in sorted(os.listdir(here)):
+        if i.endswith(".py"):
+            with open(os.path.join(here, i), "rb") as fil:
+                digest.update(fil.read())
+    globals()["package_print"] = digest.hexdigest()
+    return package_print
+
+
+def conditions(text):
+    """Find the names of the pre-processor symbols used in the conditional directives of a file.
+
+    Args:
+        text (str): The content of the file.
+
+    Returns:
+        set: The names of the symbols.
+    """
+    names = set()
+    for i in condition_pattern.findall(text):
+        names.update(re.findall(r"\b[A-Za-z_]\w*", re.sub(r"/\*.*?\*/|//.*", " ", i)))
+    return names
+
+
+def key(text, header):
+    """Create the cache key for a file with the given content.
+
+    The key is a SHA-256 digest of the file text, of whether it is a header file, of the values of the pre-processor
+    macros used in its conditional directives (and of the macros used in their values, see
+    :obj:`mib_generator.parsing.macros.signature`) and of the :obj:`fingerprint` of the package. If some of these macros
+    is not known, its value would have to be asked from the user and hence the file is not cached at all.
+
+    Args:
+        text (str): The content of the file.
+        header (bool): Parameter denoting whether file is a header or normal C file.
+
+    Returns:
+        str or None: The key or ``None`` if the file should not be cached.
+    """
+    defines = macros.signature(conditions(text))
+    if defines is None:
+        return None
+    digest = hashlib.sha256(text.encode("utf-8", "surrogatepass"))
+    digest.update(repr((header, defines, macros.policy, fingerprint())).encode())
+    return digest.hexdigest()
+
+
+def fetch(name):
+    """Load the parsed file stored under the given key.
+
+    Args:
+        name (str): The key of the file as given by :obj:`key`.
+
+    Returns:
+        tuple or None: A tuple consisting of the parsed file (:obj:`mib_generator.parsing.parser_main.file`), the list of
+        the messages raised while parsing it and the symbols resolved while parsing it (see :obj:`store`), or ``None`` if
+        it isn't in the cache (or can't be loaded).
+    """
+    path = os.path.join(directory(), name + ".pickle")
+    try:
+        with open(path, "rb") as fil:
+            parsed, messages, resolved = pickle.load(fil)
+        return parsed, messages, resolved
+    except:
+        return None
+
+
+def store(name, parsed, messages=(), resolved=None):
+    """Save the parsed file into the cache under the given key.
+
+    The messages raised while parsing the file and the pre-processor symbols which had to be resolved by the
+    :attr:`mib_generator.parsing.macros.policy` are saved with it, so that both can be applied again when it is loaded
+    from the cache. The file is first written under a temporary name and then renamed, so that an interrupted run can
+    not leave a corrupted entry in the cache.
+
+    Args:
+        name (str): The key of the file as given by :obj:`key`.
+        parsed (parser_main.file): The parsed file to be saved.
+        messages (list): The messages raised while parsing the file (as collected by
+            :obj:`mib_generator.data.warn.collect`).
+        resolved (dict): The symbols added to the :attr:`mib_generator.parsing.macros.table` while parsing the file.
+    """
+    dire = directory()
+    path = os.path.join(dire, name + ".pickle")
+    temp = path + "." + str(os.getpid()) + ".tmp"
+    try:
+        os.makedirs(dire, exist_ok=True)
+        with open(temp, "wb") as fil:
+            entry = (parsed, list(messages), dict(resolved or {}))
+            pickle.dump(entry, fil, pickle.HIGHEST_PROTOCOL)
+        os.replace(temp, path)
+    except:
+        warn.raises("WPC1", str(getattr(parsed, "path", "")))
+        if os.path.isfile(temp):
+            os.remove(temp)
+
+
+def clear():
+    """Delete all the files stored in the cache."""
+    dire = directory()
+    if os.path.isdir(dire):
+        for i in os.listdir(dire):
+            if i.endswith(".pickle") or i.endswith(".tmp"):
+                os.remove(os.path.join(dire, i))
+    warn.raises("CPC1", dire)
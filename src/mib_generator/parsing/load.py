@@ -17,13 +17,20 @@ Attributes:
         :obj:`mib_generator.parsing.parser_main.file`
     enumerations (dict): A dictionary containing all possible usable evaluations/enumerations sourced 
         form enums, macros, etc... found in all 3 of the parsed header files.
+    workers (int): Number of processes used for parsing the files. ``0`` (or ``None``) for one process per CPU
+        core, ``1`` (default) for parsing sequentially in the main process.
 """
 import os
+from concurrent.futures import ProcessPoolExecutor
 
 import json5
 
 import mib_generator.data.warn as warn
+import mib_generator.parsing.cache as cache
+import mib_generator.parsing.macros as macros
+import mib_generator.parsing.par_methods as parm
 import mib_generator.parsing.parser_main as par
+import mib_generator.parsing.symbols as symbols
 
 TmC_path = ""
 TmH_path = ""
@@ -33,6 +40,7 @@ out_dir = ""
 out_doc = ""
 
 conf = ""
+workers = 1
 
 TmH = None
 TcH = None
@@ -80,6 +88,7 @@ def get_conf():
         fil.close()
     except:
         globals()[""] = {}
+    macros.build(conf.get("def") if isinstance(conf, dict) else None)
 
 
 def parse_all():
@@ -88,23 +97,160 @@ def parse_all():
     This method uses the :obj:`mib_generator.parsing.parser_main` module to parse contents of the files specified
     at the paths given by global attributes of this module. It then assigns the outputs of the parsing process to
     various other global attributes of this module, so they can be easily accessed.
+
+    If :attr:`workers` allows for more than one process, the files are parsed in parallel in a pool of worker
+    processes (see :obj:`parse_worker`). The results are still collected in the order of the files in the paths
+    config and the messages raised in the workers are relayed in this same order.
     """
+    groups = [
+        ["TmH", TmH_path, "Tm .h"],
+        ["TcH", TcH_path, "Tc .h"],
+        ["TcTmH", TcTmH_path, "TcTm .h"],
+        ["TmC", TmC_path, "Tm .c"],
+    ]
+    count = workers if workers else os.cpu_count()
+    count = min(count or 1, sum(len(i[1]) for i in groups))
+    if count <= 1:
+        for name, paths, desc in groups:
+            try:
+                globals()[name] = [par.main(i) for i in paths]
+            except:
+                warn.raises("EPL2", desc)
+        return
+    initargs = (conf, cache.enabled, macros.table, macros.policy)
+    with ProcessPoolExecutor(count, initializer=parse_init, initargs=initargs) as pool:
+        futures = [[pool.submit(parse_worker, l) for l in i[1]] for i in groups]
+        for i in range(len(groups)):
+            try:
+                results = [l.result() for l in futures[i]]
+                for l in results:
+                    for k in l[1]:
+                        warn.show(*k)
+                files = [l[0] for l in results]
+                if None in files:
+                    warn.raises("EPL2", groups[i][2])
+                else:
+                    globals()[groups[i][0]] = files
+            except:
+                warn.raises("EPL2", groups[i][2])
+
+
+def stamps():
+    """Give the current sizes and times of modification of all the input files.
+
+    Returns:
+        dict: Dictionary with paths of the input files as keys and pairs (time of modification, size) as values (or
+        ``None`` if the file can't be accessed).
+    """
+    found = {}
+    for i in TmH_path + TcH_path + TcTmH_path + TmC_path:
+        try:
+            stat = os.stat(i)
+            found[i] = (stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            found[i] = None
+    return found
+
+
+def reparse(names):
+    """Parse the given input files anew, keeping the other already parsed files.
+
+    The parsed representations of the given files are replaced (in new lists, so that everything built from the previous
+    ones is recognised as outdated) and the evaluation dictionary and the indexes of names are created again. The memo
+    of the decoded comments (see :obj:`mib_generator.parsing.par_methods.decode`) is cleared.
+
+    Args:
+        names (list): Paths of the input files which have changed.
+    """
+    groups = [
+        ["TmH", TmH_path, "Tm .h"],
+        ["TcH", TcH_path, "Tc .h"],
+        ["TcTmH", TcTmH_path, "TcTm .h"],
+        ["TmC", TmC_path, "Tm .c"],
+    ]
+    # the contents of the old versions of the comments won't be needed again
+    parm.decoded.clear()
+    for name, paths, desc in groups:
+        if not set(names) & set(paths):
+            continue
+        try:
+            # the group is None if its initial parsing failed, its files are then parsed all
+            files = list(globals()[name] or [None] * len(paths))
+            for i in range(len(paths)):
+                if paths[i] in names or files[i] is None:
+                    files[i] = par.main(paths[i])
+            globals()[name] = files
+        except:
+            warn.raises("EPL2", desc)
+    enum_stuff()
+    symbols.build(TmH, TcH, TcTmH, TmC)
+
+
+def revise():
+    """Parse again the files whose conditional directives resolve differently under the current pre-processor symbols.
+
+    Each parsed file records the values of the symbols its conditional directives depended on when it was parsed (see
+    :obj:`mib_generator.parsing.parser_main.main`). After the symbols change (e.g. when switching to another
+    configuration), only the files for which these values are now different are parsed again (see :obj:`reparse`), the
+    others are kept as they are.
+
+    Returns:
+        list: Paths of the files which were parsed again.
+    """
+    changed = []
+    for i in [TmH, TcH, TcTmH, TmC]:
+        for l in i or []:
+            if macros.signature(cache.conditions(l.text)) != l.signature:
+                changed.append(l.path)
+    if changed:
+        reparse(changed)
+    return changed
+
+
+def parse_init(config, use_cache, table, policy):
+    """Initialise a worker process used for parallel parsing.
+
+    Passes the runtime configuration and the resolved pre-processor symbols to the worker (which doesn't share memory
+    with the main process) and since no user input can be obtained from within the worker, switches the pre-processor
+    evaluation to its non-interactive mode.
+
+    Args:
+        config (dict): The runtime configuration (see :attr:`conf`).
+        use_cache (bool): Whether the parse cache should be used.
+        table (dict): The table of the pre-processor symbols (see :attr:`mib_generator.parsing.macros.table`).
+        policy (str): The policy for the unknown pre-processor symbols (see
+            :attr:`mib_generator.parsing.macros.policy`).
+    """
+    globals()["conf"] = config
+    cache.enabled = use_cache
+    macros.table = table
+    macros.policy = policy
+    parm.interactive = False
+
+
+def parse_worker(name):
+    """Parse a single file inside a worker process.
+
+    The messages raised during the parsing are not displayed directly but collected and returned with the result, so
+    that they can be relayed by the main process in a deterministic order.
+
+    Args:
+        name (str): Path to the file to be parsed.
+
+    Returns:
+        tuple: A tuple consisting of:
+
+            * :obj:`mib_generator.parsing.parser_main.file` - The parsed file (or ``None`` if the parsing failed).
+            * *list* - List of the messages raised during parsing.
+    """
+    messages = []
+    warn.collect(messages)
     try:
-        globals()["TmH"] = [par.main(i) for i in TmH_path]
-    except:
-        warn.raises("EPL2", "Tm .h")
-    try:
-        globals()["TcH"] = [par.main(i) for i in TcH_path]
-    except:
-        warn.raises("EPL2", "Tc .h")
-    try:
-        globals()["TcTmH"] = [par.main(i) for i in TcTmH_path]
-    except:
-        warn.raises("EPL2", "TcTm .h")
-    try:
-        globals()["TmC"] = [par.main(i) for i in TmC_path]
+        return par.main(name), messages
     except:
-        warn.raises("EPL2", "Tm .c")
+        return None, messages
+    finally:
+        warn.collect(None)
 
 
 def enum_stuff():
@@ -156,7 +302,7 @@ def extr_values(files):
     return lis
 
 
-def load_all():
+def load_all(defines=None):
     """Run all initialisation and parsing methods.
 
     This method (replacing previous simple initialisation of this module) runs other methods, which
@@ -165,8 +311,18 @@ def load_all():
         2. Load the configuration settings.
         2. Parse files at these paths.
         3. Create evaluation dictionary from these parsed files.
+        4. Build indexes of the names in these parsed files (see :obj:`mib_generator.parsing.symbols`).
+
+    Args:
+        defines (dict): Values of the pre-processor symbols replacing those in the ``"def"`` entry of the config file
+            (e.g. those of the first of more configurations, see :obj:`mib_generator.main.main.run_variants`), ``None``
+            (by default) for none.
     """
     get_paths()
     get_conf()
+    if defines:
+        base = conf.get("def") if isinstance(conf, dict) else None
+        macros.build(dict(base or {}, **defines))
     parse_all()
     enum_stuff()
+    symbols.build(TmH, TcH, TcTmH, TmC)
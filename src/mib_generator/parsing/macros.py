@@ -0,0 +1,426 @@
+"""Resolution of the pre-processor symbols used in the conditional directives of the parsed files.
+
+Instead of looking into the config file (or asking the user) on every conditional directive, the values of the
+pre-processor symbols are resolved once per run into a symbol :attr:`table`. It is built by :obj:`build` from the ``"def"``
+config entry, on top of which the symbols defined/undefined on the command line (``-D``/``-U``, see :attr:`defined` and
+:attr:`undefined`) are applied. While going through a file, the symbols defined/undefined by its own ``#define`` and
+``#undef`` directives are added on top of the table in a :obj:`scope` of the file.
+
+The symbols which are not given anywhere are resolved according to the :attr:`policy`, the answers are then kept in the
+table for the rest of the run. Apart from the plain ``#ifdef``/``#ifndef`` conditions, the constant expressions of the
+``#if``/``#elif`` directives can be evaluated too (see :obj:`evaluate`).
+
+Attributes:
+    defined (dict): Symbols defined on the command line, with their names as keys and their values (strings) as
+        values.
+    undefined (set): Names of the symbols undefined on the command line.
+    policy (str): What is done with the symbols which are not given anywhere. Either ``"prompt"`` (by default), when the
+        user is asked for their value (if this isn't possible, see
+        :attr:`mib_generator.parsing.par_methods.interactive`, they are taken as not defined), ``"false"``, when they are
+        taken as not defined, or ``"error"``, when the parsing of the file fails.
+    table (dict): The resolved symbols, with their names as keys and their values (strings) as values. The symbols which
+        are known not to be defined have ``None`` as value.
+"""
+import operator
+import re
+
+import mib_generator.data.warn as warn
+import mib_generator.parsing.par_methods as parm
+
+defined = {}
+undefined = set()
+policy = "prompt"
+table = {}
+
+policies = ["prompt", "false", "error"]
+
+# tokens of the constant expressions of the ``#if``/``#elif`` directives
+token_pattern = re.compile(
+    r"""
+    \s*(?:
+    (?P<number>(?:0[xX][0-9A-Fa-f]+|[0-9]+)[uUlL]*)
+    |(?P<char>'(?:[^'\\]|\\.)')
+    |(?P<name>[A-Za-z_]\w*)
+    |(?P<op>&&|\|\||<<|>>|<=|>=|==|!=|[-+*/%<>&^|!~?:()])
+    )
+    """,
+    re.VERBOSE,
+)
+
+# binary operators of the constant expressions with their precedence
+binary = {
+    "||": 1,
+    "&&": 2,
+    "|": 3,
+    "^": 4,
+    "&": 5,
+    "==": 6,
+    "!=": 6,
+    "<": 7,
+    ">": 7,
+    "<=": 7,
+    ">=": 7,
+    "<<": 8,
+    ">>": 8,
+    "+": 9,
+    "-": 9,
+    "*": 10,
+    "/": 10,
+    "%": 10,
+}
+
+# the binary operators which evaluate both of their operands (see :obj:`calculate`)
+operations = {
+    "|": operator.or_,
+    "^": operator.xor,
+    "&": operator.and_,
+    "==": operator.eq,
+    "!=": operator.ne,
+    "<": operator.lt,
+    ">": operator.gt,
+    "<=": operator.le,
+    ">=": operator.ge,
+    "<<": operator.lshift,
+    ">>": operator.rshift,
+    "+": operator.add,
+    "-": operator.sub,
+    "*": operator.mul,
+}
+
+
+def value(entry):
+    """Convert a value of a symbol as given in the config file into its value in the symbol table.
+
+    Args:
+        entry (object): The value of the symbol in the config file. ``False`` (or another value which isn't truthy) if the
+            symbol is not defined, ``True`` if it is defined (as ``1``), otherwise the value it is defined as.
+
+    Returns:
+        str or None: The value of the symbol in the symbol table.
+    """
+    if not entry:
+        return None
+    if entry is True:
+        return "1"
+    return str(entry)
+
+
+def build(config):
+    """Build the symbol table for this run.
+
+    Args:
+        config (dict): The ``"def"`` config entry, with the names of the symbols as keys and their values as values (see
+            :obj:`value`).
+    """
+    resolved = {}
+    if isinstance(config, dict):
+        for i in config:
+            resolved[i] = value(config[i])
+    resolved.update(defined)
+    for i in undefined:
+        resolved[i] = None
+    globals()["table"] = resolved
+
+
+def command_line(defines=None, undefines=None, unknown=None):
+    """Set the symbols given on the command line and the policy for the unknown symbols.
+
+    Args:
+        defines (list): List of the symbols to be defined, each in the form ``NAME`` (defined as ``1``) or ``NAME=VALUE``.
+        undefines (list): List of the names of the symbols to be undefined.
+        unknown (str): The :attr:`policy` for the unknown symbols (``None`` to keep the current one).
+    """
+    found = {}
+    for i in defines or []:
+        name, sep, val = i.partition("=")
+        found[name.strip()] = val.strip() if sep else "1"
+    globals()["defined"] = found
+    globals()["undefined"] = set(i.strip() for i in undefines or [])
+    if unknown is not None:
+        globals()["policy"] = unknown
+
+
+def resolve(name):
+    """Give the value of the given symbol from the symbol table.
+
+    If the symbol is not in the table, it is resolved according to the :attr:`policy` and the result is added to the
+    table.
+
+    Args:
+        name (str): Name of the symbol.
+
+    Returns:
+        str or None: Value of the symbol or ``None`` if it is not defined.
+
+    Raises:
+        KeyError: If the symbol is unknown and the policy is ``"error"``.
+    """
+    if name in table:
+        return table[name]
+    if policy == "error":
+        warn.raises("EPM2", name)
+        raise KeyError(name)
+    elif policy == "prompt" and parm.interactive:
+        answer = input("Is " + name + "? (skip for False) ").strip()
+        found = None
+        if answer:
+            found = answer if re.fullmatch(r"[0-9]+", answer) else "1"
+    else:
+        warn.raises("WPM2", name)
+        found = None
+    table[name] = found
+    return found
+
+
+def signature(names):
+    """Give the values of the given symbols and of the symbols their values refer to.
+
+    This is used to identify which parses of a file can be reused (see :obj:`mib_generator.parsing.cache.key`), so the
+    symbols are not resolved here if they are unknown.
+
+    Args:
+        names (iterable): Names of the symbols.
+
+    Returns:
+        list or None: Sorted list of pairs (name, value) of the symbols (with ``"?"`` as the value of the unknown
+        symbols), or ``None`` if the value of some of the symbols would have to be asked from the user.
+    """
+    found = {}
+    stack = list(names)
+    while stack:
+        name = stack.pop()
+        if name in found or name == "defined":
+            continue
+        if name not in table:
+            if policy == "prompt" and parm.interactive:
+                return None
+            found[name] = "?"
+            continue
+        found[name] = table[name]
+        if table[name]:
+            stack.extend(re.findall(r"\b[A-Za-z_]\w*", table[name]))
+    return sorted(found.items(), key=lambda x: x[0])
+
+
+class scope:
+    """Class representing the symbols visible at some point of a file.
+
+    These are the symbols from the symbol :attr:`table` together with the symbols defined/undefined in the file so far.
+
+    Attributes:
+        local (dict): The symbols defined/undefined in the file, with their names as keys and their values (or
+            ``None`` if undefined) as values.
+    """
+
+    def __init__(self):
+        self.local = {}
+
+    def define(self, name, val="1"):
+        """Define the given symbol.
+
+        Args:
+            name (str): Name of the symbol.
+            val (str): Value of the symbol.
+        """
+        self.local[name] = val
+
+    def undefine(self, name):
+        """Undefine the given symbol.
+
+        Args:
+            name (str): Name of the symbol.
+        """
+        self.local[name] = None
+
+    def lookup(self, name):
+        """Give the value of the given symbol.
+
+        Args:
+            name (str): Name of the symbol.
+
+        Returns:
+            str or None: Value of the symbol or ``None`` if it is not defined.
+        """
+        if name in self.local:
+            return self.local[name]
+        return resolve(name)
+
+
+def tokens(stri):
+    """Split a constant expression into tokens.
+
+    Args:
+        stri (str): The expression.
+
+    Returns:
+        list: List of the matches of the tokens (see :attr:`token_pattern`).
+
+    Raises:
+        ValueError: If the expression contains something which is not a valid token.
+    """
+    found = []
+    position = 0
+    stri = stri.rstrip()
+    while position < len(stri):
+        match = token_pattern.match(stri, position)
+        if match is None:
+            raise ValueError(stri)
+        found.append(match)
+        position = match.end()
+    return found
+
+
+class expression:
+    """Class representing a parsed constant expression of a ``#if``/``#elif`` directive.
+
+    The expression is parsed by precedence climbing into a tree of nested tuples, whose first item is the kind of the
+    node (``"number"``, ``"name"``, ``"defined"``, ``"unary"``, ``"binary"`` or ``"choice"``).
+
+    Args:
+        stri (str): The expression.
+
+    Attributes:
+        tokens (list): The tokens of the expression (see :obj:`tokens`).
+        position (int): Index of the next token to be parsed.
+        tree (tuple): The parsed expression.
+
+    Raises:
+        ValueError: If the expression is not valid.
+    """
+
+    def __init__(self, stri):
+        self.tokens = [i.group(i.lastgroup) for i in tokens(stri)]
+        self.position = 0
+        self.tree = self.choice()
+        if self.position != len(self.tokens):
+            raise ValueError(stri)
+
+    def peek(self):
+        """Give the next token (or ``None`` at the end of the expression)."""
+        if self.position < len(self.tokens):
+            return self.tokens[self.position]
+        return None
+
+    def take(self, expected=None):
+        """Move past the next token (which has to be the expected one, if given) and give it."""
+        token = self.peek()
+        if token is None or (expected is not None and token != expected):
+            raise ValueError(expected)
+        self.position += 1
+        return token
+
+    def choice(self):
+        """Parse a (possibly conditional ``?:``) expression."""
+        condition = self.operation(1)
+        if self.peek() != "?":
+            return condition
+        self.take("?")
+        first = self.choice()
+        self.take(":")
+        return ("choice", condition, first, self.choice())
+
+    def operation(self, level):
+        """Parse a chain of binary operators with at least the given precedence."""
+        left = self.unary()
+        while binary.get(self.peek(), 0) >= level:
+            op = self.take()
+            left = ("binary", op, left, self.operation(binary[op] + 1))
+        return left
+
+    def unary(self):
+        """Parse a unary operator, a parenthesised expression, a ``defined`` test, a symbol or a number."""
+        token = self.take()
+        if token in {"!", "~", "-", "+"}:
+            return ("unary", token, self.unary())
+        elif token == "(":
+            inner = self.choice()
+            self.take(")")
+            return inner
+        elif token == "defined":
+            if self.peek() == "(":
+                self.take("(")
+                name = self.take()
+                self.take(")")
+            else:
+                name = self.take()
+            if not re.fullmatch(r"[A-Za-z_]\w*", name):
+                raise ValueError(name)
+            return ("defined", name)
+        elif re.fullmatch(r"[A-Za-z_]\w*", token):
+            return ("name", token)
+        elif token.startswith("'"):
+            return ("number", ord(token[1:-1].encode().decode("unicode_escape")))
+        elif token[:1].isdigit():
+            digits = token.rstrip("uUlL")
+            if digits[:2] in {"0x", "0X"}:
+                return ("number", int(digits, 16))
+            elif len(digits) > 1 and digits[0] == "0":
+                return ("number", int(digits, 8))
+            return ("number", int(digits))
+        raise ValueError(token)
+
+
+def evaluate(stri, where=None, expanding=frozenset()):
+    """Evaluate a constant expression of a ``#if``/``#elif`` directive.
+
+    The expression is evaluated as in C: the symbols are replaced by (the evaluation of) their values, the symbols which
+    are not defined are taken as ``0``, the comparison and logical operators give ``1`` or ``0`` and the ``&&``, ``||``
+    and ``?:`` operators evaluate only the operands which they need (so only the symbols which matter are resolved).
+
+    Args:
+        stri (str): The expression.
+        where (scope): The scope the symbols are looked up in (a new one if not given).
+        expanding (frozenset): Names of the symbols whose values are being evaluated (to stop self-referencing symbols).
+
+    Returns:
+        int: The value of the expression.
+
+    Raises:
+        ValueError: If the expression (or the value of some symbol used in it) is not valid.
+        ZeroDivisionError: If the expression divides by zero.
+    """
+    if where is None:
+        where = scope()
+    return calculate(expression(stri).tree, where, expanding)
+
+
+def calculate(node, where, expanding):
+    """Calculate the value of a parsed constant expression (see :obj:`evaluate`).
+
+    Args:
+        node (tuple): The parsed expression (see :obj:`expression`).
+        where (scope): The scope the symbols are looked up in.
+        expanding (frozenset): Names of the symbols whose values are being evaluated.
+
+    Returns:
+        int: The value of the expression.
+    """
+    kind = node[0]
+    if kind == "number":
+        return node[1]
+    elif kind == "defined":
+        return int(where.lookup(node[1]) is not None)
+    elif kind == "name":
+        val = where.lookup(node[1])
+        if val is None or node[1] in expanding:
+            return 0
+        return evaluate(val, where, expanding | {node[1]})
+    elif kind == "unary":
+        val = calculate(node[2], where, expanding)
+        return {"!": int(not val), "~": ~val, "-": -val, "+": val}[node[1]]
+    elif kind == "choice":
+        if calculate(node[1], where, expanding):
+            return calculate(node[2], where, expanding)
+        return calculate(node[3], where, expanding)
+    op, left = node[1], calculate(node[2], where, expanding)
+    if op == "&&":
+        return int(bool(left) and bool(calculate(node[3], where, expanding)))
+    elif op == "||":
+        return int(bool(left) or bool(calculate(node[3], where, expanding)))
+    right = calculate(node[3], where, expanding)
+    if op in {"/", "%"}:
+        quotient = abs(left) // abs(right)
+        if (left < 0) != (right < 0):
+            quotient = -quotient
+        return quotient if op == "/" else left - quotient * right
+    return int(operations[op](left, right))
@@ -11,7 +11,7 @@ types = {"uint8_t", "uint16_t", "uint32_t", "uint64_t", "char", "unsigned int"}
 typea = types.union({"struct"})
 
 
-def str_parse(stri):
+def str_parse(stri, source=None):
     """Parse the given string into blocks of "top-level" C-structures.
 
     By going iteratively through the string and recognising the features of standard C-syntax, this function
@@ -22,12 +22,16 @@ def str_parse(stri):
 
     Args:
         stri (str): A string to be parsed/analysed into the C-objects.
+        source (str): The text of the whole file the C-objects are sliced from when their text is accessed (see
+            :attr:`instance_og.text`). If not given, the parsed string itself is used.
 
     Returns:
         list: List of Python representations of found C-objects, each represented by an object of child-class
         of :obj:`instance`
 
     """
+    if source is None:
+        source = stri
     strc = parm.erase_text(stri)
     depth = 0
     structures = []
@@ -50,9 +54,9 @@ def str_parse(stri):
         elif strc[i] == ";" and depth == 1:
             depth = 0
             if typ == "struct":
-                structures.append(struct(typ, start, i - 1, stri[start:i]))
+                structures.append(struct(typ, start, i - 1, stri[start:i], source))
             else:
-                structures.append(miscal(typ, start, i - 1, stri[start:i]))
+                structures.append(miscal(typ, start, i - 1, stri[start:i], source))
         elif strc[i] in {"}", ")"}:
             depth -= 1
         elif strc[i] in {"{", "("}:
@@ -66,26 +70,41 @@ class instance_og:
     This class holds properties which are shared by all Python representations of C-objects found in the
     analysed file.
 
+    As in :obj:`mib_generator.parsing.par_header.structure`, all the classes declare ``__slots__`` and the text of the
+    C-object is sliced out of the text of the whole file only when accessed (see :attr:`text`).
+
     Args:
         typ (str): The type of the C-object (e.g. ``struct`` or ``enum``).
         inds (int): Starting index of the C-object.
         inde (int): End index of the C-object.
         cont (str): Raw text of the C-object as in the source file.
+        source (str): Text of the whole file in which the C-object was found (without the comments and the parts left
+            out by the pre-processor logic, as it was parsed).
 
     Attributes:
         type (str): The type of the C-object (e.g. ``struct`` or ``enum``).
         start (int): Starting index of the C-object.
         end (int): End index of the C-object.
-        text (str): Raw text of the C-object as in the source file.
-        comment (list): List holding all found interpretable comments associated to this C-object.
+        source (str): Text of the whole file in which the C-object was found (without the comments and the parts left
+            out by the pre-processor logic, as it was parsed).
+        comment (list): List holding all found interpretable comments associated to this C-object (an empty tuple,
+            which is shared by all the objects, until some comment is found).
     """
 
-    def __init__(self, typ, inds, inde, cont):
+    __slots__ = ("type", "start", "end", "source", "comment")
+
+    def __init__(self, typ, inds, inde, cont, source):
         self.type = typ
         self.start = inds
         self.end = inde
-        self.text = cont
-        self.comment = []
+        self.source = source
+        self.comment = ()
+
+    @property
+    def text(self):
+        """str: Text of the C-object as it was parsed (without the comments and the parts left out by the pre-processor
+        logic)."""
+        return self.source[self.start : self.end + 1]
 
 
 class instance(instance_og):
@@ -107,8 +126,10 @@ class instance(instance_og):
             of class :obj:`struct_r` or :obj:`misc_r`.
     """
 
-    def __init__(self, typ, inds, inde, cont):
-        instance_og.__init__(self, typ, inds, inde, cont)
+    __slots__ = ("name", "array", "elements")
+
+    def __init__(self, typ, inds, inde, cont, source):
+        instance_og.__init__(self, typ, inds, inde, cont, source)
         self.name, self.array, self.elements = self.str_parse(cont)
         if self.array != "-1":
             # this check doesn't make sense really because earlier I've assumed that we are given an array
@@ -170,9 +191,9 @@ class instance(instance_og):
             end = self.start + ind + lis[i + 1]
             text = body[lis[i] + 1 : lis[i + 1]]
             if self.type == "struct":
-                elem.append(struct_r(self.type, start, end, text))
+                elem.append(struct_r(self.type, start, end, text, self.source))
             else:
-                elem.append(misc_r(self.type, start, end, text))
+                elem.append(misc_r(self.type, start, end, text, self.source))
         return head, array, elem
 
     def reposition(self):
@@ -205,8 +226,10 @@ class struct(instance):
         name (str): Corrected (from :obj:`instance`) name of the structure.
     """
 
-    def __init__(self, typ, inds, inde, cont):
-        instance.__init__(self, typ, inds, inde, cont)
+    __slots__ = ("flav",)
+
+    def __init__(self, typ, inds, inde, cont, source):
+        instance.__init__(self, typ, inds, inde, cont, source)
         self.flav, self.name = self.add_parse(self.name)
 
     def add_parse(self, name):
@@ -249,8 +272,10 @@ class miscal(instance):
         array (str): Corrected (from :obj:`instance`) information about the array of the objects.
     """
 
-    def __init__(self, typ, inds, inde, cont):
-        instance.__init__(self, typ, inds, inde, cont)
+    __slots__ = ()
+
+    def __init__(self, typ, inds, inde, cont, source):
+        instance.__init__(self, typ, inds, inde, cont, source)
         self.name = self.add_parse(self.name)
 
     def add_parse(self, name):
@@ -286,10 +311,13 @@ class struct_r(instance_og):
         position (str): Position of the instance inside an array. Can be either a specific integer or an
             abstract expression to be interpreted later.
         entries (dict): A dictionary representing the defined contents of the instance of the ``struct``.
+        name (str): The type of the ``struct`` (set by the :obj:`struct` holding this instance).
     """
 
-    def __init__(self, typ, inds, inde, cont):
-        instance_og.__init__(self, typ, inds, inde, cont)
+    __slots__ = ("position", "entries", "name")
+
+    def __init__(self, typ, inds, inde, cont, source):
+        instance_og.__init__(self, typ, inds, inde, cont, source)
         self.position, self.entries = self.srr_parse(cont)
 
     def srr_parse(self, cont):
@@ -353,10 +381,13 @@ class misc_r(instance_og):
             abstract expression to be interpreted later.
         value (str): A value of this instance of the constant. Can be either a specific integer or an abstract
             expression to be interpreted later.
+        flav (str): The name of the array of constants (set by the :obj:`miscal` holding this instance).
     """
 
-    def __init__(self, typ, inds, inde, cont):
-        instance_og.__init__(self, typ, inds, inde, cont)
+    __slots__ = ("position", "value", "flav")
+
+    def __init__(self, typ, inds, inde, cont, source):
+        instance_og.__init__(self, typ, inds, inde, cont, source)
         self.position, self.value = self.mis_parse(cont)
 
     def mis_parse(self, cont):
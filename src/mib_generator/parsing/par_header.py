@@ -10,7 +10,7 @@ import mib_generator.parsing.par_methods as parm
 types = {"uint8_t", "uint16_t", "uint32_t", "uint64_t", "char", "unsigned int"}
 
 
-def str_parse(stri):
+def str_parse(stri, source=None):
     """Parse the given string into blocks of "top-level" C-structures.
 
     By going iteratively through the string and recognising the features of standard C-syntax, this function
@@ -20,12 +20,16 @@ def str_parse(stri):
 
     Args:
         stri (str): A string to be parsed/analysed into the C-objects.
+        source (str): The text of the whole file the C-objects are sliced from when their text is accessed (see
+            :attr:`structure.text`). If not given, the parsed string itself is used.
 
     Returns:
         list: List of Python representations of found C-objects, each represented by an object of child-class
         of :obj:`structure`
 
     """
+    if source is None:
+        source = stri
     strc = parm.erase_text(stri)
     depth = 0
     structures = []
@@ -52,15 +56,15 @@ def str_parse(stri):
             typ = "extern"
         elif strc[i] == "\n" and depth == 1 and typ == "define":
             depth = 0
-            structures.append(define(typ, start, i - 1, stri[start:i]))
+            structures.append(define(typ, start, i - 1, stri[start:i], source))
         elif strc[i] == ";" and depth == 1 and typ in {"extern", "struct", "enum"}:
             depth = 0
             if typ == "extern":
-                structures.append(extern(typ, start, i - 1, stri[start:i]))
+                structures.append(extern(typ, start, i - 1, stri[start:i], source))
             elif typ == "enum":
-                structures.append(enum(typ, start, i - 1, stri[start:i]))
+                structures.append(enum(typ, start, i - 1, stri[start:i], source))
             elif typ == "struct":
-                structures.append(struct(typ, start, i - 1, stri[start:i]))
+                structures.append(struct(typ, start, i - 1, stri[start:i], source))
         elif strc[i] in {"}", ")"}:
             depth -= 1
         elif strc[i] in {"{", "("}:
@@ -68,7 +72,7 @@ def str_parse(stri):
     return structures
 
 
-def str_parse_r(offset, stri):
+def str_parse_r(offset, stri, source):
     """Parse the given string into "2nd-order" blocks of C-structures.
 
     Unlike for :obj:`str_parse` this time "second-order" strings (that is strings inside other already recognised
@@ -79,6 +83,7 @@ def str_parse_r(offset, stri):
         offset (int): Offset of this string from the start of the original file. I.e. original start index of its
             first character.
         stri (str): The string to be parsed/interpreted into its contents.
+        source (str): The text of the whole file the string is part of (see :obj:`structure`).
 
     Returns:
         list:
@@ -109,18 +114,13 @@ def str_parse_r(offset, stri):
                     typ = l
         elif strc[i] == ";" and depth == 1:
             depth = 0
+            args = [typ, offset + start, offset + i - 1, stri[start:i], source]
             if typ == "enum":
-                structures.append(
-                    enum_r(typ, offset + start, offset + i - 1, stri[start:i])
-                )
+                structures.append(enum_r(*args))
             elif typ == "struct":
-                structures.append(
-                    struct_r(typ, offset + start, offset + i - 1, stri[start:i])
-                )
+                structures.append(struct_r(*args))
             else:
-                structures.append(
-                    misc_r(typ, offset + start, offset + i - 1, stri[start:i])
-                )
+                structures.append(misc_r(*args))
         elif strc[i] in {"}", ")"}:
             depth -= 1
         elif strc[i] in {"{", "("}:
@@ -134,26 +134,43 @@ class structure:
     This class holds properties which are shared by all Python representations of C-objects found in the
     analysed file.
 
+    There can be many of these objects for large files, so they are kept small: all the classes declare ``__slots__``
+    (and hence have no ``__dict__``, see :obj:`mib_generator.parsing.par_methods.fields` for listing their attributes)
+    and the text of the C-object is not stored in it, but sliced out of the text of the whole file (shared by all objects
+    in it) only when accessed (see :attr:`text`).
+
     Args:
         typ (str): The type of the C-object (e.g. ``struct`` or ``enum``).
         inds (int): Starting index of the C-object.
         inde (int): End index of the C-object.
         cont (str): Raw text of the C-object as in the source file.
+        source (str): Text of the whole file in which the C-object was found (without the comments and the parts left
+            out by the pre-processor logic, as it was parsed).
 
     Attributes:
         type (str): The type of the C-object (e.g. ``struct`` or ``enum``).
         start (int): Starting index of the C-object.
         end (int): End index of the C-object.
-        text (str): Raw text of the C-object as in the source file.
-        comment (list): List holding all found interpretable comments associated to this C-object.
+        source (str): Text of the whole file in which the C-object was found (without the comments and the parts left
+            out by the pre-processor logic, as it was parsed).
+        comment (list): List holding all found interpretable comments associated to this C-object (an empty tuple,
+            which is shared by all the objects, until some comment is found).
     """
 
-    def __init__(self, typ, inds, inde, cont):
+    __slots__ = ("type", "start", "end", "source", "comment")
+
+    def __init__(self, typ, inds, inde, cont, source):
         self.type = typ
         self.start = inds
         self.end = inde
-        self.text = cont
-        self.comment = []
+        self.source = source
+        self.comment = ()
+
+    @property
+    def text(self):
+        """str: Text of the C-object as it was parsed (without the comments and the parts left out by the pre-processor
+        logic)."""
+        return self.source[self.start : self.end + 1]
 
 
 class enum(structure):
@@ -170,8 +187,10 @@ class enum(structure):
         entries (dict): Dictionary containing key-value pairs found in the ``enum``.
     """
 
-    def __init__(self, typ, inds, inde, cont):
-        super().__init__(typ, inds, inde, cont)
+    __slots__ = ("name", "entries")
+
+    def __init__(self, typ, inds, inde, cont, source):
+        super().__init__(typ, inds, inde, cont, source)
         self.name, self.entries = self.ele_parse(cont)
 
     def ele_parse(self, cont):
@@ -240,8 +259,10 @@ class define(structure):
         expression (str): A string with the expression or value that the macro points to.
     """
 
-    def __init__(self, typ, inds, inde, cont):
-        super().__init__(typ, inds, inde, cont)
+    __slots__ = ("name", "expression")
+
+    def __init__(self, typ, inds, inde, cont, source):
+        super().__init__(typ, inds, inde, cont, source)
         self.name, self.expression = self.def_parse(cont)
 
     def def_parse(self, cont):
@@ -285,8 +306,10 @@ class extern(structure):
             elements (either integer value or an text expression to be later evaluated) in case it is an array.
     """
 
-    def __init__(self, typ, inds, inde, cont):
-        super().__init__(typ, inds, inde, cont)
+    __slots__ = ("flav", "name", "array")
+
+    def __init__(self, typ, inds, inde, cont, source):
+        super().__init__(typ, inds, inde, cont, source)
         self.flav, self.name, self.array = self.ext_parse(cont)
 
     def ext_parse(self, cont):
@@ -344,8 +367,10 @@ class struct(structure):
             some child-class of :obj:`structure`
     """
 
-    def __init__(self, typ, inds, inde, cont):
-        super().__init__(typ, inds, inde, cont)
+    __slots__ = ("name", "packed", "elements")
+
+    def __init__(self, typ, inds, inde, cont, source):
+        super().__init__(typ, inds, inde, cont, source)
         self.name, self.packed, self.elements = self.stc_parse(cont)
 
     def stc_parse(self, cont):
@@ -376,7 +401,7 @@ class struct(structure):
         else:
             packed = False
             name = head.replace(" ", "")
-        entries = str_parse_r(ind + 8 + self.start, body)
+        entries = str_parse_r(ind + 8 + self.start, body, self.source)
         return name, packed, entries
 
 
@@ -400,8 +425,10 @@ class struct_r(structure):
             elements (either integer value or an text expression to be later evaluated) in case it is an array.
     """
 
-    def __init__(self, typ, inds, inde, cont):
-        super().__init__(typ, inds, inde, cont)
+    __slots__ = ("name", "form", "array")
+
+    def __init__(self, typ, inds, inde, cont, source):
+        super().__init__(typ, inds, inde, cont, source)
         self.name, self.form, self.array = self.str_parse(cont)
 
     def str_parse(self, cont):
@@ -438,7 +465,9 @@ class struct_r(structure):
                     rest = ""
         else:
             ind = cont.rfind("}")
-            form = struct("struct", self.start, self.start + ind + 1, cont[: ind + 1])
+            form = struct(
+                "struct", self.start, self.start + ind, cont[: ind + 1], self.source
+            )
             rest = cont[ind + 1 :]
         if "[" in rest and "]" in rest:
             ind = rest.find("[")
@@ -473,8 +502,10 @@ class enum_r(structure):
 
     """
 
-    def __init__(self, typ, inds, inde, cont):
-        super().__init__(typ, inds, inde, cont)
+    __slots__ = ("name", "form", "bites", "array")
+
+    def __init__(self, typ, inds, inde, cont, source):
+        super().__init__(typ, inds, inde, cont, source)
         self.name, self.form, self.bites, self.array = self.enr_parse(cont)
 
     def enr_parse(self, cont):
@@ -503,7 +534,9 @@ class enum_r(structure):
             rest = x[ind + 1 :]
         else:
             ind = cont.rfind("}")
-            form = enum("enum", self.start, self.start + ind + 1, cont[: ind + 1])
+            form = enum(
+                "enum", self.start, self.start + ind, cont[: ind + 1], self.source
+            )
             rest = cont[ind + 1 :]
         if "[" in rest and "]" in rest:
             ind = rest.find("[")
@@ -539,10 +572,14 @@ class misc_r(structure):
         bites (int): Number of bites that the value of this constant is represented by.
         array (str): An expression set to "-1" if the constant is not an array and to its number of
             elements (either integer value or an text expression to be later evaluated) in case it is an array.
+        is_vpd (set): The vpd markings of the constant. Set only on the copies made for a specific TM-packet (see
+            :obj:`mib_generator.construction.TM_packet_methods.h_analysis`).
     """
 
-    def __init__(self, typ, inds, inde, cont):
-        super().__init__(typ, inds, inde, cont)
+    __slots__ = ("name", "bites", "array", "is_vpd")
+
+    def __init__(self, typ, inds, inde, cont, source):
+        super().__init__(typ, inds, inde, cont, source)
         self.name, self.bites, self.array = self.mir_parse(cont)
 
     def mir_parse(self, cont):
@@ -2,12 +2,48 @@
 
 This module holds various methods used for parsing of the header and normal C files and their
 subsequent interpretation into corresponding python objects.
+
+Attributes:
+    interactive (bool): Whether the user can be asked about the values of pre-processor conditions
+        that are missing in the config file. (``False`` e.g. when parsing in worker processes.)
+    decoded (dict): Already decoded contents of the interpretable comments with the texts of the comments as keys (see
+        :obj:`decode`). Cleared when the files are parsed again (see :obj:`mib_generator.parsing.load.reparse`), so
+        that it doesn't keep the contents of the old versions of the comments.
 """
 
+import json
+import re
+from array import array
+
 import json5
 
 import mib_generator.data.warn as warn
-import mib_generator.parsing.load as load
+import mib_generator.parsing.macros as macros
+
+interactive = True
+decoded = {}
+
+# comments, string/char literals and preprocessor directives recognised by :obj:`tokenize`
+token_pattern = re.compile(
+    r"""
+    (?P<comment>/\*.*?(?:\*/|\Z)|//[^\n]*)
+    |(?P<string>"(?:[^"\\\n]|\\.)*"?|'(?:[^'\\\n]|\\.)*'?)
+    |(?P<directive>^[ \t]*(?P<hash>\#[ \t]*[A-Za-z_]\w*))
+    """,
+    re.DOTALL | re.MULTILINE | re.VERBOSE,
+)
+
+
+# string literals, unquoted keys and trailing commas of the json5 subset handled by :obj:`normalise`
+json5_pattern = re.compile(
+    r"""
+    (?P<double>"(?:[^"\\]|\\.)*")
+    |(?P<single>'(?:[^'\\]|\\.)*')
+    |(?P<key>[A-Za-z_$][\w$]*)(?=\s*:)
+    |(?P<comma>,)(?=\s*[]}])
+    """,
+    re.DOTALL | re.VERBOSE,
+)
 
 
 def clean(stri, tokens):
@@ -15,7 +51,8 @@ def clean(stri, tokens):
 
     Takes a string and a list of tokens and replaces all occurences of the tokens in the string
     with an appropriate number of space so the absolute positions of unaffected parts of the
-    string stay the same.
+    string stay the same. All occurences are first marked in a :obj:`mask` in a single search
+    through the string and the "cleaned" string is then materialised at once.
 
     Args:
         stri (str): A string to be "cleaned".
@@ -24,70 +61,237 @@ def clean(stri, tokens):
     Returns:
         str: The resulting "cleaned" string.
     """
-    c = stri
-    for i in tokens:
-        c = c.replace(i, " " * len(i))
-    return c
+    buffer = mask()
+    pattern = "|".join(re.escape(i) for i in sorted(tokens, key=len, reverse=True))
+    for i in re.finditer(pattern, stri):
+        buffer.erase(i.start(), i.end())
+    return buffer.apply(stri)
+
+
+def tokenize(stri):
+    """Split the given string into a stream of code, comment, string and preprocessor tokens.
+
+    Runs a single (regex-driven) pass over the string and marks the spans of C comments (both ``/*...*/`` and
+    ``//...``), string/character literals and preprocessor directives (``#`` followed by the directive name at
+    the start of a line). Everything in between these is marked as plain code. The returned spans cover the
+    whole string, do not overlap and are given by absolute positions in it, so the same token stream can be
+    used for any other string derived from this one as long as the absolute positions are kept.
+
+    Args:
+        stri (str): The string to be split into tokens.
+
+    Returns:
+        list: List of tokens, each a tuple ``(kind, start, end)`` where ``kind`` is one of ``"code"``,
+        ``"comment"``, ``"string"`` or ``"directive"`` and ``stri[start:end]`` is the text of the token.
+    """
+    tokens = []
+    position = 0
+    for match in token_pattern.finditer(stri):
+        kind = match.lastgroup
+        if kind == "directive":
+            start = match.start("hash")
+        else:
+            start = match.start()
+        if start > position:
+            tokens.append(("code", position, start))
+        tokens.append((kind, start, match.end()))
+        position = match.end()
+    if position < len(stri):
+        tokens.append(("code", position, len(stri)))
+    return tokens
+
+
+def blank(stri, keep_lines=False):
+    """Replace all characters of the given string with spaces.
+
+    Args:
+        stri (str): The string to be blanked.
+        keep_lines (bool): If ``True``, newline characters are kept in place.
+
+    Returns:
+        str: A string of the same length consisting only of spaces (and newlines if these are kept).
+    """
+    if keep_lines and "\n" in stri:
+        return "\n".join(" " * len(i) for i in stri.split("\n"))
+    return " " * len(stri)
+
+
+class mask:
+    """Class representing a set of sections of a string which are to be replaced by spaces.
+
+    Rather than rebuilding the whole string every time some of its section is to be erased, the sections are
+    only collected as a list of intervals and the erasure is then applied at once (in a single pass through the
+    string) when :obj:`apply` is called. Since the erased sections are replaced by an equal number of spaces, the
+    absolute positions of the rest of the string stay the same. The same mask can be applied to more strings
+    with the same positions (e.g. to both the code and comment versions of a file).
 
+    Attributes:
+        intervals (list): List of ``[start, end]`` pairs of the sections to be erased.
+    """
 
-def erase_text(stri):
+    def __init__(self):
+        self.intervals = []
+
+    def erase(self, start, end):
+        """Mark the section between the given indexes to be erased.
+
+        Args:
+            start (int): Start index of the section.
+            end (int): End index (exclusive) of the section.
+        """
+        if end > start:
+            self.intervals.append([start, end])
+
+    def apply(self, stri):
+        """Create a copy of the given string with all marked sections replaced by spaces.
+
+        Args:
+            stri (str): The string to which the mask is to be applied.
+
+        Returns:
+            str: The string with the marked sections erased.
+        """
+        if not self.intervals:
+            return stri
+        parts = []
+        position = 0
+        for start, end in sorted(self.intervals):
+            start = max(start, position)
+            if end <= start:
+                continue
+            parts.append(stri[position:start])
+            parts.append(" " * (end - start))
+            position = end
+        parts.append(stri[position:])
+        return "".join(parts)
+
+
+def erase_text(stri, tokens=None):
     """Erase all text inside quotation marks in the given string.
 
-    Looks for first order quotation marks (that is, not inside another quotation marks) and
+    Looks for first order quotation marks (that is, not inside another quotation marks or a comment) and
     replaces their content with matching amount of spaces so that the total length of the
-    string remains the same.
+    string remains the same. The quotation marks themselves are kept.
 
     Args:
         stri (str): The string in which the quotation marks are to be replaced.
+        tokens (list): Token stream of the string as given by :obj:`tokenize`. Computed if not given.
 
     Returns:
         str: The string with the quotation marks contents replaced.
     """
-    mod = 0  # 0 for no quotation, 1 for ' and 2 for "
-    new = stri
-    for i in range(len(stri)):
-        if stri[i] == '"' and mod != 2:
-            if mod == 0:
-                mod = 1
-            else:
-                mod = 0
-        elif stri[i] == "'" and mod != 1:
-            if mod == 0:
-                mod = 2
-            else:
-                mod = 0
-        elif mod != 0:
-            new = new[:i] + " " + new[i + 1 :]
-    return new
+    if tokens is None:
+        tokens = tokenize(stri)
+    parts = []
+    for kind, start, end in tokens:
+        if kind == "string":
+            closed = end - start > 1 and stri[end - 1] == stri[start]
+            inner = end - 1 if closed else end
+            parts.append(stri[start])
+            parts.append(blank(stri[start + 1 : inner]))
+            parts.append(stri[inner:end])
+        else:
+            parts.append(stri[start:end])
+    return "".join(parts)
 
 
 def line_index(stri):
     """Give list of indexes of line starts of the given string.
 
-    Based on the newline character, looks for indexes of new lines and adds them to a list.
+    Based on the newline character, looks for indexes of new lines and adds them to a compact array of integers
+    (which, unlike a list of Python integers, takes only 8 bytes per line and can still be bisected).
 
     Args:
         stri (str): The string to be analysed.
 
     Returns:
-        list: List of indexes at which new lines start.
+        array.array: Array of indexes at which new lines start.
     """
-    starts = []
-    for i in range(len(stri)):
-        if stri[i] == "\n":
-            starts.append(i + 1)
-    return starts
+    return array("q", (i.end() for i in re.finditer("\n", stri)))
+
 
+def spans(tokens, kind="comment"):
+    """Collect the spans of the tokens of the given kind into a compact array.
 
-def split_comment(stri):
+    Args:
+        tokens (list): Token stream of a string as given by :obj:`tokenize`.
+        kind (str): The kind of the tokens to be collected.
+
+    Returns:
+        array.array: Flat array of the start and end positions of the tokens, i.e. ``[start_0, end_0, start_1, end_1,
+        ...]``.
+    """
+    found = array("q")
+    for typ, start, end in tokens:
+        if typ == kind:
+            found.append(start)
+            found.append(end)
+    return found
+
+
+def code_only(stri, comments):
+    """Give version of the string with the content of its comments replaced by spaces.
+
+    The comment delimiters (``/*``, ``*/`` and ``//``) are kept in place, so that the later stages can still recognise
+    where the comments were.
+
+    Args:
+        stri (str): The string (text of a file).
+        comments (array.array): Spans of the comments in the string as given by :obj:`spans`.
+
+    Returns:
+        str: The string with the comments omitted.
+    """
+    parts = []
+    position = 0
+    for k in range(0, len(comments), 2):
+        start, end = comments[k], comments[k + 1]
+        parts.append(stri[position:start])
+        if stri.startswith("//", start):
+            parts.append("//" + " " * (end - start - 2))
+        elif end - start >= 4 and stri.startswith("*/", end - 2):
+            parts.append("/*" + " " * (end - start - 4) + "*/")
+        else:
+            parts.append("/*" + " " * (end - start - 2))
+        position = end
+    parts.append(stri[position:])
+    return "".join(parts)
+
+
+def comment_only(stri, comments):
+    """Give version of the string with everything but its comments replaced by spaces.
+
+    New lines outside of the comments are kept in place, so that the later stages can still recognise where the
+    comments ended.
+
+    Args:
+        stri (str): The string (text of a file).
+        comments (array.array): Spans of the comments in the string as given by :obj:`spans`.
+
+    Returns:
+        str: The string with the C-code omitted.
+    """
+    parts = []
+    position = 0
+    for k in range(0, len(comments), 2):
+        start, end = comments[k], comments[k + 1]
+        parts.append(blank(stri[position:start], True))
+        parts.append(stri[start:end])
+        position = end
+    parts.append(blank(stri[position:], True))
+    return "".join(parts)
+
+
+def split_comment(stri, tokens=None):
     """Split the given string into a section with C comments and a section without them.
 
-    Goes iteratively through the string and based on single/multi-line C-comment syntax, recognised
-    blocks of comments and marks their start/end positions. It then constructs versions of the passed
-    string with the comment/code blocks ommited.
+    Based on the comment tokens found by :obj:`tokenize`, constructs versions of the passed string with the
+    comment/code blocks ommited (replaced by an equal number of spaces so the absolute positions in both
+    versions are the same as in the original string), see :obj:`code_only` and :obj:`comment_only`.
 
     Args:
         stri (str): The string to be split into comments/code.
+        tokens (list): Token stream of the string as given by :obj:`tokenize`. Computed if not given.
 
     Returns:
         tuple: A tuple consisting of:
@@ -95,128 +299,95 @@ def split_comment(stri):
             * *str* - The original string with C-code omitted.
 
     """
-    mod = (
-        0  # 0 for normal content, 1 for '...', 2 for "...", 3 for /* ...*/ and 4 for //
-    )
-    comm = ""
-    cont = ""
-    start = 0
-    sections = []
-    for i in range(
-        len(stri)
-    ):  # iterates through the string and marks different sections of it
-        x = stri[i]
-        xy = stri[i : i + 2]
-        if x == '"' and mod == 2:
-            mod = 0
-        elif x == '"' and mod == 0:
-            mod = 2
-        elif x == "'" and mod == 1:
-            mod = 0
-        elif x == "'" and mod == 0:
-            mod = 1
-        elif xy == "/*" and mod == 0:
-            mod = 3
-            sections.append([start, i + 1])
-        elif xy == "*/" and mod == 3:
-            mod = 0
-            sections.append([start, i - 1])
-            start = i
-        elif xy == "//" and mod == 0:
-            mod = 4
-            sections.append([start, i + 1])
-            start = i + 2
-        elif x == "\n" and mod == 4:
-            mod = 0
-            sections.append([start, i - 1])
-            start = i
-    if sections[-1][-1] != len(stri) - 1:
-        sections.append([start, len(stri) - 1])
-    switch = False  # keeps track of whether a given section is a content or a comment
-    for i in sections:
-        cut = stri[i[0] : i[1] + 1]
-        if not switch:
-            cont = cont + cut
-            # comm = comm + " " * len(cut)
-            if cut[:1] == "\n":  # horrible bodge which will come back to haunt me
-                comm = comm + cut[:1] + " " * (len(cut) - 3) + cut[1:][-2:]
-            else:
-                comm = comm + cut[:2] + " " * (len(cut) - 4) + cut[2:][-2:]
-        else:
-            cont = cont + " " * len(cut)
-            comm = comm + cut
-        switch = not switch
-    return cont, comm
+    if tokens is None:
+        tokens = tokenize(stri)
+    comments = spans(tokens)
+    return code_only(stri, comments), comment_only(stri, comments)
 
 
-def preproc_parse(stri):
-    """Parse C-preprocessor conditional syntax into logic blocks.
+def directives(stri, tokens=None):
+    """Find the pre-processor directives in the given string.
 
-    Looks for logical C-preprocessor directives (specifically ``#ifdef``, ``#ifndef``, etc.), and marks
-    the start/end indices of the corresponding "logic blocks" (i.e. sections beween ``#ifdef`` and ``#else``).
-    Then returns these block indexes in a list. Also performs some checks along the way.
+    For each directive token found by :obj:`tokenize`, the name of the directive and its argument (the rest of the
+    logical line, i.e. including the lines joined by a backslash, without the comment delimiters) are given.
 
     Args:
-        stri (str): The string to be analysed/parsed.
+        stri (str): The string with C-code (without comments, see :obj:`code_only`) to be analysed.
+        tokens (list): Token stream of the string as given by :obj:`tokenize`. Computed if not given.
 
     Returns:
-        list: List of list of indexes denoting start/end positions of the logic blocks.
+        list: List of tuples ``(name, start, end, stop, argument)``, where ``name`` is the name of the directive (e.g.
+        ``"ifdef"``), ``start`` and ``end`` are the start/end indexes of the directive name (including the ``#``),
+        ``stop`` is the end index of the logical line and ``argument`` is the text of the argument.
     """
-    blocks = []
-    log = []
-    status = 0
-    status_log = [0]
-    for i in range(len(stri)):
-        if stri[i : i + 6] == "#ifdef":
-            log.append([i])
-            status_log.append(status)
-            status = 1
-        elif stri[i : i + 7] == "#ifndef":
-            log.append([i])
-            status_log.append(status)
-            status = 1
-        elif stri[i : i + 5] == "#else":
-            log[-1].append(i)
-            if status != 1:
-                warn.raises("WPM1")
-            status = 2
-        elif stri[i : i + 6] == "#endif":
-            if status not in {1, 2}:
-                warn.raises("WPM1")
-            status = status_log.pop(-1)
-            log[-1].append(i)
-            blocks.append(log.pop(-1))
-    if status != 0:
-        warn.raises("WPM1")
-    return blocks
-
-
-def preproc_eval(variab):
+    if tokens is None:
+        tokens = tokenize(stri)
+    found = []
+    for kind, start, end in tokens:
+        if kind != "directive":
+            continue
+        stop = stri.find("\n", end)
+        while stop > 0 and stri[stop - 1] == "\\":
+            stop = stri.find("\n", stop + 1)
+        if stop < 0:
+            stop = len(stri)
+        argument = stri[end:stop].replace("\\\n", " ")
+        argument = re.sub(r"/\*\s*(?:\*/)?|//", " ", argument)
+        found.append((stri[start + 1 : end].strip(), start, end, stop, argument))
+    return found
+
+
+def preproc_eval(variab, where=None):
     """Evaluate whether a pre-processing condition holds.
 
-    Looks into config file whether the passed pre-processing condition holds. If the condition name
-    does not occur in the config file, asks the user what boolean value it should assign to it.
+    Looks into the table of the pre-processor symbols (see :obj:`mib_generator.parsing.macros`) whether the passed
+    symbol is defined. If the symbol is given neither in the config file nor on the command line (or in the file so far),
+    it is resolved according to the :attr:`mib_generator.parsing.macros.policy` (e.g. by asking the user what boolean
+    value it should assign to it, or if asking is not possible, see :attr:`interactive`, by taking it as not holding and
+    raising a warning).
 
     Args:
         variab (str): Name of the pre-processing variable/condition to be evaluated.
+        where (mib_generator.parsing.macros.scope): The scope of the symbols in the file (the symbol table only if not
+            given).
 
     Returns:
         bool: Truth-value of the condition.
 
     """
-    config = load.conf["def"]
-    if variab in config.keys():
-        return bool(config[variab])
-    else:
-        return bool(input("Is " + variab + "? (skip for False) "))
+    if where is None:
+        where = macros.scope()
+    return where.lookup(variab) is not None
+
+
+def preproc_condition(name, argument, where):
+    """Evaluate the condition of a conditional pre-processor directive.
+
+    Args:
+        name (str): Name of the directive (``"ifdef"``, ``"ifndef"``, ``"if"`` or ``"elif"``).
+        argument (str): The argument of the directive (see :obj:`directives`).
+        where (mib_generator.parsing.macros.scope): The scope of the symbols in the file.
+
+    Returns:
+        bool: Truth-value of the condition. If the condition can't be evaluated, a warning is raised and it is taken as
+        not holding.
+    """
+    try:
+        if name in {"ifdef", "ifndef"}:
+            return preproc_eval(argument.split()[0], where) == (name == "ifdef")
+        return bool(macros.evaluate(argument, where))
+    except (ValueError, IndexError, ZeroDivisionError, RecursionError):
+        warn.raises("WPM3", argument.strip())
+        return False
 
 
-def preproc_filter(stri_o, stri_c):
+def preproc_filter(stri_o, stri_c, tokens=None):
     """Filter out what parts of the C-code should be further considered based on preprocessor directives.
 
-    First, this function looks for blocks pre-processor logic using the :obj:`preproc_parse` function. It then evaluates
-    the condition associated with this logic with :obj:`preproc_eval` and depending on the result, decides what
-    parts of the string should be deleted (replaced by equal number of spaces). Finally it performs this replacement.
+    First, this function goes through the pre-processor logic using the :obj:`preproc_mask` function, which evaluates
+    the conditions associated with this logic and depending on the result, decides what parts of the string should be
+    deleted (replaced by equal number of spaces) and marks them in a :obj:`mask`. Finally it performs this replacement at
+    once for both of the strings.
 
     The preprocessor logic is determined based on the passed string with the code (``stri_o``), but the deliting
     is applied also to the string with comment (``stri_c``).
@@ -224,7 +395,7 @@ def preproc_filter(stri_o, stri_c):
     Args:
         stri_o (str): The text with C-code to be filtered on the basis of pre-processor logic.
         stri_c (str): The text with comments to be filtered on the basis of pre-processor logic.
-
+        tokens (list): Token stream of the text as given by :obj:`tokenize`. Computed if not given.
 
     Returns:
         tuple: A tuple containing:
@@ -232,72 +403,199 @@ def preproc_filter(stri_o, stri_c):
             * *str* - The string with C-code with the pre-processor logic applied.
             * *str* - The string with comments with the pre-processor logic applied.
     """
-    blocks = preproc_parse(stri_o)
-    filt_o = stri_o
-    filt_c = stri_c
-    delete = []
-    for i in blocks:
-        condition = stri_o[i[0] : i[1]].split()[1]
-        evalu = preproc_eval(condition)
-        if stri_o[i[0] : i[1]].split()[0] == "#ifndef":
-            evalu = not evalu
-        if not evalu:
-            delete.append([i[0], i[1]])
-            if len(i) == 2:
-                delete.append([i[1], i[1] + 6])
-            else:
-                delete.append([i[1], i[1] + 5])
-                delete.append([i[2], i[2] + 6])
-        else:
-            if len(i) == 3:
-                delete.append([i[1], i[2]])
-                delete.append([i[2], i[2] + 6])
-            else:
-                delete.append([i[1], i[1] + 6])
-            if stri_o[i[0] : i[1]].startswith("#ifdef"):
-                delete.append([i[0], i[0] + 6])
-            else:
-                delete.append([i[0], i[0] + 7])
-    for i in delete:
-        filt_o = filt_o[: i[0]] + " " * (i[1] - i[0]) + filt_o[i[1] :]
-        filt_c = filt_c[: i[0]] + " " * (i[1] - i[0]) + filt_c[i[1] :]
-    return filt_o, filt_c
-
-
-def com_parse(comm):
+    buffer = preproc_mask(stri_o, tokens)
+    return buffer.apply(stri_o), buffer.apply(stri_c)
+
+
+def preproc_mask(stri_o, tokens=None):
+    """Mark the parts of the C-code which are to be left out based on the preprocessor directives.
+
+    Does the same as :obj:`preproc_filter`, but instead of applying the resulting :obj:`mask` to the text, returns the
+    mask itself, so that it can be applied to the (code or comment) text of the file only when the text is needed.
+
+    The directives are gone through in the order in which they appear in the file. The ``#ifdef``/``#ifndef`` and
+    ``#if``/``#elif`` conditions are evaluated (see :obj:`preproc_condition`) only in the reachable parts of the file and
+    the symbols defined/undefined there by ``#define``/``#undef`` are taken into account in the later conditions. Of each
+    conditional block, only the first branch whose condition holds is kept.
+
+    Args:
+        stri_o (str): The text with C-code to be filtered on the basis of pre-processor logic.
+        tokens (list): Token stream of the text as given by :obj:`tokenize`. Computed if not given.
+
+    Returns:
+        mask: The mask of the parts of the text which are to be left out.
+    """
+    if tokens is None:
+        tokens = tokenize(stri_o)
+    where = macros.scope()
+    buffer = mask()
+    # for each open conditional block: [whether the block is reachable, whether some of its branches was taken,
+    # whether the current branch is taken, list of the branches as [name, start, end, stop, taken]]
+    blocks = []
+    for name, start, end, stop, argument in directives(stri_o, tokens):
+        live = not blocks or blocks[-1][2]
+        if name in {"ifdef", "ifndef", "if"}:
+            holds = live and preproc_condition(name, argument, where)
+            blocks.append([live, holds, holds, [[name, start, end, stop, holds]]])
+        elif name in {"elif", "else"}:
+            if not blocks or blocks[-1][3][-1][0] == "else":
+                warn.raises("WPM1")
+                continue
+            block = blocks[-1]
+            holds = block[0] and not block[1]
+            if holds and name == "elif":
+                holds = preproc_condition(name, argument, where)
+            block[1] = block[1] or holds
+            block[2] = holds
+            block[3].append([name, start, end, stop, holds])
+        elif name == "endif":
+            if not blocks:
+                warn.raises("WPM1")
+                continue
+            branches = blocks.pop()[3]
+            bounds = [i[1] for i in branches[1:]] + [start]
+            for [kind, begin, finish, line_end, taken], bound in zip(branches, bounds):
+                if not taken:
+                    buffer.erase(begin, bound)
+                elif kind == "else":
+                    buffer.erase(begin, finish)
+                else:
+                    # the whole line with the condition is erased
+                    buffer.erase(begin, line_end if line_end < bound else finish)
+            buffer.erase(start, end)
+        elif live and name == "define":
+            match = re.match(r"\s*([A-Za-z_]\w*)(\()?(.*)", argument, re.DOTALL)
+            if match:
+                val = "" if match.group(2) else match.group(3).strip()
+                where.define(match.group(1), val)
+        elif live and name == "undef" and argument.split():
+            where.undefine(argument.split()[0])
+    if blocks:
+        warn.raises("WPM1")
+    return buffer
+
+
+def com_parse(comm, tokens=None):
     """Parse the comments in the string into blocks corresponding to singular comments.
 
-    Looks at each passed comment and evaluates whether it should be interpreted or not. If yes, it then calls
-    the class :obj:`comment` from it and adds this object to the list of interpreted comments.
+    Looks at each comment token in the string and evaluates whether it should be interpreted or not (i.e. whether
+    it is of the form ``/*{...}*/``). If yes, it then calls the class :obj:`comment` from it and adds this object
+    to the list of interpreted comments.
 
     Args:
-        comm (list): List of strings each representing the content of a  single comment.
+        comm (str): The string with (only) comments of the file.
+        tokens (list): Token stream of the string as given by :obj:`tokenize`. Computed if not given.
 
     Returns:
         list: List of found interpreted comments, each represented by an object of the :obj:`comment` class.
     """
-    depth = 0
-    start = 0
+    if tokens is None:
+        tokens = tokenize(comm)
     blocks = []
-    for i in range(len(comm)):
-        if comm[i : i + 3] == "/*{" and depth == 0:
-            start = i + 2
-            depth = 1
-        elif comm[i : i + 3] == "}*/" and depth == 1:
-            blocks.append(comment(start, i, comm[start : i + 1]))
-            depth = 0
-        elif comm[i : i + 2] == "//" and depth == 0:
-            depth = 2
-        elif comm[i] == "\n" and depth == 2:
-            depth = 0
+    for kind, start, end in tokens:
+        if (
+            kind == "comment"
+            and end - start >= 6
+            and comm.startswith("/*{", start)
+            and comm.startswith("}*/", end - 3)
+        ):
+            blocks.append(comment(start + 2, end - 3, comm[start + 2 : end - 2]))
     return blocks
 
 
+def fields(obj):
+    """Give the attributes of the given object together with their values.
+
+    Unlike ``__dict__``, this works also for the objects declaring ``__slots__`` (e.g. the Python representations of the
+    C-objects, see :obj:`mib_generator.parsing.par_header.structure`), whose attributes are listed from the ``__slots__``
+    of all their classes (the unset ones are left out).
+
+    Args:
+        obj (object): The object whose attributes are to be listed.
+
+    Returns:
+        dict: Dictionary with the names of the attributes as keys and their values as values.
+    """
+    data = {}
+    for i in reversed(type(obj).__mro__):
+        for l in getattr(i, "__slots__", ()):
+            if hasattr(obj, l):
+                data[l] = getattr(obj, l)
+    data.update(getattr(obj, "__dict__", {}))
+    return data
+
+
+def normalise(stri):
+    """Rewrite the common json5 extensions in the given string into plain JSON.
+
+    Only the most common extensions used in the comments are handled, namely unquoted keys, single-quoted strings and
+    trailing commas. Anything else (comments, hexadecimal numbers, etc.) is left as it is, so that the result is
+    then not valid JSON and the string has to be decoded by the full json5 parser.
+
+    Args:
+        stri (str): The json5 string to be rewritten.
+
+    Returns:
+        str: The rewritten string.
+    """
+
+    def quote(match):
+        # inside double quotes, the double quotes have to be escaped while the single ones don't
+        if match.group() == '"':
+            return '\\"'
+        elif match.group(1) == "'":
+            return "'"
+        return match.group()
+
+    def replace(match):
+        kind = match.lastgroup
+        if kind == "single":
+            inner = match.group()[1:-1]
+            return '"' + re.sub(r'\\(.)|"', quote, inner, flags=re.DOTALL) + '"'
+        elif kind == "key":
+            return '"' + match.group() + '"'
+        elif kind == "comma":
+            return ""
+        return match.group()
+
+    return json5_pattern.sub(replace, stri)
+
+
+def decode(stri):
+    """Decode the json5 content of an interpretable comment.
+
+    The pure-Python json5 parser is slow, so the string is first tried to be decoded by the (C-accelerated) standard
+    :obj:`json` module, then by it again after it is rewritten by :obj:`normalise` and only if neither works, by the
+    json5 parser. The results are cached in :attr:`decoded`, so that the same content is decoded only once (the returned
+    values are hence shared and must not be modified).
+
+    Args:
+        stri (str): The json5 string to be decoded.
+
+    Returns:
+        object: The decoded content.
+
+    Raises:
+        ValueError: If the string is not a valid json5.
+    """
+    if stri in decoded:
+        return decoded[stri]
+    try:
+        value = json.loads(stri)
+    except ValueError:
+        try:
+            value = json.loads(normalise(stri))
+        except ValueError:
+            value = json5.loads(stri)
+    decoded[stri] = value
+    return value
+
+
 class comment:
     """Class representing an occurrence of an interpretable comment in the file, entries found in it, etc.
 
-    Saves the comment text and its start/end indexes and then it tries to interpret the comment as a dictionary
-    represented in the json5 format.
+    Saves the comment text and its start/end indexes. The comment is interpreted as a dictionary represented in the
+    json5 format (see :obj:`decode`) only when its entries are first accessed.
 
     Args:
         start (int): Start index of the comment in the original file.
@@ -308,15 +606,30 @@ class comment:
         start (int): Start index of the comment in the original file.
         end (int): End index of the comment in the original file.
         text (str): Original text of the comment.
-        entries (dict): Dictionary containing the content of the comment found in the json5 string.
+        parsed (dict or None): The decoded content of the comment or ``None`` if it wasn't decoded yet.
+        structure (object): The C-object the comment belongs to (set by
+            :obj:`mib_generator.parsing.parser_main.file.linker`).
     """
 
+    __slots__ = ("text", "start", "end", "parsed", "structure")
+
     def __init__(self, start, end, text):
         self.text = text
         self.start = start
         self.end = end
-        try:
-            self.entries = json5.loads(text)
-        except:
-            warn.raises("EPM1", self.text)
-            self.entries = {}
+        self.parsed = None
+
+    @property
+    def entries(self):
+        """dict: Dictionary containing the content of the comment found in the json5 string.
+
+        The dictionary is shared by all the comments with the same text (see :obj:`decode`), so it is read-only and must
+        not be modified in place.
+        """
+        if self.parsed is None:
+            try:
+                self.parsed = decode(self.text)
+            except:
+                warn.raises("EPM1", self.text)
+                self.parsed = {}
+        return self.parsed
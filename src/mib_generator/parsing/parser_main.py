@@ -3,6 +3,13 @@
 This module is a starting point for parsing of C-files and holds class which plays the role of their interpretation.
 """
 
+import bisect
+import mmap
+import os
+
+import mib_generator.data.warn as warn
+import mib_generator.parsing.cache as cache
+import mib_generator.parsing.macros as macros
 import mib_generator.parsing.par_cfile as parc
 import mib_generator.parsing.par_header as parh
 import mib_generator.parsing.par_methods as parm
@@ -16,12 +23,19 @@ class file:
     and :obj:`parsing.par_methods`. The steps are as follows:
 
     1. Get general information about the file (length, line indexes)
-    2. Separate text in comment and the code (while keeping the absolute positions in the file).
+    2. Split the text into a stream of code/comment/string/preprocessor tokens and based on it separate text in
+       comment and the code (while keeping the absolute positions in the file).
     3. Process any C-preprocessor logic that's in the code.
     4. Parse the resulting code into Python representations of the corresponding C-objects.
     5. Parse the comments into intepretable sections (written in json5) and interpret their content.
     6. Create links between the found C-objects and interterpretable comments
 
+    Only the text of the file itself and its code-only version after the pre-processor logic (which the C-objects refer
+    to by their positions) are kept after the parsing. The other versions of the text are kept just as the spans of the
+    comments and the :obj:`mib_generator.parsing.par_methods.mask` of the pre-processor logic and are materialised again
+    only when accessed (e.g. by the visualiser). Each of the intermediate versions is also dropped as soon as it has been
+    parsed.
+
     Args:
         stri (str): The content of the file to be parsed/analysed.
         header (bool): Parameter denoting whether file is a header or normal C file.
@@ -29,11 +43,11 @@ class file:
     Attributes:
         text (str): Text of the file.
         max_position (int): Length of the file.
-        lines (list): List of positions of line starts.
-        text_o (str): File text with only code (without comments).
-        text_c (str): File text with only comments (without code).
-        text_of (str): File (with code) after sorting out the pre-processor logic.
-        text_cf (str): File (with comments) after sorting out the pre-processor logic.
+        lines (array.array): Array of positions of line starts.
+        comment_spans (array.array): Flat array of start and end positions of the comments in the file (see
+            :obj:`mib_generator.parsing.par_methods.spans`).
+        erased (mib_generator.parsing.par_methods.mask): Mask of the parts of the file left out by the pre-processor
+            logic.
         structures (list): List of Python representations of C-objects found in the file.
 
             The Python representations are child classes of either :obj:`mib_generator.parsing.par_cfile.instance_og`
@@ -47,57 +61,135 @@ class file:
         self.text = stri
         self.max_position = len(stri)
         self.lines = parm.line_index(stri)
-        self.text_o, self.text_c = parm.split_comment(stri)
-        self.text_of, self.text_cf = parm.preproc_filter(self.text_o, self.text_c)
+        tokens = parm.tokenize(stri)
+        self.comment_spans = parm.spans(tokens)
+        text_o = parm.code_only(stri, self.comment_spans)
+        self.erased = parm.preproc_mask(text_o, tokens)
+        text_of = self.erased.apply(text_o)
+        del text_o
+        # the C-objects keep the code-only text (see :attr:`mib_generator.parsing.par_header.structure.text`)
         if header:
-            self.structures = parh.str_parse(self.text_of)
+            self.structures = parh.str_parse(text_of)
         else:
-            self.structures = parc.str_parse(self.text_of)
-        self.comments = parm.com_parse(self.text_cf)
+            self.structures = parc.str_parse(text_of)
+        del text_of
+        self.comments = parm.com_parse(self.text_cf, tokens)
         self.link = self.linker()
 
+    @property
+    def text_o(self):
+        """str: File text with only code (without comments)."""
+        return parm.code_only(self.text, self.comment_spans)
+
+    @property
+    def text_c(self):
+        """str: File text with only comments (without code)."""
+        return parm.comment_only(self.text, self.comment_spans)
+
+    @property
+    def text_of(self):
+        """str: File (with code) after sorting out the pre-processor logic."""
+        return self.erased.apply(self.text_o)
+
+    @property
+    def text_cf(self):
+        """str: File (with comments) after sorting out the pre-processor logic."""
+        return self.erased.apply(self.text_c)
+
     def linker(self):
         """Link each comment to a corresponding C-object in the file
 
-        Goes one by one through comments and searches for their corresponding structure.
-        For the closes found match, creates link from the comment to the structure and from the structure to the comment
+        Goes one by one through comments and searches for their corresponding structure. If the comment lies inside
+        a structure, it belongs to the closest element of the structure that starts before it (or to the structure
+        itself if it is an enum). Otherwise it belongs to the closest structure that starts after it.
+        For the found match, creates link from the comment to the structure and from the structure to the comment
         (by generating attributes for their respectives classes) and returns them in a list of pairs.
 
+        The searching is done by bisection over the starting positions of the (sorted and non-overlapping) top-level
+        structures and of the elements of each structure, so it works with files of any length.
+
         Returns:
             list of pairs: Pairs of comments and their corresponding structures.
         """
+        structures = sorted(self.structures, key=lambda x: x.start)
+        starts = [l.start for l in structures]
+        elements = {}
         pairs = []
         for i in self.comments:
             ind = i.start
-            elem = {}
-            minim = 50000
-            for l in self.structures:
-                if l.start <= ind <= l.end:
-                    if l.type != "enum":  # very ugly bodge again
-                        for k in l.elements:
-                            if ind - k.start >= 0 and ind - k.start <= minim:
-                                elem = k
-                                minim = ind - k.start
-                    else:
-                        elem = l
-                        minim = 49999
-
-                    break
-            if minim == 50000:
-                for l in self.structures:
-                    if l.start - ind >= 0 and l.start - ind <= minim:
-                        elem = l
-                        minim = l.start - ind
+            elem = None
+            k = bisect.bisect_right(starts, ind) - 1
+            if k >= 0 and ind <= structures[k].end:
+                l = structures[k]
+                if l.type == "enum":  # very ugly bodge again
+                    elem = l
+                else:
+                    if id(l) not in elements.keys():
+                        ordered = sorted(l.elements, key=lambda x: x.start)
+                        elements[id(l)] = (ordered, [m.start for m in ordered])
+                    ordered, ele_starts = elements[id(l)]
+                    m = bisect.bisect_right(ele_starts, ind) - 1
+                    if m >= 0:
+                        elem = ordered[m]
+            if elem is None:
+                # last of the structures starting at the closest position after the comment
+                k = bisect.bisect_left(starts, ind)
+                if k < len(starts):
+                    k = bisect.bisect_right(starts, starts[k]) - 1
+                    elem = structures[k]
+            if elem is None:
+                continue
             pairs.append([i, elem])
+            if not elem.comment:
+                elem.comment = []
             elem.comment.append(i)
             i.structure = elem
         return pairs
 
 
+def read(name):
+    """Read the content of the file with the given path.
+
+    The file is memory-mapped and decoded directly from the mapped pages, so that no separate copy of its raw bytes is
+    made in memory. The line endings are normalised to ``\\n`` (as when reading the file in text mode). If the file can't
+    be read at all, a warning is raised and it is taken as empty.
+
+    Args:
+        name (str): Path to the file.
+
+    Returns:
+        str: The content of the file.
+    """
+    try:
+        with open(name, "rb") as fil:
+            if os.fstat(fil.fileno()).st_size == 0:
+                return ""
+            with mmap.mmap(fil.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+                try:
+                    stri = str(buffer, "utf-8")
+                except UnicodeDecodeError:
+                    warn.raises("WPP2", name)
+                    stri = str(buffer, "utf-8", "replace")
+    except (OSError, ValueError):
+        warn.raises("WPP1", name)
+        return ""
+    if "\r" in stri:
+        stri = stri.replace("\r\n", "\n").replace("\r", "\n")
+    return stri
+
+
 def main(name="/home/vachaj11/Documents/MIB/start/src/PUS_TmDefs.h"):
     """Create a parsed python representation of a file.
 
-    Opens file, depending on its ending chooses correct parser and lets it run.
+    Reads the file (see :obj:`read`), depending on its ending chooses correct parser and lets it run. If the same file
+    (with the same relevant configuration) was already parsed in some previous run, the parsed representation is loaded
+    from the :obj:`mib_generator.parsing.cache` instead, and the messages raised when it was parsed are raised again
+    (so that the output is the same with or without the cache).
+
+    The values of the pre-processor symbols the conditional directives of the file depended on are recorded with the
+    parsed file (as its ``signature``, see :obj:`mib_generator.parsing.macros.signature`), so that it can be found out
+    later whether the file has to be parsed again when the symbols change (see
+    :obj:`mib_generator.parsing.load.revise`).
 
     Args:
         name (str): Path to file.
@@ -106,15 +198,33 @@ def main(name="/home/vachaj11/Documents/MIB/start/src/PUS_TmDefs.h"):
         file: File object
     """
 
-    try:
-        fil = open(name, "r")
-        c = fil.read()
-        fil.close()
-    except:
-        c = ""
-    if name[-1] == "h":
-        x = file(c, True)
+    c = read(name)
+    header = name[-1] == "h"
+    key = cache.key(c, header) if cache.enabled else None
+    found = cache.fetch(key) if key else None
+    if found is not None:
+        x, messages, resolved = found
+        # the symbols resolved already (e.g. while parsing an earlier file) wouldn't be warned about again
+        for i in messages:
+            if i[1] != "WPM2" or i[2][0] not in macros.table:
+                warn.show(*i)
+        for i in resolved:
+            macros.table.setdefault(i, resolved[i])
     else:
-        x = file(c, False)
+        messages = []
+        known = set(macros.table)
+        outer = warn.collect(messages)
+        try:
+            with warn.context(file=name):
+                x = file(c, header)
+        finally:
+            warn.collect(outer)
+            for i in messages:
+                warn.show(*i)
+        x.path = name
+        if key:
+            resolved = {i: macros.table[i] for i in macros.table if i not in known}
+            cache.store(key, x, messages, resolved)
     x.path = name
+    x.signature = macros.signature(cache.conditions(c))
     return x
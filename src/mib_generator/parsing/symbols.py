@@ -0,0 +1,118 @@
+"""Index of the names found in the parsed files.
+
+During construction, the C-objects are repeatedly looked up by their names (e.g. when expanding references to other
+structures) and the interpretable comments by the packet types or commands they describe. Instead of going through
+all the parsed structures/comments on each such lookup, an index (:obj:`table`) is built once for each group of parsed
+files after they are loaded by :obj:`mib_generator.parsing.load.load_all` and all the lookups go through it.
+
+Attributes:
+    tables (dict): Dictionary of the already built indexes, with the ids of the lists of files as keys and pairs
+        [list of files, :obj:`table`] as values.
+"""
+
+tables = {}
+
+
+class table:
+    """Class representing an index of the C-objects and interpretable comments in a group of parsed files.
+
+    All the lists in the index keep the order in which the objects appear in the files, so the lookups give the same
+    results as going through the files one by one.
+
+    Args:
+        files (list): List of files (of type :obj:`mib_generator.parsing.parser_main.file`) to be indexed.
+
+    Attributes:
+        files (list): The indexed files.
+        structures (dict): Dictionary with names of C-objects as keys and lists of the C-objects with such name as
+            values.
+        pack_types (dict): Dictionary with the ``"pack_type"`` entries of comments as keys and lists of the comments
+            with such entry as values.
+        commands (list): List of comments which describe TC-commands (i.e. include ``"packet"`` and ``"text_id"``
+            entries).
+    """
+
+    def __init__(self, files):
+        self.files = files
+        self.structures = {}
+        self.pack_types = {}
+        self.commands = []
+        for i in [a for file in files for a in file.structures]:
+            name = getattr(i, "name", None)
+            if type(name) is str:
+                self.structures.setdefault(name, []).append(i)
+        for i in [a for file in files for a in file.comments]:
+            if not (i.entries and type(i.entries) is dict):
+                continue
+            typ = i.entries.get("pack_type")
+            if type(typ) is str:
+                self.pack_types.setdefault(typ, []).append(i)
+            if {"packet", "text_id"} < i.entries.keys():
+                self.commands.append(i)
+
+    def named(self, name, typ=None):
+        """Find all C-objects with the given name.
+
+        Args:
+            name (str): Name of the C-objects.
+            typ (str): If given, only C-objects of this type (e.g. ``"struct"``) are returned.
+
+        Returns:
+            list: List of the found C-objects.
+        """
+        found = self.structures.get(name, []) if type(name) is str else []
+        if typ is not None:
+            found = [i for i in found if i.type == typ]
+        return found
+
+    def first(self, name):
+        """Find the first C-object with the given name.
+
+        Args:
+            name (str): Name of the C-object.
+
+        Returns:
+            object or None: The found C-object or ``None`` if there is no such object.
+        """
+        found = self.named(name)
+        return found[0] if found else None
+
+
+def of(files):
+    """Give the index of the given files, building it if it doesn't exist yet.
+
+    Args:
+        files (list): List of files (of type :obj:`mib_generator.parsing.parser_main.file`).
+
+    Returns:
+        table: The index of the files.
+    """
+    entry = tables.get(id(files))
+    if entry is None or entry[0] is not files:
+        entry = [files, table(files if files else [])]
+        tables[id(files)] = entry
+    return entry[1]
+
+
+def named(name, *groups):
+    """Find all C-objects with the given name in the given groups of files.
+
+    Args:
+        name (str): Name of the C-objects.
+        *groups (list): Lists of files (of type :obj:`mib_generator.parsing.parser_main.file`) to be searched.
+
+    Returns:
+        list: List of the found C-objects in the order of the groups.
+    """
+    return [a for files in groups for a in of(files).named(name)]
+
+
+def build(*groups):
+    """Forget all previously built indexes and build new ones for the given groups of files.
+
+    Args:
+        *groups (list): Lists of files (of type :obj:`mib_generator.parsing.parser_main.file`) to be indexed.
+    """
+    tables.clear()
+    for i in groups:
+        of(i)
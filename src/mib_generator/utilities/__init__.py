@@ -3,8 +3,13 @@ interaction with it more straightforward, automatic and pleasant.
 
 The submodules here are:
     
+    * :obj:`benchmark` - Module that measures the time taken by the individual phases of the program on synthetic input files
+      (accessible from terminal as ``mib-gen-bench``).
+    * :obj:`corpus` - Module that generates synthetic input C-files of chosen size for testing and benchmarking.
     * :obj:`data_gen` - Module that helped automate inputting all MIB tables parameters into the :obj:`mib_generator.data.longdata` 
       file/method. Unused now.
+    * :obj:`profiling` - Module that records the time, memory and object counts of the phases of a run of the program (with
+      the ``--profile`` flag).
     * :obj:`update` - Module holding methods that create a small CLI interface (accessible from terminal if the main script
       is run with appropriate flags) that allows the user to update the configuration options and input/output paths.
     * :obj:`visualiser` - Module that provides a GUI representation of the Python objects created by parsing the inputted files.
@@ -0,0 +1,242 @@
+"""Benchmark of the individual phases of the program on synthetic input files.
+
+The input files of the chosen sizes are generated by :obj:`mib_generator.utilities.corpus` and the whole process is run
+on them phase by phase (see :attr:`phases`), measuring the time each phase takes. The results are emitted in a
+machine-readable form (one JSON object per line and run, see :obj:`bench`), so that they can be compared between versions
+of the program to catch performance regressions, or plotted against the size of the input to get scaling curves.
+
+It can be run from terminal as ``mib-gen-bench`` (see :obj:`bench_run` or ``mib-gen-bench --help``).
+
+Attributes:
+    phases (list): Names of the measured phases in the order in which they are run.
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+
+import mib_generator.construction.TM_packet_methods as tm_packet_methods
+import mib_generator.data.warn as warn
+import mib_generator.generation.gener as gener
+import mib_generator.generation.gener_doc as generd
+import mib_generator.generation.manifest as manifest
+import mib_generator.main.main as main
+import mib_generator.parsing.cache as cache
+import mib_generator.parsing.load as load
+import mib_generator.parsing.symbols as symbols
+import mib_generator.temp.temp as temp
+import mib_generator.utilities.corpus as corpus
+
+phases = [
+    "parse_all",
+    "index",
+    "construct_tm",
+    "construct_tc",
+    "generation_hub",
+    "save_tables",
+    "gen_doc",
+]
+
+
+def bench(directory, jobs=1, use_cache=False, document=True):
+    """Run the whole process on the input files in the given directory once, measuring the time of each phase.
+
+    The phases are: parsing of the files (:obj:`mib_generator.parsing.load.parse_all`), creation of the evaluation
+    dictionary and indexes of names, construction of the TM-packets and of the TC-commands (see
+    :obj:`mib_generator.main.main.construct_tm` and :obj:`mib_generator.main.main.construct_tc`), generation of the MIB
+    tables in memory (:obj:`mib_generator.generation.gener.generation_hub`), their saving
+    (:obj:`mib_generator.generation.gener.save_tables`) and generation and saving of the ``.docx`` document
+    (:obj:`mib_generator.generation.gener_doc.gen_doc`). The messages raised during the run are not displayed, only
+    counted.
+
+    Args:
+        directory (str): Path to a directory with the input files and config files (e.g. as created by
+            :obj:`mib_generator.utilities.corpus.generate`).
+        jobs (int): Number of processes/threads used for parsing and generation (see :obj:`mib_generator.main.main.main`).
+        use_cache (bool): ``True`` if the parse cache should be used, ``False`` (by default) if all the files should be
+            parsed anew.
+        document (bool): ``True`` (by default) if the ``.docx`` document should be generated too.
+
+    Returns:
+        dict: Dictionary holding under ``"phases"`` a dictionary with the names of the phases as keys and the times they
+        took (in seconds) as values (``None`` for phases which weren't run), under ``"total"`` the sum of these times and
+        further the numbers of the constructed packets/commands, generated rows and raised messages.
+    """
+    temp.move_conf(directory)
+    cache.enabled = use_cache
+    load.workers = jobs
+    gener.workers = jobs
+    load.get_paths()
+    load.get_conf()
+    manifest.start(False)
+    messages = []
+    warn.collect(messages)
+    times = dict.fromkeys(phases)
+    try:
+        began = time.perf_counter()
+        load.parse_all()
+        times["parse_all"] = time.perf_counter() - began
+
+        began = time.perf_counter()
+        load.enum_stuff()
+        symbols.build(load.TmH, load.TcH, load.TcTmH, load.TmC)
+        times["index"] = time.perf_counter() - began
+
+        began = time.perf_counter()
+        tm_lis, cal = main.construct_tm()
+        times["construct_tm"] = time.perf_counter() - began
+
+        began = time.perf_counter()
+        tc_lis, dec, ver, TcHead = main.construct_tc()
+        tm_packet_methods.resolve_names(tm_lis + tc_lis)
+        times["construct_tc"] = time.perf_counter() - began
+
+        began = time.perf_counter()
+        tables = gener.generation_hub(tm_lis, tc_lis, cal, dec, ver, TcHead)
+        times["generation_hub"] = time.perf_counter() - began
+
+        began = time.perf_counter()
+        gener.save_tables(tables)
+        times["save_tables"] = time.perf_counter() - began
+
+        if document:
+            began = time.perf_counter()
+            docum = generd.gen_doc(tm_lis, tc_lis)
+            docum.save(load.out_doc)
+            times["gen_doc"] = time.perf_counter() - began
+    finally:
+        warn.collect(None)
+    return {
+        "phases": times,
+        "total": sum(i for i in times.values() if i is not None),
+        "tm_packets": len(tm_lis),
+        "tc_commands": len(tc_lis),
+        "rows": sum(len(i) for i in tables.values()),
+        "messages": len(messages),
+    }
+
+
+def scaling(
+    sizes, parameters=20, repeat=3, jobs=1, use_cache=False, document=True, seed=0
+):
+    """Benchmark the program on synthetic input files of the given sizes.
+
+    For each size, the input files are generated into a temporary directory by
+    :obj:`mib_generator.utilities.corpus.generate` and the program is run on them (by :obj:`bench`) the given number of
+    times.
+
+    Args:
+        sizes (list): Numbers of TM-packets (and of TC-commands) in the generated files.
+        parameters (int): Number of parameters in each TM-packet and TC-command.
+        repeat (int): Number of runs for each size.
+        jobs (int): Number of processes/threads used for parsing and generation.
+        use_cache (bool): ``True`` if the parse cache should be used, ``False`` (by default) otherwise.
+        document (bool): ``True`` (by default) if the ``.docx`` document should be generated too.
+        seed (int): Seed of the random choices made during the generation of the files.
+
+    Yields:
+        dict: The result of each run as returned by :obj:`bench` together with the parameters of the run.
+    """
+    for size in sizes:
+        with tempfile.TemporaryDirectory(prefix="mib-bench-") as directory:
+            paths = corpus.generate(directory, size, parameters, seed=seed)
+            volume = sum(os.path.getsize(i) for i in paths.values())
+            for run in range(repeat):
+                result = {
+                    "packets": size,
+                    "parameters": parameters,
+                    "input_bytes": volume,
+                    "jobs": jobs,
+                    "cache": use_cache,
+                    "run": run,
+                    "python": platform.python_version(),
+                }
+                yield result | bench(directory, jobs, use_cache, document)
+
+
+def bench_run():
+    """Manages the CLI of the benchmark and runs it.
+
+    The results of the runs are written as JSON objects (one per line) to the standard output or appended to the given
+    file, and a short summary is printed to the standard error.
+    """
+    prog = "MIB Creator benchmark"
+    desc = "Measures the time of the phases of MIB creation on synthetic C-files of given sizes"
+    parser = argparse.ArgumentParser(prog=prog, description=desc)
+    parser.add_argument(
+        "-s",
+        "--sizes",
+        help="numbers of TM-packets (and TC-commands) in the generated files",
+        nargs="+",
+        default=[10, 100],
+        type=int,
+    )
+    parser.add_argument(
+        "-m",
+        "--parameters",
+        help="number of parameters in each packet/command",
+        default=20,
+        type=int,
+    )
+    parser.add_argument(
+        "-r",
+        "--repeat",
+        help="number of runs for each size",
+        default=3,
+        type=int,
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        help="number of processes/threads used for parsing and generation (0 for one per CPU core)",
+        default=1,
+        type=int,
+    )
+    parser.add_argument(
+        "-c",
+        "--cache",
+        help="use the parse cache (the files are parsed anew in each run otherwise)",
+        action="store_true",
+    )
+    parser.add_argument(
+        "-x",
+        "--xdocument",
+        help="don't generate the .docx document",
+        action="store_true",
+    )
+    parser.add_argument(
+        "-o",
+        "--output",
+        help="append the results to this file instead of printing them",
+        required=False,
+    )
+    arguments = parser.parse_args()
+    results = scaling(
+        arguments.sizes,
+        arguments.parameters,
+        arguments.repeat,
+        arguments.jobs,
+        arguments.cache,
+        not arguments.xdocument,
+    )
+    out = open(arguments.output, "a") if arguments.output else sys.stdout
+    try:
+        for i in results:
+            out.write(json.dumps(i) + "\n")
+            out.flush()
+            print(
+                "{} packets, run {}: {:.3f} s".format(
+                    i["packets"], i["run"], i["total"]
+                ),
+                file=sys.stderr,
+            )
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+
+if __name__ == "__main__":
+    bench_run()
@@ -0,0 +1,392 @@
+"""Generator of synthetic C-files for testing and benchmarking of the program.
+
+The generated files mimic the structure of real TM/TC definition files (see :obj:`generate`) and their size can be
+freely chosen, so that e.g. the scaling of the parsing/construction/generation with the number of packets can be measured
+(see :obj:`mib_generator.utilities.benchmark`). The generation is deterministic for a given seed.
+
+Attributes:
+    files (dict): Names of the generated C-files with the keys under which they are given in the ``paths.json5`` file.
+    types (list): Pairs of C data types and their sizes in bits used for the generated parameters.
+"""
+import json
+import os
+import random
+
+files = {
+    "TmHeader": "PUS_TmDefs.h",
+    "TcHeader": "PUS_TcDefs.h",
+    "TcTmHeader": "PUS_TcTmDefs.h",
+    "TmFile": "PUS_TmDefs.c",
+}
+
+types = [["uint8_t", 8], ["uint16_t", 16], ["uint32_t", 32], ["int16_t", 16]]
+
+
+def generate(directory, packets=100, parameters=20, commands=None, seed=0):
+    """Generate a synthetic set of input C-files together with config files for them.
+
+    The files include TM-packets and TC-commands with the given number of parameters each, described by json5 annotation
+    comments, structures nested in them (blocks shared by more packets, which themselves include a structure from the
+    TcTm header), ``enum`` and ``#define`` substitutions, calibrations, decalibrations, verifications, repeated groups
+    and ``#ifdef``/``#ifndef`` blocks. Besides the C-files, ``paths.json5`` and ``config.json5`` files are written into
+    the directory, so that it can be used as a custom config directory (with the outputs going into its ``out``
+    subdirectory).
+
+    Args:
+        directory (str): Path to the directory into which the files are written (it is created if it doesn't exist).
+        packets (int): Number of TM-packets.
+        parameters (int): Number of parameters in each TM-packet and TC-command.
+        commands (int): Number of TC-commands. If not given, the same as the number of TM-packets.
+        seed (int): Seed of the random choices made during the generation.
+
+    Returns:
+        dict: Dictionary with the keys used in ``paths.json5`` and paths to the generated files as values.
+    """
+    rand = random.Random(seed)
+    if commands is None:
+        commands = packets
+    texts = {
+        "TcTmHeader": tctm_header(),
+        "TmHeader": tm_header(rand, packets, parameters),
+        "TmFile": tm_file(rand, packets),
+        "TcHeader": tc_header(rand, commands, parameters),
+    }
+    os.makedirs(os.path.join(directory, "out"), exist_ok=True)
+    paths = {}
+    for i in files:
+        paths[i] = os.path.join(directory, files[i])
+        with open(paths[i], "w") as fil:
+            fil.write(texts[i])
+    config = {
+        "def": {
+            "PUS_TMDEFS_H": False,
+            "PUS_TCDEFS_H": False,
+            "PUS_TCTMDEFS_H": False,
+            "BENCH_A": True,
+            "BENCH_B": False,
+        },
+        "mib": [
+            "mcf",
+            "pid",
+            "pic",
+            "lgf",
+            "txf",
+            "txp",
+            "caf",
+            "cap",
+            "paf",
+            "pas",
+            "cvs",
+            "tpcf",
+            "pcf",
+            "plf",
+            "cur",
+            "vpd",
+            "ccf",
+            "cpc",
+            "cdf",
+            "prf",
+            "prv",
+            "cvp",
+        ],
+        "nam": {"pcf": 4, "cpc": 4, "nat_pcf": "", "nat_cpc": "N"},
+    }
+    outputs = {
+        "OutDir": os.path.join(directory, "out"),
+        "OutDoc": os.path.join(directory, "out", "out.docx"),
+    }
+    with open(os.path.join(directory, "paths.json5"), "w") as fil:
+        json.dump(paths | outputs, fil, indent=4)
+    with open(os.path.join(directory, "config.json5"), "w") as fil:
+        json.dump(config, fil, indent=4)
+    return paths
+
+
+def index_base(index, step):
+    """Give the base index of the names of parameters of a packet/command.
+
+    The names of the parameters consist of a prefix and 4 hexadecimal digits (see the ``"nam"`` entry in the config), so
+    the bases are spaced by the given step and wrap around once all the 4 digits are used up.
+
+    Args:
+        index (int): Index of the packet/command.
+        step (int): Number of names to be reserved for each packet/command.
+
+    Returns:
+        str: The base index as 4 hexadecimal digits.
+    """
+    return "{:04X}".format(index * step % 0x10000)
+
+
+def tctm_header():
+    """Create the text of the header shared by TM and TC definitions.
+
+    Returns:
+        str: The text of the file.
+    """
+    return """#ifndef PUS_TCTMDEFS_H
+#define PUS_TCTMDEFS_H
+
+#define MAX_LEVEL 200
+#define REP_N (3)
+
+enum ApidNames {
+    APID_A = 0,
+    APID_B = 1,
+};
+
+/*{cvs_def: 1, cvs_type: "A", default: true, cvs_interval: 10}*/
+/*{cvs_def: 2, cvs_type: "S", cve: 1, cvs_interval: 5}*/
+/*{cvs_def: 3, cvs_type: "C", cvs_interval: 20}*/
+struct PACKED Shared {
+    uint16_t word; /*{desc: "shared word"}*/
+    uint8_t flag; /*{desc: "shared flag"}*/
+};
+
+#endif
+"""
+
+
+def tm_header(rand, packets, parameters):
+    """Create the text of the TM header file.
+
+    Args:
+        rand (random.Random): The source of random choices.
+        packets (int): Number of TM-packets.
+        parameters (int): Number of parameters in each TM-packet.
+
+    Returns:
+        str: The text of the file.
+    """
+    calibs = max(4, packets // 5)
+    blocks = max(1, packets // 10)
+    lines = [
+        "#ifndef PUS_TMDEFS_H",
+        "#define PUS_TMDEFS_H",
+        '#include "PUS_TcTmDefs.h"',
+        "",
+        "#define NUM_REP (4)",
+        "#define TM_MAX 10",
+        "",
+        "enum TmType {",
+    ]
+    lines += ["    TM_P{} = {},".format(i, i) for i in range(packets)]
+    lines += ["};", ""]
+    for i in range(calibs):
+        match i % 4:
+            case 0:
+                body = "mcf: {{a0: {}, a1: {}}}".format(i, rand.randint(1, 9) / 2)
+            case 1:
+                body = 'text_cal: {min: 0, lookup: [{val: 0, text: "OFF"}, {val: 1, text: "ON"}]}'
+            case 2:
+                body = "num_cal: [[0, 1.0], [10, {}.0]]".format(rand.randint(2, 9))
+            case 3:
+                body = "lgf: {{a0: 1, a1: {}}}".format(rand.randint(1, 9))
+        lines.append(
+            '/*{{cal_ident: "CAL{:05d}", cal_def: "cal{}", {}, desc: "calibration {}"}}*/'.format(
+                i, i, body, i
+            )
+        )
+    lines += [
+        "struct PACKED TmHead {",
+        '    uint8_t version : 3; /*{desc: "version"}*/',
+        "    uint8_t type : 1;",
+        "    uint16_t apid : 11;",
+        "    uint16_t seq;",
+        '    uint32_t time; /*{type: "CUCTIME4_2"}*/',
+        "};",
+        "",
+    ]
+    for i in range(blocks):
+        lines += [
+            "struct PACKED Blk{} {{".format(i),
+            '    uint16_t volt; /*{{desc: "block {} voltage", cal: "cal{}", unit: "V"}}*/'.format(
+                i, rand.randrange(calibs)
+            ),
+            '    uint8_t state; /*{{desc: "block {} state"}}*/'.format(i),
+            "    struct Shared sh;",
+            "};",
+            "",
+        ]
+    for i in range(packets):
+        lines.append(
+            '/*{{pack_type: "TM_P{}", spid: {}, desc: "packet {}", text_id: "PKT{}", prefix: "TMP", base_par_index: "{}"}}*/'.format(
+                i, 10000 + i, i, i, index_base(i, 2 * parameters + 8)
+            )
+        )
+        lines.append("struct PACKED Pkt{} {{".format(i))
+        lines.append(
+            '    uint8_t sid; /*{{sid: true, const_value: "{}", desc: "sid"}}*/'.format(
+                i % 256
+            )
+        )
+        lines.append("    struct Blk{} blk;".format(i % blocks))
+        for l in range(parameters):
+            lines += tm_parameter(rand, i, l, calibs)
+        lines += ["};", ""]
+    lines.append("#endif")
+    return "\n".join(lines) + "\n"
+
+
+def tm_parameter(rand, packet, index, calibs):
+    """Create the lines declaring one parameter of a TM-packet.
+
+    Args:
+        rand (random.Random): The source of random choices.
+        packet (int): Index of the TM-packet.
+        index (int): Index of the parameter in the packet.
+        calibs (int): Number of the calibrations available.
+
+    Returns:
+        list: The lines of text.
+    """
+    typ = rand.choice(types)[0]
+    name = "p{}".format(index)
+    entries = 'desc: "par {} pkt {}", Mnemonic: "M{}_{}"'.format(
+        index, packet, packet, index
+    )
+    match index % 7:
+        case 1:
+            entries += ', cal: "cal{}"'.format(rand.randrange(calibs))
+        case 3:
+            entries += ', unit: "s"'
+        case 5:
+            return [
+                '    {} {}[NUM_REP]; /*{{vpd: "fixed", {}}}*/'.format(
+                    typ, name, entries
+                )
+            ]
+        case 6:
+            return [
+                "#ifdef BENCH_A",
+                "    {} {}; /*{{{}}}*/".format(typ, name, entries),
+                "#else",
+                "    {} {}b; /*{{{}}}*/".format(typ, name, entries),
+                "#endif",
+            ]
+    return ["    {} {}; /*{{{}}}*/".format(typ, name, entries)]
+
+
+def tm_file(rand, packets):
+    """Create the text of the TM ``.c`` file with the list of TM-packets.
+
+    Args:
+        rand (random.Random): The source of random choices.
+        packets (int): Number of TM-packets.
+
+    Returns:
+        str: The text of the file.
+    """
+    lines = [
+        '#include "PUS_TmDefs.h"',
+        "",
+        "const uint16_t apidNum[2] = {",
+        "    [APID_A] = 100,",
+        "    [APID_B] = 200,",
+        "};",
+        "",
+        "const struct TmPacketDef tmPackets[{}] = {{".format(packets),
+    ]
+    for i in range(packets):
+        lines.append(
+            "    {{.type = TM_P{}, .serviceType = {}, .serviceSubType = {}, .apid = {}}},".format(
+                i,
+                rand.choice([3, 5, 13]),
+                1 + i % 200,
+                rand.choice(["APID_A", "APID_B"]),
+            )
+        )
+    lines.append("};")
+    return "\n".join(lines) + "\n"
+
+
+def tc_header(rand, commands, parameters):
+    """Create the text of the TC header file.
+
+    Args:
+        rand (random.Random): The source of random choices.
+        commands (int): Number of TC-commands.
+        parameters (int): Number of parameters in each TC-command.
+
+    Returns:
+        str: The text of the file.
+    """
+    lines = [
+        "#ifndef PUS_TCDEFS_H",
+        "#define PUS_TCDEFS_H",
+        "",
+        '/*{text_id: "TCHEAD", desc: "tc header", prefix: "HDR", base_par_index: 10}*/',
+        "struct PACKED TcHead {",
+        '    uint16_t apid : 11; /*{desc: "apid"}*/',
+        '    uint8_t serviceType; /*{desc: "service"}*/',
+        '    uint8_t subType; /*{desc: "subtype"}*/',
+        "    uint8_t spare : 5;",
+        "};",
+        "",
+        '/*{dec_ident: "DEC1", enum: "ModeEnum", desc: "modes"}*/',
+        "enum ModeEnum {",
+        '    MODE_OFF = 0, /*{text: "off"}*/',
+        '    MODE_ON = 1, /*{text: "on"}*/',
+        "};",
+        "",
+    ]
+    for i in range(commands):
+        verifs = rand.choice(["", ", cvs: [1, 2]", ", cvs: [3]"])
+        lines.append(
+            '/*{{packet: {}, text_id: "CMD{}", desc: "command {}", service: {}, sub: {}, apid: 100, prefix: "TCC", base_par_index: "{}", Mnemonic: "C{}"{}}}*/'.format(
+                i + 1,
+                i,
+                i,
+                8 + i % 10,
+                1 + i % 200,
+                index_base(i, 2 * parameters),
+                i,
+                verifs,
+            )
+        )
+        lines.append("struct PACKED Cmd{} {{".format(i))
+        lines.append("    struct TcHead tcHead;")
+        for l in range(parameters):
+            lines += tc_parameter(rand, i, l)
+        lines += ["};", ""]
+    lines.append("#endif")
+    return "\n".join(lines) + "\n"
+
+
+def tc_parameter(rand, command, index):
+    """Create the lines declaring one parameter of a TC-command.
+
+    Args:
+        rand (random.Random): The source of random choices.
+        command (int): Index of the TC-command.
+        index (int): Index of the parameter in the command.
+
+    Returns:
+        list: The lines of text.
+    """
+    typ = rand.choice(types)[0]
+    name = "p{}".format(index)
+    entries = 'desc: "par {} cmd {}", Mnemonic: "N{}_{}"'.format(
+        index, command, command, index
+    )
+    match index % 6:
+        case 1:
+            entries += ', enum: "ModeEnum"'
+        case 2:
+            entries += ', min: 0, max: "MAX_LEVEL"'
+        case 3:
+            return [
+                '    uint8_t {}; /*{{cdf: "count", {}}}*/'.format(name, entries),
+                '    {} {}d; /*{{cdf: "data", default: "REP_N", {}}}*/'.format(
+                    typ, name, entries.replace('Mnemonic: "', 'Mnemonic: "D')
+                ),
+            ]
+        case 4:
+            return ["    uint8_t spare : {};".format(rand.randint(1, 7))]
+        case 5:
+            return [
+                "#ifndef BENCH_B",
+                "    {} {}; /*{{{}}}*/".format(typ, name, entries),
+                "#endif",
+            ]
+    return ["    {} {}; /*{{{}}}*/".format(typ, name, entries)]
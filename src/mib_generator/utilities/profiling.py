@@ -0,0 +1,167 @@
+"""Timing and profiling of the phases of the program.
+
+When enabled (e.g. with the ``--profile`` flag), each phase of the program (loading of the config, parsing, construction,
+generation of each of the MIB tables, etc.) is run inside a :obj:`phase`, which records its wall-clock time, CPU time,
+peak resident memory and the number of Python objects alive after it. Optionally, each phase is also profiled by
+``cProfile`` and the statistics are saved into a given directory. The records can be then displayed (see :obj:`report`)
+or saved as JSON.
+
+Attributes:
+    enabled (bool): Whether the phases should be recorded at all.
+    dump_dir (str or None): Path to a directory where the ``cProfile`` statistics of each phase are to be saved, or
+        ``None`` if the phases shouldn't be profiled.
+    records (list): List of the records of the finished phases (as dictionaries) in the order in which they finished.
+    active (bool): Whether some phase is being profiled by ``cProfile`` at the moment (only one profiler can be active
+        at a time, so the phases nested in it or run concurrently with it are not profiled separately).
+    lock (threading.Lock): Lock guarding :attr:`active`.
+"""
+import cProfile
+import gc
+import json
+import os
+import sys
+import threading
+import time
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+import mib_generator.data.warn as warn
+
+enabled = False
+dump_dir = None
+records = []
+active = False
+lock = threading.Lock()
+
+
+class phase:
+    """Context manager recording the resources used by one phase of the program.
+
+    If profiling is not enabled, it does nothing. Otherwise, upon exit, a record of the phase is appended to
+    :attr:`records`. The record is also returned upon entering, so that further counts (e.g. the number of generated rows)
+    can be added to it. The CPU time is measured for the current thread only, so that the phases run concurrently in
+    more threads (e.g. generation of the tables) don't count each other's time. If a directory for the ``cProfile``
+    statistics is set, the phase is profiled unless another phase is already being profiled (so the statistics of the
+    outer phase cover the phases nested in it).
+
+    Args:
+        name (str): Name of the phase.
+
+    Attributes:
+        name (str): Name of the phase.
+        record (dict): The record of the phase.
+        profile (cProfile.Profile or None): The profiler of the phase (if it is profiled).
+        wall (float): Wall-clock time (of :obj:`time.perf_counter`) when the phase began.
+        cpu (float): CPU time (of :obj:`time.thread_time`) when the phase began.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self.record = {"phase": name}
+        self.profile = None
+
+    def __enter__(self):
+        if not enabled:
+            return self.record
+        if dump_dir is not None:
+            with lock:
+                if not active:
+                    globals()["active"] = True
+                    self.profile = cProfile.Profile()
+                    self.profile.enable()
+        self.wall = time.perf_counter()
+        self.cpu = time.thread_time()
+        return self.record
+
+    def __exit__(self, typ, value, traceback):
+        if not enabled:
+            return
+        self.record["wall"] = time.perf_counter() - self.wall
+        self.record["cpu"] = time.thread_time() - self.cpu
+        if self.profile is not None:
+            self.profile.disable()
+            globals()["active"] = False
+            self.record["dump"] = dump(self.profile, self.name)
+        self.record["peak_rss"] = peak_rss()
+        self.record["objects"] = len(gc.get_objects())
+        records.append(self.record)
+
+
+def start(profile=False, dump=None):
+    """Enable/disable recording of the phases and forget the previous records.
+
+    Args:
+        profile (bool): ``True`` if the phases should be recorded, ``False`` otherwise.
+        dump (str): Path to a directory where the ``cProfile`` statistics of each phase are to be saved (or ``None`` if
+            the phases shouldn't be profiled).
+    """
+    globals()["enabled"] = bool(profile or dump)
+    globals()["dump_dir"] = dump
+    records.clear()
+
+
+def peak_rss():
+    """Give the peak resident memory of the process so far.
+
+    Returns:
+        int or None: The peak resident memory in bytes or ``None`` if it can't be found out on this platform.
+    """
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def dump(profile, name):
+    """Save the statistics of a profiled phase into the :attr:`dump_dir` directory.
+
+    Args:
+        profile (cProfile.Profile): The profiler of the phase.
+        name (str): Name of the phase (used for the name of the file).
+
+    Returns:
+        str or None: Path to the saved file or ``None`` if it couldn't be saved.
+    """
+    base = "".join(i if i.isalnum() else "_" for i in name)
+    path = os.path.join(dump_dir, "{:02d}_{}.prof".format(len(records), base))
+    try:
+        os.makedirs(dump_dir, exist_ok=True)
+        profile.dump_stats(path)
+        return path
+    except:
+        warn.raises("WUP1", path)
+        return None
+
+
+def report(path=None):
+    """Display the records of the phases and possibly save them as JSON.
+
+    Args:
+        path (str): Path to a file the records are to be saved into as JSON, or ``None`` if they should only be displayed.
+    """
+    if not enabled:
+        return
+    for i in records:
+        rss = "-" if i["peak_rss"] is None else "{:.1f}".format(i["peak_rss"] / 2**20)
+        extra = "".join(
+            ", {} {}".format(i[k], k) for k in ["packets", "rows"] if k in i
+        )
+        warn.raises(
+            "CUP1",
+            i["phase"],
+            "{:.3f}".format(i["wall"]),
+            "{:.3f}".format(i["cpu"]),
+            rss,
+            str(i["objects"]),
+            extra,
+        )
+    if path:
+        try:
+            with open(path, "w") as fil:
+                json.dump(records, fil, indent=4)
+        except:
+            warn.raises("WUP2", path)
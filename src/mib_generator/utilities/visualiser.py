@@ -28,6 +28,7 @@ from PySide6.QtWidgets import (
 
 import mib_generator.data.longdata as longdata
 import mib_generator.parsing.load as load
+import mib_generator.parsing.par_methods as parm
 
 policy = QSizePolicy(QSizePolicy.Preferred, QSizePolicy.MinimumExpanding)
 
@@ -233,9 +234,10 @@ class Ui_MainWindow(object):
 def getdata(struct):
     """Extract all posible showable (str, int) data about an object
 
-    From a list of attributes that the passed object has, extracts the interesting ones (which are not buildins for any Python
-    object) and if they have showable value (their value is either ``str`` or ``int`` and it isn't the whole text of the
-    corresponding C code found in the original C-file), adds this attribute-value pair to a list. It also tries to substitute
+    From a list of attributes that the passed object has (see :obj:`mib_generator.parsing.par_methods.fields`), extracts the
+    interesting ones (which are not buildins for any Python object) and if they have showable value (their value is either
+    ``str`` or ``int`` and it isn't the text of the corresponding C code or of the whole file), adds this attribute-value
+    pair to a list. It also tries to substitute
     the name of the attribute with a more human-readable name by looking it up in
     :obj:`mib_generator.data.longdata.translation`.
 
@@ -246,9 +248,9 @@ def getdata(struct):
         list: A list holding all "interesting" attributes of the original object jointly with their values.
     """
     data = []
-    dic = struct.__dict__
+    dic = parm.fields(struct)
     for i in dic:
-        if (type(dic[i]) is str or type(dic[i]) is int) and i != "text":
+        if (type(dic[i]) is str or type(dic[i]) is int) and i not in {"text", "source"}:
             try:
                 data.append([longdata.translation[i], dic[i]])
             except KeyError:
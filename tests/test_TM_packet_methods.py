@@ -0,0 +1,122 @@
+import hashlib
+from types import SimpleNamespace
+
+import pytest
+
+import mib_generator.construction.TM_packet_methods as pm
+import mib_generator.data.warn as warn
+import mib_generator.parsing.load as load
+
+
+@pytest.fixture
+def raised():
+    messages = []
+    outer = warn.collect(messages)
+    yield messages
+    warn.collect(outer)
+
+
+def command(key, width=1):
+    name = pm.stable_name("R", key, width)
+    return SimpleNamespace(cpc=[{"CPC_PRFREF": name}], prf=[{"PRF_NUMBR": name}])
+
+
+def given(packets):
+    return [i.cpc[0]["CPC_PRFREF"] for i in packets if hasattr(i, "cpc")]
+
+
+def digest(key, width=1):
+    return "R" + str(int(hashlib.sha256(key.encode()).hexdigest(), 16) % 10**width).zfill(width)
+
+
+def test_resolve_names_stable_digest(raised):
+    packets = [command("voltage", 7)]
+    pm.resolve_names(packets)
+    assert given(packets) == [digest("voltage", 7)]
+    assert packets[0].prf[0]["PRF_NUMBR"] == given(packets)[0]
+    assert not raised
+
+
+def test_resolve_names_independent_of_order(raised):
+    keys = ["a" + str(i) for i in range(8)]
+    forward = [command(i) for i in keys]
+    pm.resolve_names(forward)
+    backward = [command(i) for i in reversed(keys)]
+    pm.resolve_names(backward)
+    assert given(forward) == list(reversed(given(backward)))
+    # with 8 keys and 10 possible names some collide, but all the given names are unique
+    assert len(set(given(forward))) == len(keys)
+    assert any(i[1] == "WCM6" for i in raised)
+
+
+def test_resolve_names_sorted_key_keeps_the_name(raised):
+    keys = ["a" + str(i) for i in range(30)]
+    first = {}
+    for i in keys:
+        first.setdefault(digest(i), i)
+    packets = [command(i) for i in reversed(keys)]
+    pm.resolve_names(packets)
+    names = dict(zip(reversed(keys), given(packets)))
+    for name, key in first.items():
+        assert names[key] == name
+
+
+def test_resolve_names_avoids_existing_names(raised):
+    packets = [command("a0"), SimpleNamespace(prf=[{"PRF_NUMBR": digest("a0")}])]
+    pm.resolve_names(packets)
+    assert given(packets) != [digest("a0")]
+    assert [i[1] for i in raised] == ["WCM6"]
+
+
+def test_resolve_names_keeps_the_unresolved_rows():
+    packets = [command("a0")]
+    rows = packets[0].cpc
+    pm.resolve_names(packets)
+    assert rows[0]["CPC_PRFREF"].startswith(pm.name_mark)
+    assert not given(packets)[0].startswith(pm.name_mark)
+
+
+def test_resolve_names_registry_is_per_call():
+    pm.resolve_names([command("a0")])
+    pm.resolve_names([command("b0")])
+    assert list(pm.generated_names.values()) == ["b0"]
+
+
+@pytest.fixture
+def enums(monkeypatch):
+    table = {"A": 6, "B": "A + 1", "N": -7}
+    monkeypatch.setattr(load, "enumerations", table)
+    return table
+
+
+@pytest.mark.parametrize(
+    "expr, value",
+    [
+        ("12", 12),
+        ("0x10", 16),
+        ("A", 6),
+        ("B * 2", 14),
+        ("N / 2", -3),
+        ("N % 2", -1),
+        ("1 << A", 64),
+        ("A > 5 && B == 7", 1),
+        ("A ? 2 : 3", 2),
+        ("(A | 1) ^ 2", 5),
+    ],
+)
+def test_evalu_c_semantics(enums, raised, expr, value):
+    assert pm.evalu(expr) == value
+    assert not raised
+
+
+def test_evalu_failure_reported_once(enums, raised):
+    assert pm.evalu("UNKNOWN + 1") == -1
+    assert pm.evalu("UNKNOWN + 1") == -1
+    assert pm.evalu("1 / 0") == -1
+    assert [i[1] for i in raised] == ["WCM1", "WCM1"]
+
+
+def test_evalu_memo_follows_enumerations(enums, raised, monkeypatch):
+    assert pm.evalu("A + 1") == 7
+    monkeypatch.setattr(load, "enumerations", {"A": 1})
+    assert pm.evalu("A + 1") == 2
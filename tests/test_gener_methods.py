@@ -0,0 +1,126 @@
+import random
+from types import SimpleNamespace
+
+import pytest
+
+import mib_generator.data.longdata as longdata
+import mib_generator.data.warn as warn
+import mib_generator.generation.gener_methods as gm
+
+
+@pytest.fixture
+def raised():
+    messages = []
+    outer = warn.collect(messages)
+    yield messages
+    warn.collect(outer)
+
+
+def exclude_repetition(table, typ):
+    """The quadratic repetition check of the 2D table as it was before the rows were generated one by one."""
+    redundance = set()
+    for i in longdata.unique_entries[typ]:
+        bare_table = [[l[x - 1] for x in i] for l in table]
+        for x in range(len(bare_table)):
+            for y in range(x + 1, len(bare_table)):
+                if bare_table[x] == bare_table[y] and "".join(bare_table[x]) != "":
+                    redundance.add(y)
+    return sorted(redundance)
+
+
+@pytest.mark.parametrize("typ", ["pas", "sdf", "dpc"])
+def test_generate_rows_repetition_as_quadratic_check(typ, raised):
+    columns = [i["name"] for i in longdata.tables_format[typ]]
+    rand = random.Random(typ)
+    source = [{l: rand.choice(["", "1", "2"]) for l in columns} for i in range(200)]
+    full = []
+    for i in source:
+        i = gm.clean_row(i)
+        full.append([str(i.get(l, "")) for l in columns])
+    redundance = exclude_repetition(full, typ)
+    assert redundance
+
+    rows = list(gm.generate_rows(typ, source))
+    assert rows == [full[i] for i in range(len(full)) if i not in set(redundance)]
+    repeated = [i for i in raised if i[1] == "WGM1"]
+    assert len(repeated) == 1
+    assert repeated[0][2][1] == str(redundance)[1:-1]
+    assert repeated[0][2][2].split("\n\t")[2:] == [str(full[i]) for i in redundance]
+
+
+def packet(spid, typ, stype, apid, offset):
+    pic = {"PIC_TYPE": typ, "PIC_STYPE": stype, "PIC_APID": apid, "PIC_PI1_OFF": offset}
+    return SimpleNamespace(pic=pic, pid={"PID_SPID": spid})
+
+
+def pic_filter(packets):
+    """The pairwise check of the packets as it was before they were grouped."""
+    repete = set()
+    for x in range(len(packets)):
+        for y in range(x + 1, len(packets)):
+            a, b = packets[x].pic, packets[y].pic
+            if (a["PIC_TYPE"], a["PIC_STYPE"], a["PIC_APID"]) != (
+                b["PIC_TYPE"],
+                b["PIC_STYPE"],
+                b["PIC_APID"],
+            ):
+                continue
+            spids = (str(packets[x].pid["PID_SPID"]), str(packets[y].pid["PID_SPID"]))
+            if a["PIC_PI1_OFF"] != b["PIC_PI1_OFF"]:
+                warn.raises("WGM2", *spids)
+            elif {-1, "-1"} & {a["PIC_PI1_OFF"], b["PIC_PI1_OFF"]}:
+                warn.raises("WGM3", *spids)
+            else:
+                repete.add(y)
+    return [packets[i] for i in range(len(packets)) if i not in repete]
+
+
+def test_pic_filter_as_pairwise_check(raised):
+    rand = random.Random(3)
+    packets = [
+        packet(i, rand.choice([3, 5]), rand.choice([1, 2]), 1, rand.choice([-1, 4, 8]))
+        for i in range(60)
+    ]
+    # a group where all the packets agree
+    packets += [packet(100 + i, 9, 9, 1, 6) for i in range(5)]
+    expected = pic_filter(packets)
+    old = [i[:3] for i in raised]
+    raised.clear()
+    assert gm.pic_filter(packets) == expected
+    assert [i[:3] for i in raised] == old
+    assert {i[1] for i in old} == {"WGM2", "WGM3"}
+    assert sum(i.pic["PIC_TYPE"] == 9 for i in expected) == 1
+
+
+@pytest.fixture
+def out_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(gm.load, "out_dir", str(tmp_path))
+    (tmp_path / "pas.dat").write_text("old")
+    return tmp_path
+
+
+def test_mib_writer_replaces_atomically(out_dir):
+    with gm.mib_writer("pas") as out:
+        out.write(["A", "1"])
+        out.write(["B", "2"])
+        # nothing is visible at the target path until the writer is closed
+        assert (out_dir / "pas.dat").read_text() == "old"
+    assert (out_dir / "pas.dat").read_text() == "A\t1\nB\t2"
+    assert [i.name for i in out_dir.iterdir()] == ["pas.dat"]
+
+
+def test_mib_writer_discards_on_error(out_dir):
+    with pytest.raises(RuntimeError):
+        with gm.mib_writer("pas") as out:
+            out.write(["A", "1"])
+            raise RuntimeError
+    assert (out_dir / "pas.dat").read_text() == "old"
+    assert [i.name for i in out_dir.iterdir()] == ["pas.dat"]
+
+
+def test_mib_writer_keeps_previous_file(out_dir):
+    with gm.mib_writer("pas") as out:
+        out.write(["A", "1"])
+        out.keep()
+    assert (out_dir / "pas.dat").read_text() == "old"
+    assert [i.name for i in out_dir.iterdir()] == ["pas.dat"]
@@ -0,0 +1,66 @@
+import pytest
+
+import mib_generator.parsing.macros as macros
+
+
+@pytest.fixture
+def symbols(monkeypatch):
+    monkeypatch.setattr(macros, "table", {"ONE": "1", "TWO": "(ONE + 1)", "OFF": None})
+    monkeypatch.setattr(macros, "policy", "false")
+
+
+@pytest.mark.parametrize(
+    "stri, value",
+    [
+        ("7/2", 3),
+        ("-7/2", -3),
+        ("-4%3", -1),
+        ("4U + 0x10L", 20),
+        ("010", 8),
+        ("'A'", 65),
+        ("1 + 2 * 3", 7),
+        ("(1 + 2) * 3", 9),
+        ("1 << 2 | 1", 5),
+        ("2 > 1 ? 10 : 20", 10),
+        ("0 ? 1 : 0 ? 2 : 3", 3),
+        ("!0 && ~0", 1),
+        ("1 || 1 / 0", 1),
+    ],
+)
+def test_evaluate_as_in_c(symbols, stri, value):
+    assert macros.evaluate(stri) == value
+
+
+def test_evaluate_symbols(symbols):
+    assert macros.evaluate("TWO * 3") == 6
+    assert macros.evaluate("defined(OFF) || defined ONE") == 1
+    assert macros.evaluate("OFF + UNKNOWN") == 0
+
+
+def test_evaluate_local_scope(symbols):
+    where = macros.scope()
+    where.define("ONE", "5")
+    where.undefine("TWO")
+    assert macros.evaluate("ONE + TWO", where) == 5
+
+
+def test_evaluate_self_reference_stops(symbols, monkeypatch):
+    monkeypatch.setitem(macros.table, "LOOP", "LOOP + 1")
+    assert macros.evaluate("LOOP") == 1
+
+
+@pytest.mark.parametrize("stri", ["1 +", "(1", "1 ? 2", "1 $ 2", "defined(1)"])
+def test_evaluate_invalid(symbols, stri):
+    with pytest.raises(ValueError):
+        macros.evaluate(stri)
+
+
+def test_evaluate_division_by_zero(symbols):
+    with pytest.raises(ZeroDivisionError):
+        macros.evaluate("1 / (ONE - 1)")
+
+
+def test_unknown_symbol_policy_error(symbols, monkeypatch):
+    monkeypatch.setattr(macros, "policy", "error")
+    with pytest.raises(KeyError):
+        macros.evaluate("MISSING")
@@ -0,0 +1,95 @@
+import os
+from types import SimpleNamespace
+
+import pytest
+
+import mib_generator.generation.manifest as manifest
+import mib_generator.parsing.load as load
+
+
+@pytest.fixture
+def run(tmp_path, monkeypatch):
+    monkeypatch.setattr(load, "out_dir", str(tmp_path))
+    monkeypatch.setattr(load, "conf", {})
+    monkeypatch.setattr(load, "enumerations", {"SIZE": 4})
+    for i in ["TmH", "TcH", "TcTmH", "TmC"]:
+        monkeypatch.setattr(load, i, None)
+    monkeypatch.setattr(manifest, "enabled", False)
+    monkeypatch.setattr(manifest, "current", {})
+    built = []
+
+    def generate(inputs, incremental=True):
+        manifest.start(incremental)
+        made = []
+        for n, objects in enumerate(inputs):
+
+            def build(n=n):
+                built.append(n)
+                return SimpleNamespace(pid=[{"PID_SPID": n}], other="not recorded")
+
+            made.append(manifest.packet("packet", objects, [], ["pid"], build))
+        manifest.save()
+        return made
+
+    return generate, built
+
+
+def comment(text):
+    return SimpleNamespace(text=text, start=0, comment=[])
+
+
+def test_manifest_reuses_unchanged_packets(run):
+    generate, built = run
+    inputs = [[comment("/* {spid: 1} */")], [comment("/* {spid: 2} */")]]
+    generate(inputs)
+    assert built == [0, 1]
+    made = generate(inputs)
+    assert built == [0, 1]
+    assert all(isinstance(i, manifest.cached) for i in made)
+    assert [i.pid for i in made] == [[{"PID_SPID": 0}], [{"PID_SPID": 1}]]
+
+
+def test_manifest_rebuilds_edited_packet(run):
+    generate, built = run
+    inputs = [[comment("/* {spid: 1} */")], [comment("/* {spid: 2} */")]]
+    generate(inputs)
+    inputs[1][0].text = "/* {spid: 3} */"
+    made = generate(inputs)
+    assert built == [0, 1, 1]
+    assert isinstance(made[0], manifest.cached)
+    assert not isinstance(made[1], manifest.cached)
+    # and the edited packet is recorded, so it is reused in the next run
+    generate(inputs)
+    assert built == [0, 1, 1]
+
+
+def test_manifest_rebuilds_on_changed_enumeration(run, monkeypatch):
+    generate, built = run
+    inputs = [[comment("/* {size: SIZE} */")], [comment("/* {size: 2} */")]]
+    generate(inputs)
+    monkeypatch.setattr(load, "enumerations", {"SIZE": 8})
+    generate(inputs)
+    assert built == [0, 1, 0]
+
+
+def test_manifest_loaded_from_file(run, monkeypatch):
+    generate, built = run
+    inputs = [[comment("/* {spid: 1} */")]]
+    generate(inputs)
+    assert os.path.isfile(manifest.path())
+    # as if in a new process
+    monkeypatch.setattr(manifest, "enabled", False)
+    monkeypatch.setattr(manifest, "current", {})
+    generate(inputs)
+    assert built == [0]
+
+
+def test_manifest_not_used_without_incremental(run):
+    generate, built = run
+    inputs = [[comment("/* {spid: 1} */")]]
+    generate(inputs)
+    generate(inputs, incremental=False)
+    assert built == [0, 0]
+    # the manifest saved by the first run is still valid
+    generate(inputs)
+    assert built == [0, 0]
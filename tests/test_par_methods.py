@@ -0,0 +1,126 @@
+import mib_generator.parsing.macros as macros
+import mib_generator.parsing.par_methods as parm
+
+SOURCE = 'int a; /* c "x" */ char *s = "a//b";\n  #  define X 1 // t\n// end'
+
+
+def test_tokenize_covers_the_whole_string():
+    tokens = parm.tokenize(SOURCE)
+    assert tokens[0][1] == 0 and tokens[-1][2] == len(SOURCE)
+    for previous, following in zip(tokens, tokens[1:]):
+        assert previous[2] == following[1]
+
+
+def test_tokenize_kinds():
+    tokens = parm.tokenize(SOURCE)
+    found = [(kind, SOURCE[start:end]) for kind, start, end in tokens if kind != "code"]
+    assert found == [
+        ("comment", '/* c "x" */'),
+        ("string", '"a//b"'),
+        ("directive", "#  define"),
+        ("comment", "// t"),
+        ("comment", "// end"),
+    ]
+
+
+def test_tokenize_unterminated_comment_runs_to_the_end():
+    stri = "int a; /* open\nint b;"
+    assert parm.tokenize(stri)[-1] == ("comment", 7, len(stri))
+
+
+def test_erase_text_keeps_positions():
+    erased = parm.erase_text(SOURCE)
+    assert len(erased) == len(SOURCE)
+    assert '"    "' in erased
+    # quotation marks inside comments are not string literals
+    assert '/* c "x" */' in erased
+
+
+def test_split_comment():
+    code, comm = parm.split_comment(SOURCE)
+    assert len(code) == len(comm) == len(SOURCE)
+    assert code[7:18] == "/*" + " " * 7 + "*/"
+    assert comm.strip().startswith('/* c "x" */')
+    assert "int" not in comm and comm.count("\n") == SOURCE.count("\n")
+
+
+def test_mask_erases_overlapping_sections_once():
+    buffer = parm.mask()
+    buffer.erase(6, 9)
+    buffer.erase(2, 4)
+    buffer.erase(3, 7)
+    buffer.erase(5, 5)
+    assert buffer.apply("0123456789") == "01       9"
+
+
+def test_mask_applies_to_strings_with_the_same_positions():
+    buffer = parm.mask()
+    buffer.erase(4, 8)
+    assert buffer.apply("abcdefghij") == "abcd    ij"
+    assert buffer.apply("ABCDEFGHIJ") == "ABCD    IJ"
+    assert parm.mask().apply("abc") == "abc"
+
+
+def kept(stri, table, monkeypatch):
+    """Give the non-blank lines of the given code left after the pre-processor logic."""
+    monkeypatch.setattr(macros, "table", dict(table))
+    monkeypatch.setattr(macros, "policy", "false")
+    filtered = parm.preproc_mask(stri).apply(stri)
+    assert len(filtered) == len(stri)
+    return [i.strip() for i in filtered.split("\n") if i.strip()]
+
+
+NESTED = """#ifdef A
+a;
+#if B > 1
+ab;
+#elif defined(C) && !B
+ac;
+#else
+ae;
+#endif
+#else
+na;
+#endif
+"""
+
+
+def test_preproc_mask_nested_if_elif_else(monkeypatch):
+    assert kept(NESTED, {"A": "1", "B": "2"}, monkeypatch) == ["a;", "ab;"]
+    assert kept(NESTED, {"A": "1", "B": None, "C": "1"}, monkeypatch) == ["a;", "ac;"]
+    assert kept(NESTED, {"A": "1", "B": "1"}, monkeypatch) == ["a;", "ae;"]
+    assert kept(NESTED, {"A": None}, monkeypatch) == ["na;"]
+
+
+def test_preproc_mask_first_true_branch_only(monkeypatch):
+    stri = "#if X\nx;\n#elif 1\none;\n#elif 1\ntwo;\n#endif\n"
+    assert kept(stri, {"X": "0"}, monkeypatch) == ["one;"]
+
+
+def test_preproc_mask_local_define_and_undef(monkeypatch):
+    stri = """#define LOCAL 3
+#if LOCAL == 3
+three;
+#endif
+#undef A
+#ifdef A
+a;
+#endif
+#ifdef DEAD
+#define LATE 1
+#endif
+#ifdef LATE
+late;
+#endif
+"""
+    assert kept(stri, {"A": "1", "DEAD": None}, monkeypatch) == [
+        "#define LOCAL 3",
+        "three;",
+        "#undef A",
+    ]
+
+
+def test_preproc_mask_unbalanced_directives_warn(monkeypatch, capsys):
+    assert "a;" in kept("#ifdef A\na;\n", {"A": "1"}, monkeypatch)
+    assert "b;" in kept("b;\n#endif\n", {}, monkeypatch)
+    assert capsys.readouterr().out.count("Warn.:") == 2